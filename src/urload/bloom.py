@@ -0,0 +1,164 @@
+"""
+Compact, approximate set membership for URLoad.
+
+A :class:`BloomFilter` remembers which strings it has seen using a few bits
+per entry instead of storing the strings themselves, at the cost of
+occasionally reporting an unseen string as seen (a false positive). It never
+reports a seen string as unseen. The false-positive rate is configurable, and
+the filter grows as more strings are added so the rate holds even when the
+number of entries is not known in advance.
+"""
+
+import hashlib
+import math
+from dataclasses import dataclass
+
+# Each new slice holds this many times as many entries as the previous one...
+_GROWTH = 2
+# ...with this fraction of its false-positive rate, so the total stays bounded.
+_TIGHTENING = 0.5
+
+
+class _Slice:
+    """A fixed-size Bloom filter."""
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        """Size the filter to hold capacity entries at the given false-positive rate."""
+        self.capacity = capacity
+        self.num_bits = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def positions(self, h1: int, h2: int) -> list[int]:
+        """Return the bit positions for an entry with the given base hashes."""
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def contains(self, h1: int, h2: int) -> bool:
+        """Return True if every bit for the entry is set."""
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self.positions(h1, h2))
+
+    def add(self, h1: int, h2: int) -> None:
+        """Set the bits for an entry."""
+        bits = self.bits
+        for p in self.positions(h1, h2):
+            bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    def fill_ratio(self) -> float:
+        """Return the fraction of bits that are set."""
+        set_bits = int.from_bytes(self.bits, "little").bit_count()
+        return set_bits / self.num_bits
+
+
+@dataclass
+class BloomStats:
+    """
+    Statistics describing a BloomFilter.
+
+    :param entries: Number of distinct entries added (approximate).
+    :param memory_bytes: Size of the bit arrays in bytes.
+    :param fill_ratio: Fraction of bits set, over all slices.
+    :param error_rate: Estimated current false-positive rate.
+    :param slices: Number of fixed-size filters the set has grown to.
+    """
+
+    entries: int
+    memory_bytes: int
+    fill_ratio: float
+    error_rate: float
+    slices: int
+
+    def __str__(self) -> str:
+        """Return a one-line summary."""
+        return (
+            f"{self.entries} entries in {self.memory_bytes} bytes"
+            f" ({self.memory_bytes / max(1, self.entries):.1f} bytes/entry),"
+            f" fill {self.fill_ratio:.1%},"
+            f" estimated false-positive rate {self.error_rate:.4%}"
+        )
+
+
+class BloomFilter:
+    """
+    A scalable Bloom filter of strings.
+
+    It starts with room for ``capacity`` entries. When that fills up, a new,
+    larger slice is added with a tighter error rate, so the overall
+    false-positive rate stays below ``error_rate``.
+
+    :param capacity: Expected number of entries.
+    :param error_rate: Maximum false-positive rate, between 0 and 1.
+    :raises ValueError: If capacity or error_rate is out of range.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001) -> None:
+        """Initialize an empty filter."""
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.error_rate = error_rate
+        # The slices' rates form a geometric series summing to error_rate
+        self._slices = [_Slice(capacity, error_rate * (1 - _TIGHTENING))]
+
+    @staticmethod
+    def _hashes(item: str) -> tuple[int, int]:
+        """Return the two base hashes of an entry."""
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        # An odd step visits distinct positions in every slice
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return h1, h2
+
+    def __contains__(self, item: object) -> bool:
+        """Return True if the item has probably been added, False if it certainly has not."""
+        if not isinstance(item, str):
+            return False
+        h1, h2 = self._hashes(item)
+        return any(s.contains(h1, h2) for s in self._slices)
+
+    def __len__(self) -> int:
+        """Return the number of distinct entries added (approximate)."""
+        return sum(s.count for s in self._slices)
+
+    def add(self, item: str) -> bool:
+        """
+        Add an entry.
+
+        :param item: The string to add.
+        :return: True if the entry was new, False if it was (probably) already present.
+        """
+        h1, h2 = self._hashes(item)
+        if any(s.contains(h1, h2) for s in self._slices):
+            return False
+        current = self._slices[-1]
+        if current.count >= current.capacity:
+            rate = (
+                self.error_rate * (1 - _TIGHTENING) * _TIGHTENING ** len(self._slices)
+            )
+            current = _Slice(current.capacity * _GROWTH, rate)
+            self._slices.append(current)
+        current.add(h1, h2)
+        return True
+
+    def stats(self) -> BloomStats:
+        """
+        Return statistics about the filter.
+
+        :return: The entry count, memory use, fill ratio and estimated false-positive rate.
+        """
+        total_bits = sum(s.num_bits for s in self._slices)
+        fill = sum(s.fill_ratio() * s.num_bits for s in self._slices) / total_bits
+        # A lookup is a false positive if it matches any slice
+        miss = math.prod(1 - s.fill_ratio() ** s.num_hashes for s in self._slices)
+        return BloomStats(
+            entries=len(self),
+            memory_bytes=sum(len(s.bits) for s in self._slices),
+            fill_ratio=fill,
+            error_rate=1 - miss,
+            slices=len(self._slices),
+        )
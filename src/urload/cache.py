@@ -0,0 +1,442 @@
+"""
+Persistent HTTP response cache for URLoad.
+
+:class:`DiskCache` stores response bodies together with their headers so that
+pages fetched by one command (or one run) can be reused by later ones. Entries
+that are still fresh according to ``Cache-Control``/``Expires`` are served
+locally; stale entries are revalidated with ``If-None-Match`` and
+``If-Modified-Since``. The cache is bounded in size and evicts the least
+recently used entries first.
+"""
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import IO, Any
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+HTTP_OK = 200
+# Request headers that do not affect which response is returned
+_IGNORED_REQUEST_HEADERS = {"if-none-match", "if-modified-since", "range", "if-range"}
+
+
+@dataclass
+class CacheEntry:
+    """
+    A cached response.
+
+    :param key: The cache key of the entry.
+    :param url: The URL that was fetched.
+    :param status: The HTTP status code of the response.
+    :param headers: The response headers.
+    :param stored_at: Time (seconds since the epoch) the response was stored or revalidated.
+    :param size: Size of the body in bytes.
+    """
+
+    key: str
+    url: str
+    status: int
+    headers: dict[str, str]
+    stored_at: float
+    size: int
+
+    def is_fresh(self, now: float | None = None) -> bool:
+        """
+        Return True if the entry may be used without revalidation.
+
+        :param now: The current time, defaulting to time.time().
+        :return: Whether the entry is still within its freshness lifetime.
+        """
+        now = time.time() if now is None else now
+        return now - self.stored_at < freshness_lifetime(self.headers)
+
+    def conditional_headers(self) -> dict[str, str]:
+        """
+        Return the headers needed to revalidate this entry.
+
+        :return: A dictionary with If-None-Match and/or If-Modified-Since.
+        """
+        headers = CaseInsensitiveDict(self.headers)
+        conditional: dict[str, str] = {}
+        if "ETag" in headers:
+            conditional["If-None-Match"] = headers["ETag"]
+        if "Last-Modified" in headers:
+            conditional["If-Modified-Since"] = headers["Last-Modified"]
+        return conditional
+
+
+class _BodyFile(io.BufferedReader):
+    """
+    A cached body streamed from disk, closed once it has been read to the end.
+
+    requests does not close a response's ``raw`` after reading it all, or
+    when the response is closed after that, but does call ``release_conn``.
+    """
+
+    def read(self, size: int | None = -1) -> bytes:
+        """
+        Read up to size bytes, closing the file at the end of the body.
+
+        :param size: The maximum number of bytes, or -1 or None for the rest.
+        :return: The bytes read, or b"" at the end of the body.
+        """
+        if self.closed:
+            return b""
+        data = super().read(size)
+        if not data:
+            self.close()
+        return data
+
+    def release_conn(self) -> None:
+        """Close the file when the response is closed."""
+        self.close()
+
+
+def parse_cache_control(value: str) -> dict[str, str]:
+    """
+    Parse a Cache-Control header into a dictionary of directives.
+
+    Directives without a value map to the empty string.
+
+    :param value: The header value.
+    :return: A dictionary of lowercase directive names to their values.
+    """
+    directives: dict[str, str] = {}
+    for part in value.split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip().strip('"')
+    return directives
+
+
+def freshness_lifetime(headers: Mapping[str, str]) -> float:
+    """
+    Return how long a response may be served without revalidation.
+
+    :param headers: The response headers.
+    :return: The freshness lifetime in seconds (0 if the response must be revalidated).
+    """
+    headers = CaseInsensitiveDict(headers)
+    cc = parse_cache_control(headers.get("Cache-Control", ""))
+    if "no-cache" in cc or "no-store" in cc:
+        return 0
+    if "max-age" in cc:
+        try:
+            return max(0, int(cc["max-age"]))
+        except ValueError:
+            return 0
+    if "Expires" in headers:
+        try:
+            expires = parsedate_to_datetime(headers["Expires"])
+            date = parsedate_to_datetime(headers["Date"]) if "Date" in headers else None
+            base = date.timestamp() if date else time.time()
+            return max(0, expires.timestamp() - base)
+        except (TypeError, ValueError):
+            return 0
+    return 0
+
+
+def is_storable(status: int, headers: Mapping[str, str]) -> bool:
+    """
+    Return True if a response is worth storing in the cache.
+
+    Only successful responses that are either fresh for a while or carry a
+    validator (so they can be revalidated cheaply) are stored.
+
+    :param status: The HTTP status code.
+    :param headers: The response headers.
+    :return: Whether the response should be cached.
+    """
+    headers = CaseInsensitiveDict(headers)
+    if status != HTTP_OK:
+        return False
+    if "no-store" in parse_cache_control(headers.get("Cache-Control", "")):
+        return False
+    has_validator = "ETag" in headers or "Last-Modified" in headers
+    return has_validator or freshness_lifetime(headers) > 0
+
+
+class DiskCache:
+    """
+    A size-bounded, on-disk HTTP response cache with LRU eviction.
+
+    Each entry is stored as ``<key>.body`` with a ``<key>.json`` metadata file.
+    The modification time of the body file records when it was last used.
+
+    :param directory: Directory holding the cache files.
+    :param max_bytes: Maximum total size of the cached bodies.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        """Initialize the cache, loading the index of any existing entries."""
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> (size, last used)
+        self._index: dict[str, tuple[int, float]] = {}
+        self._total = 0
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                if not name.endswith(".json"):
+                    continue
+                key = name[: -len(".json")]
+                entry = self._read_entry(key)
+                body_path = self._path(key, ".body")
+                if entry is None or not os.path.exists(body_path):
+                    continue
+                self._index[key] = (entry.size, os.path.getmtime(body_path))
+                self._total += entry.size
+
+    @staticmethod
+    def key(url: str, headers: Mapping[str, str]) -> str:
+        """
+        Return the cache key for a request.
+
+        :param url: The requested URL.
+        :param headers: The request headers.
+        :return: A hex digest identifying the request.
+        """
+        relevant = sorted(
+            (k.lower(), v)
+            for k, v in headers.items()
+            if k.lower() not in _IGNORED_REQUEST_HEADERS
+        )
+        data = json.dumps([url, relevant], ensure_ascii=False)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def lookup(self, url: str, headers: Mapping[str, str]) -> CacheEntry | None:
+        """
+        Return the cached entry for a request, if any.
+
+        :param url: The requested URL.
+        :param headers: The request headers.
+        :return: The cache entry, or None on a miss.
+        """
+        key = self.key(url, headers)
+        with self._lock:
+            if key not in self._index:
+                return None
+        return self._read_entry(key)
+
+    def response(self, entry: CacheEntry, stream: bool = False) -> requests.Response:
+        """
+        Build a response object that serves the cached body.
+
+        :param entry: The cache entry.
+        :param stream: If True, the body is read from disk as it is consumed;
+            otherwise it is loaded into memory.
+        :return: A requests.Response equivalent to the original one.
+        """
+        body_path = self._path(entry.key, ".body")
+        raw: IO[bytes]
+        if stream:
+            raw = _BodyFile(io.FileIO(body_path))
+        else:
+            with open(body_path, "rb") as f:
+                raw = io.BytesIO(f.read())
+        self._touch(entry.key)
+        resp = requests.Response()
+        resp.status_code = entry.status
+        resp.reason = "OK"
+        resp.url = entry.url
+        resp.headers = CaseInsensitiveDict(entry.headers)
+        resp.encoding = get_encoding_from_headers(resp.headers)
+        resp.raw = raw
+        return resp
+
+    def store(
+        self, url: str, headers: Mapping[str, str], resp: requests.Response
+    ) -> None:
+        """
+        Store a fully downloaded response if it is cacheable.
+
+        :param url: The requested URL.
+        :param headers: The request headers.
+        :param resp: The response, whose body has not been streamed.
+        """
+        if not is_storable(resp.status_code, resp.headers):
+            return
+        body = resp.content
+        if len(body) > self.max_bytes:
+            return
+        key = self.key(url, headers)
+        entry = CacheEntry(
+            key, url, resp.status_code, dict(resp.headers), time.time(), len(body)
+        )
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self._path(key, '.body')}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+        self._commit(entry, tmp_path)
+
+    def store_streamed(
+        self, url: str, headers: Mapping[str, str], resp: requests.Response
+    ) -> None:
+        """
+        Store a streamed response as its body is read, if it is cacheable.
+
+        ``resp.iter_content`` is replaced by one that also copies the body to a
+        temporary file. The entry is only added once the whole body has been
+        read; a body that is not read to the end, fails, or does not fit in
+        the cache is not stored.
+
+        :param url: The requested URL.
+        :param headers: The request headers.
+        :param resp: The response, whose body has not been read yet.
+        """
+        if not is_storable(resp.status_code, resp.headers):
+            return
+        key = self.key(url, headers)
+        status, resp_headers = resp.status_code, dict(resp.headers)
+        read = resp.iter_content
+
+        def iter_content(
+            chunk_size: int | None = 1, decode_unicode: bool = False
+        ) -> Iterator[Any]:
+            if decode_unicode:
+                # Decoded text is not the body, so it is not stored
+                yield from read(chunk_size, decode_unicode)
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(".tmp", key, self.directory)
+            size = 0
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    for chunk in read(chunk_size):
+                        size += len(chunk)
+                        if size <= self.max_bytes:
+                            f.write(chunk)
+                        yield chunk
+                if size <= self.max_bytes:
+                    entry = CacheEntry(
+                        key, url, status, resp_headers, time.time(), size
+                    )
+                    self._commit(entry, tmp_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+        resp.iter_content = iter_content
+
+    def _commit(self, entry: CacheEntry, tmp_path: str) -> None:
+        """
+        Add an entry whose body has been written to a temporary file.
+
+        :param entry: The entry.
+        :param tmp_path: The file holding the body, which is moved into place.
+        """
+        os.replace(tmp_path, self._path(entry.key, ".body"))
+        self._write_entry(entry)
+        with self._lock:
+            old_size, _ = self._index.get(entry.key, (0, 0.0))
+            self._index[entry.key] = (entry.size, time.time())
+            self._total += entry.size - old_size
+        self._evict()
+
+    def refresh(self, entry: CacheEntry, headers: Mapping[str, str]) -> None:
+        """
+        Update an entry after a successful revalidation (304 Not Modified).
+
+        :param entry: The cache entry that was revalidated.
+        :param headers: The headers of the 304 response.
+        """
+        merged = CaseInsensitiveDict(entry.headers)
+        for name in ("Cache-Control", "Date", "ETag", "Expires", "Last-Modified"):
+            if name in headers:
+                merged[name] = headers[name]
+        entry.headers = dict(merged)
+        entry.stored_at = time.time()
+        self._write_entry(entry)
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        with self._lock:
+            for key in self._index:
+                self._remove_files(key)
+            self._index.clear()
+            self._total = 0
+
+    def stats(self) -> tuple[int, int]:
+        """
+        Return the number of entries and their total size.
+
+        :return: A tuple of (entries, bytes).
+        """
+        with self._lock:
+            return len(self._index), self._total
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits its budget."""
+        with self._lock:
+            if self._total <= self.max_bytes:
+                return
+            for key, (size, _) in sorted(self._index.items(), key=lambda i: i[1][1]):
+                if self._total <= self.max_bytes:
+                    break
+                self._remove_files(key)
+                del self._index[key]
+                self._total -= size
+
+    def _touch(self, key: str) -> None:
+        """Record that an entry was used."""
+        now = time.time()
+        with self._lock:
+            if key in self._index:
+                self._index[key] = (self._index[key][0], now)
+        try:
+            os.utime(self._path(key, ".body"), (now, now))
+        except OSError:
+            pass
+
+    def _path(self, key: str, suffix: str) -> str:
+        """Return the path of one of an entry's files."""
+        return os.path.join(self.directory, key + suffix)
+
+    def _read_entry(self, key: str) -> CacheEntry | None:
+        """Load an entry's metadata, or return None if it is missing or corrupt."""
+        try:
+            with open(self._path(key, ".json"), "r", encoding="utf-8") as f:
+                meta: dict[str, Any] = json.load(f)
+            return CacheEntry(
+                key,
+                str(meta["url"]),
+                int(meta["status"]),
+                {str(k): str(v) for k, v in dict(meta["headers"]).items()},
+                float(meta["stored_at"]),
+                int(meta["size"]),
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_entry(self, entry: CacheEntry) -> None:
+        """Save an entry's metadata."""
+        meta = {
+            "url": entry.url,
+            "status": entry.status,
+            "headers": entry.headers,
+            "stored_at": entry.stored_at,
+            "size": entry.size,
+        }
+        meta_path = self._path(entry.key, ".json")
+        tmp_path = f"{meta_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, meta_path)
+
+    def _remove_files(self, key: str) -> None:
+        """Delete an entry's files from disk."""
+        for suffix in (".body", ".json"):
+            try:
+                os.remove(self._path(key, suffix))
+            except OSError:
+                pass
@@ -0,0 +1,123 @@
+"""
+Character encoding detection for fetched pages.
+
+Pages are kept as raw bytes and decoded only when they are parsed. The
+encoding is chosen the way browsers do, without statistical guessing: a byte
+order mark, then the charset declared in the Content-Type header, then a
+``<meta>`` charset in the first :data:`SNIFF_BYTES` bytes of the page, and
+finally UTF-8.
+"""
+
+import codecs
+import re
+from collections.abc import Mapping
+
+# Number of bytes at the start of a page searched for a <meta> charset
+SNIFF_BYTES = 1024
+DEFAULT_ENCODING = "utf-8"
+
+_BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+_HEADER_CHARSET_RE = re.compile(r"""charset\s*=\s*["']?([^"';\s]+)""", re.IGNORECASE)
+_META_CHARSET_RE = re.compile(
+    rb"""<meta[^>]+charset\s*=\s*["']?([\w.:-]+)""", re.IGNORECASE
+)
+# Labels that browsers treat as windows-1252, which is a superset of them
+_WINDOWS_1252_LABELS = {"ascii", "us-ascii", "iso-8859-1", "iso8859-1", "latin1"}
+
+
+def _normalize(label: str) -> str | None:
+    """Return the Python codec for an encoding label, or None if it is unknown."""
+    label = label.strip().lower()
+    if label in _WINDOWS_1252_LABELS:
+        return "windows-1252"
+    try:
+        return codecs.lookup(label).name
+    except LookupError:
+        return None
+
+
+def declared_encoding(headers: Mapping[str, str]) -> str | None:
+    """
+    Return the charset declared in a response's Content-Type header.
+
+    Unlike ``requests``, no default is assumed when the header has no charset.
+
+    :param headers: The response headers.
+    :return: The codec name, or None if no known charset is declared.
+    """
+    content_type = next(
+        (v for k, v in headers.items() if k.lower() == "content-type"), ""
+    )
+    match = _HEADER_CHARSET_RE.search(content_type)
+    return _normalize(match.group(1)) if match else None
+
+
+def sniff_encoding(prefix: bytes, declared: str | None = None) -> str:
+    """
+    Choose the encoding of a page from the start of its body.
+
+    :param prefix: The first bytes of the body (at least SNIFF_BYTES, unless the body is shorter).
+    :param declared: The encoding declared by the server, if any.
+    :return: The codec name to decode the page with.
+    """
+    for bom, encoding in _BOMS:
+        if prefix.startswith(bom):
+            return encoding
+    if declared:
+        return declared
+    match = _META_CHARSET_RE.search(prefix[:SNIFF_BYTES])
+    if match:
+        encoding = _normalize(match.group(1).decode("ascii"))
+        # A page that can declare its encoding in ASCII is not UTF-16
+        if encoding and not encoding.startswith("utf-16"):
+            return encoding
+    return DEFAULT_ENCODING
+
+
+def decode(content: bytes, declared: str | None = None) -> str:
+    """
+    Decode a page body.
+
+    :param content: The body.
+    :param declared: The encoding declared by the server, if any.
+    :return: The text, with undecodable bytes replaced by U+FFFD.
+    """
+    return str(content, sniff_encoding(content, declared), errors="replace")
+
+
+class StreamDecoder:
+    """
+    Decodes a page body that arrives in pieces.
+
+    The first SNIFF_BYTES bytes are buffered so the encoding can be chosen
+    with :func:`sniff_encoding` before any text is returned.
+
+    :param declared: The encoding declared by the server, if any.
+    """
+
+    def __init__(self, declared: str | None = None) -> None:
+        """Initialize a decoder that has not chosen its encoding yet."""
+        self.declared = declared
+        self._prefix = b""
+        self._decoder: codecs.IncrementalDecoder | None = None
+
+    def decode(self, data: bytes, final: bool = False) -> str:
+        """
+        Decode the next piece of the body.
+
+        :param data: The next bytes.
+        :param final: True if this is the end of the body.
+        :return: The text decoded so far that has not been returned yet.
+        """
+        if self._decoder is None:
+            self._prefix += data
+            if len(self._prefix) < SNIFF_BYTES and not final:
+                return ""
+            encoding = sniff_encoding(self._prefix, self.declared)
+            self._decoder = codecs.getincrementaldecoder(encoding)("replace")
+            data, self._prefix = self._prefix, b""
+        return self._decoder.decode(data, final)
@@ -2,11 +2,11 @@
 
 import re
 import textwrap
-from itertools import product
 from typing import Any
 
 from urload.commands.base import Command, CommandError
 from urload.url import URL
+from urload.urlstore import SegmentedList, URLList, URLRange
 
 
 class AddCommand(Command):
@@ -17,11 +17,10 @@ class AddCommand(Command):
     add <url> - Add a URL to the list.
 
     This command appends the specified URL to the shared URL list. Supports range expansion with [start-end] syntax.
+    Ranges are expanded lazily: the URLs are generated as they are read, so even patterns matching millions of URLs can be added, inspected with head, tail and list, and fetched without holding them all in memory.
     """)
 
-    def run(
-        self, args: list[str], url_list: list[URL], settings: Any = None
-    ) -> list[URL]:
+    def run(self, args: list[str], url_list: URLList, settings: Any = None) -> URLList:
         """Append a URL or URLs (with range expansion) to the list if provided."""
         if not args:
             raise CommandError("Error: No URL provided.")
@@ -33,22 +32,23 @@ class AddCommand(Command):
             url_obj = URL(url)
             url_list.append(url_obj)
             return url_list
-        # For each match, build the list of values (with padding)
-        ranges: list[list[str]] = []
+        # Each range becomes its values and the width to zero-pad them to
+        ranges: list[tuple[range, int]] = []
+        pieces: list[str] = []
+        previous_end = 0
         for m in matches:
             start_str, end_str = m.group(1), m.group(2)
-            width = len(start_str)
             start, end = int(start_str), int(end_str)
             if end < start:
                 raise CommandError(f"Range start ({start}) greater than end ({end})")
-            rng = [str(i).zfill(width) for i in range(start, end + 1)]
-            ranges.append(rng)
-        # Build all combinations
-        for combo in product(*ranges):
-            new_url = url
-            for m, val in zip(reversed(matches), reversed(list(combo))):
-                # Replace from the end to avoid offset issues
-                new_url = new_url[: m.start()] + val + new_url[m.end() :]
-            url_obj = URL(new_url)
-            url_list.append(url_obj)
+            ranges.append((range(start, end + 1), len(start_str)))
+            pieces.append(url[previous_end : m.start()])
+            previous_end = m.end()
+        pieces.append(url[previous_end:])
+        # The combinations are generated only when they are read
+        urls = URLRange(pieces, ranges)
+        if not isinstance(url_list, SegmentedList):
+            url_list = SegmentedList(url_list)
+        url_list.extend(urls)
+        print(f"Added {len(urls)} URLs.")
         return url_list
@@ -1,9 +1,11 @@
 """Base class and interface for URLoad commands."""
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator, MutableSequence
 
 from urload.settings import AppSettings
 from urload.url import URL
+from urload.urlstore import URLList
 
 
 class Command(ABC):
@@ -13,9 +15,7 @@ class Command(ABC):
     description: str
 
     @abstractmethod
-    def run(
-        self, args: list[str], url_list: list[URL], settings: AppSettings
-    ) -> list[URL]:
+    def run(self, args: list[str], url_list: URLList, settings: AppSettings) -> URLList:
         """
         Execute the command with the given arguments, URL list, and settings, returning the modified list.
 
@@ -27,6 +27,26 @@ class Command(ABC):
         """
         pass
 
+    def stream(
+        self, args: list[str], urls: Iterable[URL], settings: AppSettings
+    ) -> Iterator[URL]:
+        """
+        Execute the command as a stage of a pipeline, consuming and producing URLs lazily.
+
+        Commands that can process URLs one at a time override this so that
+        each stage of a pipeline (``href | keep ... | get``) starts work as
+        soon as the previous stage produces URLs. This default collects the
+        whole input and calls :meth:`run`.
+
+        :param args: List of command-line arguments.
+        :param urls: The URLs produced by the previous stage, or the URL list.
+        :param settings: The AppSettings object.
+        :return: An iterator over the URLs the command produces.
+        :raises CommandError: If a user-facing error occurs.
+        """
+        url_list = urls if isinstance(urls, MutableSequence) else list(urls)
+        return iter(self.run(args, url_list, settings))
+
     def help(self) -> str:
         """Return a help string describing the command."""
         return self.description
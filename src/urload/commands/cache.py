@@ -0,0 +1,52 @@
+"""Implements the 'cache' command for URLoad."""
+
+import textwrap
+
+from urload import pagecache, transport
+from urload.commands.base import Command, CommandError
+from urload.settings import AppSettings
+from urload.urlstore import URLList
+
+
+class CacheCommand(Command):
+    """Shows statistics for, or clears, the HTTP response cache."""
+
+    name = "cache"
+    description = textwrap.dedent("""
+    cache [clear] - Show or clear the HTTP response cache.
+
+    With no arguments, prints the number of cached responses and their total size.
+    With 'clear', removes all cached responses, including the pages kept in memory for title, href and img.
+    The cache is enabled with 'set-option http_cache=true'; its location and size limit are set by the http_cache_dir and http_cache_max_bytes settings.
+    Streamed responses, such as those of get and title, are cached once their whole body has been read.
+    """)
+
+    def run(self, args: list[str], url_list: URLList, settings: AppSettings) -> URLList:
+        """
+        Show or clear the HTTP response cache.
+
+        :param args: [] to show statistics, ['clear'] to clear the cache.
+        :param url_list: Unused.
+        :param settings: The AppSettings object.
+        :return: url_list unchanged.
+        :raises CommandError: If the arguments are invalid.
+        """
+        if args not in ([], ["clear"]):
+            raise CommandError("Usage: cache [clear]")
+        transport.configure(settings)
+        if args:
+            pagecache.page_cache().clear()
+        disk_cache = transport.disk_cache()
+        if disk_cache is None:
+            print("HTTP cache is disabled.")
+            return url_list
+        if args:
+            disk_cache.clear()
+            print("HTTP cache cleared.")
+            return url_list
+        entries, size = disk_cache.stats()
+        print(
+            f"HTTP cache: {entries} entries, {size} of {disk_cache.max_bytes} bytes"
+            f" in {disk_cache.directory}"
+        )
+        return url_list
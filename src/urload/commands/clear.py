@@ -4,7 +4,7 @@ import textwrap
 from typing import Any
 
 from urload.commands.base import Command, CommandError
-from urload.url import URL
+from urload.urlstore import URLList, new_url_list
 
 
 class ClearCommand(Command):
@@ -19,9 +19,7 @@ class ClearCommand(Command):
         """
     )
 
-    def run(
-        self, args: list[str], url_list: list[URL], settings: Any = None
-    ) -> list[URL]:
+    def run(self, args: list[str], url_list: URLList, settings: Any = None) -> URLList:
         """
         Clear the current URL list.
 
@@ -32,4 +30,4 @@ class ClearCommand(Command):
         """
         if args:
             raise CommandError("clear command takes no arguments.")
-        return []
+        return new_url_list(settings)
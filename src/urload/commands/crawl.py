@@ -0,0 +1,218 @@
+"""Implements the 'crawl' command for URLoad."""
+
+import json
+import os
+import re
+import textwrap
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urldefrag, urlparse
+
+from urload import pagecache, parse, transport
+from urload.bloom import BloomFilter
+from urload.commands.base import Command, CommandError
+from urload.frontier import Frontier, FrontierItem, frontier_path
+from urload.retry import RetryLog
+from urload.scheduler import scheduler, url_host
+from urload.url import URL, intern_headers
+from urload.urlstore import URLList, new_like
+
+# Name of the crawl's queue in the session directory
+FRONTIER_FILE = "crawl-frontier.sqlite"
+
+
+@dataclass
+class CrawlScope:
+    """
+    Decides which links a crawl follows.
+
+    :param hosts: Hosts that links must point to, or None to allow any host.
+    :param pattern: Regex that links must match, or None to allow any link.
+    """
+
+    hosts: set[str] | None
+    pattern: re.Pattern[str] | None
+
+    def allows(self, url: str) -> bool:
+        """
+        Return True if a link is within the scope of the crawl.
+
+        :param url: The absolute link, without a fragment.
+        :return: Whether the crawl should include and follow the link.
+        """
+        if urlparse(url).scheme not in ("http", "https"):
+            return False
+        if self.hosts is not None and url_host(url) not in self.hosts:
+            return False
+        return self.pattern is None or self.pattern.search(url) is not None
+
+
+class CrawlCommand(Command):
+    """Follows links breadth-first from each URL in the list, up to a given depth."""
+
+    name = "crawl"
+    description = textwrap.dedent("""
+    crawl <depth> [-H] [-r <regex>] [--approx] - Follow links from the URLs in the list, breadth-first.
+    crawl --resume <session> [--approx] - Continue an interrupted crawl.
+
+    The pages in the list are fetched and their <a href=...> links extracted, as with href. With a depth greater than 1, the pages those links point to are fetched in turn, and so on, up to <depth> levels.
+    Each page is fetched at most once, and each link is added to the resulting list only the first time it is found, with the page it was found on as the referrer. The original URLs are not included.
+    By default only links to the hosts of the original URLs are followed. If -H is given, links to any host are followed.
+    If -r is given, only links matching <regex> are followed.
+    The links found are queued on disk in the session directory rather than in memory, and taken in batches of frontier_batch_size. If the crawl is interrupted, the queue is kept, and --resume continues it from where it stopped; <session> is the number of the session directory (e.g. 0003). The queue is removed when the crawl completes.
+    With --approx, links are first checked against a Bloom filter (see the bloom_capacity and bloom_error_rate settings), which saves a lookup in the queue for most repeated links but skips a small fraction of new links as if already seen.
+    Pages are fetched in parallel, limited by the download_concurrency, host_rate_limit and host_concurrency settings.
+    """)
+
+    def run(self, args: list[str], url_list: URLList, settings: Any = None) -> URLList:
+        """
+        Crawl from the URLs in the list and return the links discovered.
+
+        :param args: The depth, optionally followed by '-H', '-r <regex>' and/or '--approx';
+            or '--resume <session>', optionally with '--approx'.
+        :param url_list: The URLs to start from (ignored when resuming).
+        :param settings: The AppSettings object.
+        :return: The discovered URLs, each with the page it was found on as referrer.
+        :raises CommandError: If the arguments are invalid or there is no crawl to resume.
+        """
+        approx = "--approx" in args
+        args = [a for a in args if a != "--approx"]
+        if args[:1] == ["--resume"]:
+            frontier, args, start_urls = self._resume(args)
+            depth, scope = self._parse_args(args, start_urls)
+        else:
+            depth, scope = self._parse_args(args, url_list)
+            frontier = Frontier(frontier_path(settings, FRONTIER_FILE))
+            frontier.set_meta("args", json.dumps(args))
+            for url in url_list:
+                frontier.add(urldefrag(url.url).url, url)
+            frontier.commit()
+        transport.configure(settings)
+        pagecache.configure(settings)
+        parse.configure(settings)
+        jobs = getattr(settings, "download_concurrency", 1)
+        batch_size = getattr(settings, "frontier_batch_size", 256)
+        seen = None
+        if approx:
+            seen = BloomFilter(
+                getattr(settings, "bloom_capacity", 1_000_000),
+                getattr(settings, "bloom_error_rate", 0.001),
+            )
+        completed = False
+        try:
+            while batch := frontier.take(batch_size, below_level=depth):
+                _crawl_batch(batch, scope, frontier, seen, jobs)
+            discovered = new_like(
+                url_list, (item.url for item in frontier.items(min_level=1))
+            )
+            completed = True
+        finally:
+            frontier.close(remove=completed)
+        print(f"Crawl found {len(discovered)} URLs.")
+        if seen is not None:
+            print(f"Seen-set: {seen.stats()}")
+        return discovered
+
+    @staticmethod
+    def _resume(args: list[str]) -> tuple[Frontier, list[str], URLList]:
+        """
+        Reopen the queue of an interrupted crawl.
+
+        :param args: The arguments '--resume <session>'.
+        :return: A tuple of (frontier, original arguments, original URLs).
+        :raises CommandError: If the arguments are invalid or there is no crawl to resume.
+        """
+        if len(args) != 2:  # noqa: PLR2004
+            raise CommandError("Usage: crawl --resume <session> [--approx]")
+        try:
+            frontier = Frontier(os.path.join(args[1], FRONTIER_FILE), resume=True)
+        except FileNotFoundError:
+            raise CommandError(f"No interrupted crawl in {args[1]}.")
+        url_list = [item.url for item in frontier.items() if item.level == 0]
+        print(f"Resuming crawl of {len(url_list)} URLs.")
+        return frontier, json.loads(frontier.get_meta("args") or "[]"), url_list
+
+    @staticmethod
+    def _parse_args(args: list[str], url_list: URLList) -> tuple[int, CrawlScope]:
+        """
+        Parse the crawl command arguments.
+
+        :param args: List of command-line arguments.
+        :param url_list: The URLs to start from, whose hosts form the default scope.
+        :return: A tuple of (depth, scope).
+        :raises CommandError: If an argument is missing, unknown or invalid.
+        """
+        if not args:
+            raise CommandError("Usage: crawl <depth> [-H] [-r <regex>] [--approx]")
+        try:
+            depth = int(args[0])
+        except ValueError:
+            raise CommandError(f"Invalid depth: {args[0]}")
+        if depth < 1:
+            raise CommandError("Depth must be at least 1.")
+        hosts: set[str] | None = {url_host(url.url) for url in url_list}
+        pattern = None
+        remaining = args[1:]
+        while remaining:
+            arg = remaining.pop(0)
+            if arg == "-H":
+                hosts = None
+            elif arg == "-r":
+                if not remaining:
+                    raise CommandError("-r requires a regex.")
+                try:
+                    pattern = re.compile(remaining.pop(0))
+                except re.error as e:
+                    raise CommandError(f"Invalid regex: {e}")
+            else:
+                raise CommandError(f"Unknown argument: {arg}")
+        return depth, CrawlScope(hosts, pattern)
+
+
+def _crawl_batch(
+    items: list[FrontierItem],
+    scope: CrawlScope,
+    frontier: Frontier,
+    seen: BloomFilter | None,
+    jobs: int,
+) -> None:
+    """
+    Fetch a batch of pages and queue the new links found on them.
+
+    Pages are fetched and parsed in a pipeline, as in the href command. Each
+    page is marked finished in the frontier together with the links found on it.
+
+    :param items: The pages to fetch, taken from the frontier.
+    :param scope: The scope of the crawl.
+    :param frontier: The queue of the crawl; new links are added to it one level deeper.
+    :param seen: Bloom filter of links already seen, or None to rely on the frontier alone.
+    :param jobs: Maximum number of concurrent fetches.
+    """
+    work = [(item, RetryLog()) for item in items]
+    fetched = scheduler().imap(
+        lambda entry: pagecache.fetch_page(entry[0].url, entry[1]),
+        work,
+        jobs,
+        key=lambda entry: url_host(entry[0].url.url),
+    )
+    for (item, retries), result in zip(work, parse.imap_links(fetched, ("a",))):
+        level = item.level + 1
+        try:
+            links = result.result()
+        except Exception as e:
+            frontier.finish(item, failed=True)
+            notes = ["Error:", retries.summary(), str(e)]
+            print(f"[{level}] {item.url.url} -> {' '.join(filter(None, notes))}")
+            continue
+        new = 0
+        referer = intern_headers({"Referer": item.url.url})
+        for link in (urldefrag(link).url for link in links):
+            if (seen is not None and link in seen) or not scope.allows(link):
+                continue
+            if seen is not None:
+                seen.add(link)
+            if frontier.add(link, URL(link, referer), level):
+                new += 1
+        frontier.finish(item)
+        notes = [f"{len(links)} found, {new} new", retries.summary()]
+        print(f"[{level}] {item.url.url} -> {' '.join(filter(None, notes))}")
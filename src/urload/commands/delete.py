@@ -5,7 +5,7 @@ import textwrap
 from typing import Any
 
 from urload.commands.base import Command, CommandError
-from urload.url import URL
+from urload.urlstore import URLList
 
 
 class DeleteCommand(Command):
@@ -18,9 +18,7 @@ class DeleteCommand(Command):
     This command removes a single URL by index or a range of URLs from the list.
     """)
 
-    def run(
-        self, args: list[str], url_list: list[URL], settings: Any = None
-    ) -> list[URL]:
+    def run(self, args: list[str], url_list: URLList, settings: Any = None) -> URLList:
         """Delete a URL or range of URLs by index."""
         if not args:
             raise CommandError("No index or range provided.")
@@ -2,10 +2,12 @@
 
 import re
 import textwrap
+from collections.abc import Iterable, Iterator
 from typing import Any
 
 from urload.commands.base import Command, CommandError
 from urload.url import URL
+from urload.urlstore import URLList, new_like
 
 
 class DiscardCommand(Command):
@@ -18,17 +20,37 @@ class DiscardCommand(Command):
     This command removes all URLs in the list that match the given regex pattern.
     """)
 
-    def run(
-        self, args: list[str], url_list: list[URL], settings: Any = None
-    ) -> list[URL]:
+    def run(self, args: list[str], url_list: URLList, settings: Any = None) -> URLList:
         """Remove URLs matching the regex pattern."""
+        return new_like(url_list, self.stream(args, url_list, settings))
+
+    def stream(
+        self, args: list[str], urls: Iterable[URL], settings: Any = None
+    ) -> Iterator[URL]:
+        """
+        Remove URLs matching the regex pattern, as they arrive.
+
+        :param args: The regex pattern.
+        :param urls: The URLs to filter.
+        :param settings: Unused.
+        :return: An iterator over the URLs that do not match.
+        :raises CommandError: If the pattern is missing or invalid.
+        """
         if not args:
             raise CommandError("No regex pattern provided.")
-        pattern = args[0]
         try:
-            regex = re.compile(pattern)
+            regex = re.compile(args[0])
         except re.error as e:
             raise CommandError(f"Invalid regex: {e}")
-        kept = [url for url in url_list if not regex.search(url.url)]
-        print(f"Removed {len(url_list) - len(kept)} URLs matching pattern.")
-        return kept
+        return self._filter(regex, urls)
+
+    @staticmethod
+    def _filter(regex: re.Pattern[str], urls: Iterable[URL]) -> Iterator[URL]:
+        """Yield the URLs not matching regex, then report how many were removed."""
+        count = 0
+        for url in urls:
+            if regex.search(url.url):
+                count += 1
+                continue
+            yield url
+        print(f"Removed {count} URLs matching pattern.")
@@ -4,7 +4,7 @@ import textwrap
 from typing import Any
 
 from urload.commands.base import Command
-from urload.url import URL
+from urload.urlstore import URLList
 
 
 class ExitCommand(Command):
@@ -17,9 +17,7 @@ class ExitCommand(Command):
     This command exits the URLoad interactive session.
     """)
 
-    def run(
-        self, args: list[str], url_list: list[URL], settings: Any = None
-    ) -> list[URL]:
+    def run(self, args: list[str], url_list: URLList, settings: Any = None) -> URLList:
         """Exit the application."""
         print("Goodbye!")
         raise SystemExit(0)
@@ -0,0 +1,108 @@
+"""Extracts anchor links, image sources and titles from each URL in a single pass."""
+
+import itertools
+import textwrap
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from urload import pagecache, parse, transport
+from urload.commands.base import Command, CommandError
+from urload.retry import RetryLog
+from urload.scheduler import scheduler, url_host
+from urload.url import URL, intern_headers
+from urload.urlstore import URLList, new_like
+
+
+class ExtractCommand(Command):
+    """Fetch and parse each page once, extracting anchors, images and the title together."""
+
+    name = "extract"
+    description = textwrap.dedent(
+        """
+        extract [-a] [-i] [-t] - Extract links, images and titles from each URL in one pass
+
+        For each URL in the list, fetch the page and parse it once, collecting <a href=...> links (-a) and <img src=...> sources (-i) in document order. They are added to the URL list with the original URL as the referrer, and the original URL is removed.
+        If neither -a nor -i is given, both kinds are extracted.
+        If -t is given, the title of each page is printed as well.
+        Pages are fetched in parallel (see the download_concurrency, host_rate_limit and host_concurrency settings) while earlier pages are parsed, and results are printed in list order.
+        If the parse_workers setting is nonzero, pages are parsed by that many worker processes.
+        """
+    )
+
+    def run(self, args: list[str], url_list: URLList, settings: Any = None) -> URLList:
+        """
+        Return a new list of URLs extracted from the selected tags, with the original URL as referrer.
+
+        :param args: Any of '-a' (anchors), '-i' (images) and '-t' (print titles).
+        :param url_list: List of URL objects to process.
+        :param settings: The AppSettings object.
+        :return: A new list of URL objects extracted from the pages, each with the original URL as referrer.
+        :raises CommandError: If an argument is unknown.
+        """
+        return new_like(url_list, self.stream(args, url_list, settings))
+
+    def stream(
+        self, args: list[str], urls: Iterable[URL], settings: Any = None
+    ) -> Iterator[URL]:
+        """
+        Yield the URLs extracted from the selected tags of each page, as the pages are fetched.
+
+        :param args: Any of '-a' (anchors), '-i' (images) and '-t' (print titles).
+        :param urls: The URLs of the pages.
+        :param settings: The AppSettings object.
+        :return: An iterator over the extracted URLs, each with its page's URL as referrer.
+        :raises CommandError: If an argument is unknown.
+        """
+        unknown = [arg for arg in args if arg not in ("-a", "-i", "-t")]
+        if unknown:
+            raise CommandError(f"Unknown argument: {unknown[0]}")
+        tags = tuple(tag for tag, flag in (("a", "-a"), ("img", "-i")) if flag in args)
+        tags = tags or tuple(parse.LINK_ATTRS)
+        show_title = "-t" in args
+        transport.configure(settings)
+        pagecache.configure(settings)
+        parse.configure(settings)
+        jobs = getattr(settings, "download_concurrency", 1)
+        return extract_urls(urls, tags, show_title, jobs)
+
+
+def extract_urls(
+    urls: Iterable[URL], tags: tuple[str, ...], show_title: bool, jobs: int
+) -> Iterator[URL]:
+    """
+    Fetch each page and yield the URLs found in the given tags, printing progress in input order.
+
+    This is the pipeline shared by extract, href and img.
+
+    :param urls: The URLs of the pages.
+    :param tags: The names of the tags to extract links from.
+    :param show_title: If True, also print each page's title.
+    :param jobs: Maximum number of concurrent fetches.
+    :return: An iterator over the extracted URLs.
+    """
+    # The progress copy of the work only buffers the items being fetched or parsed
+    work, progress = itertools.tee((url, RetryLog()) for url in urls)
+    # Fetching and parsing run as a pipeline of lazy stages: pages are
+    # fetched in the background while earlier ones are parsed, and each
+    # stage only runs a bounded distance ahead of the one consuming it.
+    pages = scheduler().imap(
+        lambda item: pagecache.fetch_page(item[0], item[1]),
+        work,
+        jobs,
+        key=lambda item: url_host(item[0].url),
+    )
+    results = parse.imap_links_and_titles(pages, tags)
+    for (url, retries), result in zip(progress, results):
+        try:
+            links, title = result.result()
+        except Exception as e:
+            notes = ["Error:", retries.summary(), str(e)]
+            print(f"{url.url} -> {' '.join(filter(None, notes))}")
+            continue
+        # Every link from a page shares one interned headers mapping
+        referer = intern_headers({"Referer": url.url})
+        notes = [f"{len(links)} found", retries.summary()]
+        print(f"{url.url} -> {' '.join(filter(None, notes))}")
+        if show_title:
+            print(f"  title: {title if title is not None else 'No title found'}")
+        yield from (URL(link, referer) for link in links)
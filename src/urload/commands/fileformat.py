@@ -1,10 +1,10 @@
 """fileformat - Get or set the filename template used for saving URLs."""
 
 import textwrap
-from typing import Any
 
 from urload.commands.base import Command, CommandError
 from urload.settings import AppSettings
+from urload.urlstore import URLList
 
 
 class FileformatCommand(Command):
@@ -31,9 +31,7 @@ class FileformatCommand(Command):
     """
     )
 
-    def run(
-        self, args: list[str], url_list: list[Any], settings: AppSettings
-    ) -> list[Any]:
+    def run(self, args: list[str], url_list: URLList, settings: AppSettings) -> URLList:
         """
         Get or set the filename template in settings.
 
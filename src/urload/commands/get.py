@@ -4,15 +4,29 @@ get - Download each URL in the list to a file in the current directory.
 Each file is named after the final component of the URL path, excluding query parameters.
 """
 
+import itertools
+import json
 import os
+import re
 import textwrap
+from collections.abc import Iterable, Iterator, Mapping
 from datetime import datetime
 from pathlib import PurePath
 from urllib.parse import unquote, urlparse
 
-from urload.commands.base import Command
+from urload import transport
+from urload.commands.base import Command, CommandError
+from urload.frontier import Frontier, FrontierItem
+from urload.retry import RetryLog
+from urload.scheduler import Cancelled, cancellation, scheduler, url_host
 from urload.settings import AppSettings
 from urload.url import URL
+from urload.urlstore import URLList, new_like
+
+HTTP_PARTIAL_CONTENT = 206
+HTTP_RANGE_NOT_SATISFIABLE = 416
+# Name of the download queue in the session directory
+FRONTIER_FILE = "get-frontier.sqlite"
 
 # Module-level variable to persist index across GetCommand invocations
 _get_index = 0
@@ -23,61 +37,449 @@ class GetCommand(Command):
 
     name = "get"
     description = textwrap.dedent("""
-    get [-n] - Download each URL in the list to a file in the current directory.
+    get [-n] [-j <jobs>] - Download each URL in the list to a file in the current directory.
+    get --resume <session> [-j <jobs>] - Finish an interrupted get.
 
     Each file is named after the final component of the URL path, excluding query parameters.
+    Interrupted downloads are kept as .part files next to their output file and resumed the next time the same URL is downloaded to the same file (for example with --resume).
     If -n is given, perform a dry run: print the index, URL, and filename for each URL, but do not download anything.
+    If -j is given, download up to <jobs> URLs in parallel (default: the download_concurrency setting).
+    Downloads are spread across hosts, and each host is limited by the host_rate_limit and host_concurrency settings.
+    Indices are assigned in list order and progress is printed in list order regardless of which download finishes first.
+    Transient failures are retried according to the retry_* settings, and the progress line notes any retries.
+    The whole list is queued on disk in the session directory before downloading starts, and the downloads are taken from the queue in batches of frontier_batch_size, so that even a very large list is never held in memory at once. If get is interrupted, the queue is kept, and --resume downloads the URLs that had not finished, into the same files; <session> is the number of the session directory (e.g. 0003). The queue is removed when get completes.
     """)
 
-    def run(
-        self, args: list[str], url_list: list[URL], settings: AppSettings
-    ) -> list[URL]:
+    def run(self, args: list[str], url_list: URLList, settings: AppSettings) -> URLList:
         """
         Download each URL to a file named after the final path component, or perform a dry run.
 
         :param args: List of command-line arguments. If '-n' is present, do a dry run.
+            '-j <jobs>' sets the number of parallel downloads.
         :param url_list: List of URLs to download.
         :param settings: The AppSettings object.
         :return: List of URLs that failed to download, or the original list if dry run.
+        :raises CommandError: If the arguments are invalid.
         """
         global _get_index  # noqa: PLW0603
-        dry_run = "-n" in args
-        time_fmt = getattr(settings, "time_format", "%Y%m%d%H%M%S")
-        template = getattr(settings, "filename_template", "{timestamp}_{filename}")
-        now_str = datetime.now().strftime(time_fmt)
-
-        # Determine session directory
-        session_dir = f"{settings.session_dir_num:04d}"
-        if not os.path.exists(session_dir):
-            os.makedirs(session_dir)
-
-        current_index = _get_index
+        dry_run, jobs, resume = self._parse_args(args, settings)
+        chunk_size = getattr(settings, "download_chunk_size", 64 * 1024)
+        batch_size = getattr(settings, "frontier_batch_size", 256)
+        if resume is not None:
+            try:
+                frontier = Frontier(os.path.join(resume, FRONTIER_FILE), resume=True)
+            except FileNotFoundError:
+                raise CommandError(f"No interrupted get in {resume}.")
+            transport.configure(settings)
+            return _get_all(frontier, None, jobs, chunk_size, batch_size)
 
+        naming = _naming(settings)
         if dry_run:
+            current_index = _get_index
             for url in url_list:
-                fname = build_filename(template, now_str, url.url, current_index)
+                fname = build_filename(naming[1], naming[2], url.url, current_index)
                 print(f"[{current_index}] {url.url} {fname}")
                 current_index += 1
             return url_list
 
-        failed: list[URL] = []
-        for url in url_list:
-            fname = build_filename(template, now_str, url.url, current_index)
-            out_path = os.path.join(session_dir, fname)
-            try:
-                print(f"[{current_index}] {url.url} -> {out_path}", end="", flush=True)
-                resp = url.get()
-                resp.raise_for_status()
-                with open(out_path, "wb") as f:
-                    f.write(resp.content)
-                print(" [ok]")
-            except Exception as e:
-                print(f"Failed to download {url}: {e}")
-                failed.append(url)
-                print(" [FAILED]")
-            current_index += 1
-        _get_index = current_index
-        return failed
+        transport.configure(settings)
+        # Reserve the indices up front so that filenames do not depend on the
+        # order in which parallel downloads complete.
+        first = _get_index
+        _get_index += len(url_list)
+        frontier = Frontier(os.path.join(naming[0], FRONTIER_FILE))
+        # Every URL is queued, so that --resume can finish the whole list. The
+        # list is read one URL at a time, so lazy ranges are not materialized.
+        failed = _queue(frontier, url_list, first, naming)
+        failed += _get_all(frontier, (first, url_list), jobs, chunk_size, batch_size)
+        return new_like(url_list, failed)
+
+    def stream(
+        self, args: list[str], urls: Iterable[URL], settings: AppSettings
+    ) -> Iterator[URL]:
+        """
+        Download URLs as they arrive, a batch of frontier_batch_size at a time.
+
+        Each batch is queued in the session directory before it is downloaded,
+        so an interrupted pipeline can be finished with --resume, although URLs
+        the previous stage had not produced yet are not queued.
+
+        :param args: As for :meth:`run`.
+        :param urls: The URLs to download.
+        :param settings: The AppSettings object.
+        :return: An iterator over the URLs that failed to download, or over
+            all the URLs if dry run.
+        :raises CommandError: If the arguments are invalid.
+        """
+        dry_run, jobs, resume = self._parse_args(args, settings)
+        if resume is not None:
+            return super().stream(args, urls, settings)
+        session_dir, template, now_str = _naming(settings)
+        if dry_run:
+            return _dry_run(urls, template, now_str)
+        transport.configure(settings)
+        return _get_stream(
+            urls,
+            (session_dir, template, now_str),
+            jobs,
+            getattr(settings, "download_chunk_size", 64 * 1024),
+            getattr(settings, "frontier_batch_size", 256),
+        )
+
+    @staticmethod
+    def _parse_args(
+        args: list[str], settings: AppSettings
+    ) -> tuple[bool, int, str | None]:
+        """
+        Parse the get command arguments.
+
+        :param args: List of command-line arguments.
+        :param settings: The AppSettings object.
+        :return: A tuple of (dry_run, jobs, session to resume or None).
+        :raises CommandError: If an argument is unknown or the job count is invalid.
+        """
+        dry_run = False
+        resume = None
+        jobs_arg: str | int = getattr(settings, "download_concurrency", 1)
+        remaining = list(args)
+        while remaining:
+            arg = remaining.pop(0)
+            if arg == "-n":
+                dry_run = True
+            elif arg == "-j":
+                if not remaining:
+                    raise CommandError("-j requires a number of jobs.")
+                jobs_arg = remaining.pop(0)
+            elif arg.startswith("-j"):
+                jobs_arg = arg[2:]
+            elif arg == "--resume":
+                if not remaining:
+                    raise CommandError("--resume requires a session directory.")
+                resume = remaining.pop(0)
+            else:
+                raise CommandError(f"Unknown argument: {arg}")
+        try:
+            jobs = int(jobs_arg)
+        except ValueError:
+            raise CommandError(f"Invalid number of jobs: {jobs_arg}")
+        if jobs < 1:
+            raise CommandError("Number of jobs must be at least 1.")
+        if dry_run and resume is not None:
+            raise CommandError("-n cannot be used with --resume.")
+        return dry_run, jobs, resume
+
+
+def _naming(settings: AppSettings) -> tuple[str, str, str]:
+    """
+    Return what the names of downloaded files are built from, creating the session directory.
+
+    :param settings: The AppSettings object.
+    :return: A tuple of (session directory, filename template, timestamp).
+    """
+    time_fmt = getattr(settings, "time_format", "%Y%m%d%H%M%S")
+    template = getattr(settings, "filename_template", "{timestamp}_{filename}")
+    now_str = datetime.now().strftime(time_fmt)
+    session_dir = f"{settings.session_dir_num:04d}"
+    if not os.path.exists(session_dir):
+        os.makedirs(session_dir)
+    return session_dir, template, now_str
+
+
+def _dry_run(urls: Iterable[URL], template: str, now_str: str) -> Iterator[URL]:
+    """
+    Print the index, URL and filename each URL would be downloaded to, and pass it on.
+
+    :param urls: The URLs.
+    :param template: The filename template.
+    :param now_str: The timestamp for the filenames.
+    :return: An iterator over the URLs.
+    """
+    index = _get_index
+    for url in urls:
+        print(
+            f"[{index}] {url.url} {build_filename(template, now_str, url.url, index)}"
+        )
+        index += 1
+        yield url
+
+
+def _queue(
+    frontier: Frontier,
+    urls: Iterable[URL],
+    first: int,
+    naming: tuple[str, str, str],
+) -> list[URL]:
+    """
+    Queue downloads, numbering the URLs from an index.
+
+    The queue is keyed by output file, so a URL whose file another URL of the
+    same get already downloads to is not queued; it is reported as failed.
+
+    :param frontier: The queue of downloads.
+    :param urls: The URLs to queue.
+    :param first: The index of the first URL.
+    :param naming: The session directory, filename template and timestamp.
+    :return: The URLs that were not queued because of a clash.
+    """
+    session_dir, template, now_str = naming
+    clashes: list[URL] = []
+    for index, url in enumerate(urls, first):
+        out_path = os.path.join(
+            session_dir, build_filename(template, now_str, url.url, index)
+        )
+        if not frontier.add(out_path, url, data=json.dumps([index, out_path])):
+            print(
+                f"[{index}] {url.url} -> {out_path} [FAILED]"
+                " Another URL in this get is saved to the same file."
+            )
+            clashes.append(url)
+    frontier.commit()
+    return clashes
+
+
+def _get_stream(
+    urls: Iterable[URL],
+    naming: tuple[str, str, str],
+    jobs: int,
+    chunk_size: int,
+    batch_size: int,
+) -> Iterator[URL]:
+    """
+    Queue and download URLs a batch at a time, yielding those that fail.
+
+    Indices are reserved a batch at a time, in input order. The queue is
+    kept in the session directory until the input is exhausted and every URL
+    has been attempted.
+
+    :param urls: The URLs to download.
+    :param naming: The session directory, filename template and timestamp.
+    :param jobs: Maximum number of concurrent downloads.
+    :param chunk_size: Number of bytes to read from the network at a time.
+    :param batch_size: Number of URLs to queue and download at a time.
+    :return: An iterator over the URLs that failed to download.
+    """
+    global _get_index  # noqa: PLW0603
+    frontier = Frontier(os.path.join(naming[0], FRONTIER_FILE))
+    completed = False
+    try:
+        for chunk in itertools.batched(urls, batch_size):
+            first = _get_index
+            _get_index += len(chunk)
+            yield from _queue(frontier, chunk, first, naming)
+            while batch := frontier.take(batch_size):
+                yield from _get_batch(
+                    frontier, batch, (first, list(chunk)), jobs, chunk_size
+                )
+        completed = True
+    finally:
+        frontier.close(remove=completed)
+
+
+def _get_all(
+    frontier: Frontier,
+    source: tuple[int, URLList] | None,
+    jobs: int,
+    chunk_size: int,
+    batch_size: int,
+) -> list[URL]:
+    """
+    Download the URLs queued in a frontier, a batch at a time.
+
+    The frontier is removed once every URL has been attempted, and kept if the
+    downloads are interrupted so that they can be resumed.
+
+    :param frontier: The queue of downloads.
+    :param source: The index of the first URL and the list the downloads were
+        queued from, whose URL objects are used directly; None when resuming.
+    :param jobs: Maximum number of concurrent downloads.
+    :param chunk_size: Number of bytes to read from the network at a time.
+    :param batch_size: Number of downloads to take from the frontier at a time.
+    :return: List of URLs that failed to download.
+    """
+    failed: list[URL] = []
+    completed = False
+    try:
+        while batch := frontier.take(batch_size):
+            failed.extend(_get_batch(frontier, batch, source, jobs, chunk_size))
+        completed = True
+    finally:
+        frontier.close(remove=completed)
+    return failed
+
+
+def _get_batch(
+    frontier: Frontier,
+    batch: list[FrontierItem],
+    source: tuple[int, URLList] | None,
+    jobs: int,
+    chunk_size: int,
+) -> list[URL]:
+    """
+    Download a batch of URLs in parallel and print their progress in order.
+
+    :param frontier: The queue the batch was taken from; each item is marked finished.
+    :param batch: The downloads to perform.
+    :param source: As for :func:`_get_all`.
+    :param jobs: Maximum number of concurrent downloads.
+    :param chunk_size: Number of bytes to read from the network at a time.
+    :return: List of URLs that failed to download.
+    """
+    work: list[tuple[URL, str, RetryLog]] = []
+    indices: list[int] = []
+    for item in batch:
+        entry = json.loads(item.data)
+        index: int = entry[0]
+        out_path: str = entry[1]
+        url = item.url if source is None else source[1][index - source[0]]
+        work.append((url, out_path, RetryLog()))
+        indices.append(index)
+    failed: list[URL] = []
+    results = scheduler().imap(
+        lambda entry: _download(*entry, chunk_size),
+        work,
+        jobs,
+        key=lambda entry: url_host(entry[0].url),
+    )
+    for item, index, (url, out_path, retries), result in zip(
+        batch, indices, work, results
+    ):
+        try:
+            notes = [result.result(), retries.summary()]
+            status = " ".join(["[ok]", *filter(None, notes)])
+            frontier.finish(item)
+        except Exception as e:
+            status = " ".join(filter(None, ["[FAILED]", retries.summary(), str(e)]))
+            frontier.finish(item, failed=True)
+            failed.append(url)
+        print(f"[{index}] {url.url} -> {out_path} {status}")
+    return failed
+
+
+def _download(url: URL, out_path: str, retries: RetryLog, chunk_size: int) -> str:
+    """
+    Stream a single URL to a file, resuming an earlier partial download if possible.
+
+    The body is written to ``out_path`` plus ``.part``, so downloads to
+    different files never share a partial file, even of the same URL. The URL
+    is recorded next to it, and a partial file of a different URL is not
+    continued. If a partial file exists, only the remaining bytes are
+    requested using ``Range``, guarded by ``If-Range`` so that a changed
+    resource is fetched in full. A server that ignores the range sends the whole body, which replaces
+    the partial file. If the server cannot continue from the end of the
+    partial file (416, or a range starting elsewhere), the partial file is
+    dropped and the URL is fetched in full. On failure the ``.part`` file is kept if the server
+    supplied a validator (ETag or Last-Modified); otherwise it is removed.
+    If the download is cancelled (e.g. by Ctrl-C), the response is closed and
+    the download stops at the next chunk.
+
+    :param url: The URL to download.
+    :param out_path: Path of the file to write.
+    :param retries: Log that records any retries of the request.
+    :param chunk_size: Number of bytes to read from the network at a time.
+    :return: A note for the progress line, empty unless the download was resumed.
+    :raises Exception: If the request fails or returns an error status.
+    """
+    part_path = out_path + ".part"
+    meta_path = part_path + ".json"
+    validator = _load_validator(meta_path, url.url)
+    offset = (
+        os.path.getsize(part_path) if validator and os.path.exists(part_path) else 0
+    )
+    extra_headers: dict[str, str] = {}
+    if validator and offset:
+        extra_headers = {"Range": f"bytes={offset}-", "If-Range": validator}
+    resp = url.get(stream=True, extra_headers=extra_headers, on_retry=retries)
+    try:
+        resumed = resp.status_code == HTTP_PARTIAL_CONTENT
+        if extra_headers and (
+            resp.status_code == HTTP_RANGE_NOT_SATISFIABLE
+            or (
+                resumed
+                and _range_start(resp.headers.get("Content-Range", "")) != offset
+            )
+        ):
+            # The partial file cannot be continued; start over from scratch.
+            resp.close()
+            _remove(part_path, meta_path)
+            return _download(url, out_path, retries, chunk_size)
+        resp.raise_for_status()
+        if resumed and not extra_headers:
+            raise Exception("Partial content sent for a request without Range")
+        if not resumed:
+            validator = _response_validator(resp.headers)
+            if validator:
+                with open(meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"url": url.url, "validator": validator}, f)
+            else:
+                _remove(meta_path)
+        cancel = cancellation()
+        try:
+            with cancel.track(resp), open(part_path, "ab" if resumed else "wb") as f:
+                for chunk in resp.iter_content(chunk_size):
+                    if cancel.cancelled:
+                        raise Cancelled()
+                    f.write(chunk)
+        except BaseException:
+            if not validator:
+                _remove(part_path, meta_path)
+            raise
+    finally:
+        resp.close()
+    os.replace(part_path, out_path)
+    _remove(meta_path)
+    return f"(resumed at byte {offset})" if resumed else ""
+
+
+def _load_validator(meta_path: str, url: str) -> str | None:
+    """
+    Return the validator saved alongside a partial download, if any.
+
+    :param meta_path: Path of the partial download's metadata file.
+    :param url: The URL being downloaded.
+    :return: The ETag or Last-Modified value, or None if unavailable.
+    """
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(meta, dict) or meta.get("url") != url:  # type: ignore
+        return None
+    validator = meta.get("validator")  # type: ignore
+    return validator if isinstance(validator, str) else None
+
+
+def _response_validator(headers: Mapping[str, str]) -> str | None:
+    """
+    Return a validator suitable for ``If-Range`` from response headers.
+
+    Weak ETags cannot be used with ``If-Range``, so Last-Modified is used instead.
+
+    :param headers: The response headers.
+    :return: A strong ETag, a Last-Modified date, or None.
+    """
+    etag = headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return headers.get("Last-Modified")
+
+
+def _range_start(content_range: str) -> int | None:
+    """
+    Return the first byte position from a ``Content-Range`` header.
+
+    :param content_range: The header value (e.g., "bytes 100-199/200").
+    :return: The start position, or None if the header cannot be parsed.
+    """
+    match = re.match(r"bytes\s+(\d+)-", content_range)
+    return int(match.group(1)) if match else None
+
+
+def _remove(*paths: str) -> None:
+    """Remove the given files, ignoring any that do not exist."""
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
 
 
 def build_filename(template: str, time: str, url: str, index: int) -> str:
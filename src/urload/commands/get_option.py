@@ -8,7 +8,7 @@ import textwrap
 
 from urload.commands.base import Command, CommandError
 from urload.settings import AppSettings
-from urload.url import URL
+from urload.urlstore import URLList
 
 
 class GetOptionCommand(Command):
@@ -28,9 +28,7 @@ class GetOptionCommand(Command):
     Print all application settings as key=value, or a single key if specified.
     """)
 
-    def run(
-        self, args: list[str], url_list: list[URL], settings: AppSettings
-    ) -> list[URL]:
+    def run(self, args: list[str], url_list: URLList, settings: AppSettings) -> URLList:
         """Print all settings as key=value, or a single key if specified."""
         valid_keys = set(AppSettings.model_fields.keys())
         if not args:
@@ -1,10 +1,13 @@
 """Implements the 'head' command for URLoad."""
 
+import itertools
 import textwrap
+from collections.abc import Iterable, Iterator
 from typing import Any
 
 from urload.commands.base import Command, CommandError
 from urload.url import URL
+from urload.urlstore import URLList
 
 
 class HeadCommand(Command):
@@ -17,19 +20,33 @@ class HeadCommand(Command):
     This command keeps only the first n URLs in the list, discarding the rest.
     """)
 
-    def run(
-        self, args: list[str], url_list: list[URL], settings: Any = None
-    ) -> list[URL]:
+    def run(self, args: list[str], url_list: URLList, settings: Any = None) -> URLList:
         """Keep the first n URLs from the list."""
+        return url_list[: self._count(args)]
+
+    def stream(
+        self, args: list[str], urls: Iterable[URL], settings: Any = None
+    ) -> Iterator[URL]:
+        """
+        Pass on the first n URLs, and stop reading the previous stage after them.
+
+        :param args: The count n.
+        :param urls: The URLs produced by the previous stage.
+        :param settings: Unused.
+        :return: An iterator over the first n URLs.
+        :raises CommandError: If the count is missing or invalid.
+        """
+        return itertools.islice(urls, self._count(args))
+
+    @staticmethod
+    def _count(args: list[str]) -> int:
+        """Parse the count argument, raising CommandError if it is missing or invalid."""
         if not args:
             raise CommandError("No count provided.")
-
         try:
             n = int(args[0])
         except ValueError:
             raise CommandError("Invalid count. Must be an integer.")
-
         if n < 0:
             raise CommandError("Count must be non-negative.")
-
-        return url_list[:n]
+        return n
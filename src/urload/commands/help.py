@@ -5,7 +5,7 @@ import textwrap
 from typing import Any
 
 from urload.commands.base import Command
-from urload.url import URL
+from urload.urlstore import URLList
 
 
 class HelpCommand(Command):
@@ -23,9 +23,7 @@ class HelpCommand(Command):
         """Initialize HelpCommand with a command registry."""
         self.commands = commands
 
-    def run(
-        self, args: list[str], url_list: list[URL], settings: Any = None
-    ) -> list[URL]:
+    def run(self, args: list[str], url_list: URLList, settings: Any = None) -> URLList:
         """Show help for all commands or a specific command."""
         if not args:
             print("Available commands:")
@@ -1,13 +1,14 @@
 """Extracts all anchor links from each URL in the list and adds them to the URL list with the original URL as the referrer."""
 
 import textwrap
+from collections.abc import Iterable, Iterator
 from typing import Any
-from urllib.parse import urljoin
-
-from bs4 import BeautifulSoup
 
+from urload import pagecache, parse, transport
 from urload.commands.base import Command, CommandError
+from urload.commands.extract import extract_urls
 from urload.url import URL
+from urload.urlstore import URLList, new_like
 
 
 class HrefCommand(Command):
@@ -19,42 +20,39 @@ class HrefCommand(Command):
         href - Extract anchor links from each URL
 
         For each URL in the list, fetch the page, extract all <a href=...> links, and add them to the URL list with the original URL as the referrer. The original URL is removed from the list.
+        Pages are fetched in parallel (see the download_concurrency, host_rate_limit and host_concurrency settings) while earlier pages are parsed, and results are printed in list order.
+        If the parse_workers setting is nonzero, pages are parsed by that many worker processes.
         """
     )
 
-    def run(
-        self, args: list[str], url_list: list[URL], settings: Any = None
-    ) -> list[URL]:
+    def run(self, args: list[str], url_list: URLList, settings: Any = None) -> URLList:
         """
         Return a new list of URLs extracted from anchor tags, with the original URL as referrer.
 
         :param args: List of command-line arguments (must be empty).
         :param url_list: List of URL objects to process.
+        :param settings: The AppSettings object.
         :return: A new list of URL objects extracted from anchor tags, each with the original URL as referrer.
         :raises CommandError: If arguments are provided or a user-facing error occurs.
         """
+        return new_like(url_list, self.stream(args, url_list, settings))
+
+    def stream(
+        self, args: list[str], urls: Iterable[URL], settings: Any = None
+    ) -> Iterator[URL]:
+        """
+        Yield the URLs extracted from anchor tags of each page, as the pages are fetched.
+
+        :param args: List of command-line arguments (must be empty).
+        :param urls: The URLs of the pages.
+        :param settings: The AppSettings object.
+        :return: An iterator over the extracted URLs, each with its page's URL as referrer.
+        :raises CommandError: If arguments are provided.
+        """
         if args:
             raise CommandError("href command takes no arguments.")
-        new_urls: list[URL] = []
-        for url in url_list:
-            try:
-                print(f"{url.url} -> ", end="", flush=True)
-                resp = url.get()
-                resp.raise_for_status()
-            except Exception as e:
-                print(f"Error: {e}")
-                continue
-            soup = BeautifulSoup(resp.text, "html.parser")
-            found = 0
-            for a in soup.find_all("a", href=True):
-                href = getattr(a, "get", None)
-                if not callable(href):
-                    continue
-                href_val = href("href")
-                if not isinstance(href_val, str):
-                    continue
-                full_url = urljoin(url.url, href_val)
-                new_urls.append(URL(full_url, headers={"Referer": url.url}))
-                found += 1
-            print(f"{found} found")
-        return new_urls
+        transport.configure(settings)
+        pagecache.configure(settings)
+        parse.configure(settings)
+        jobs = getattr(settings, "download_concurrency", 1)
+        return extract_urls(urls, ("a",), show_title=False, jobs=jobs)
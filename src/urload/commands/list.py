@@ -4,7 +4,7 @@ import textwrap
 from typing import Any
 
 from urload.commands.base import Command, CommandError
-from urload.url import URL
+from urload.urlstore import URLList
 
 
 class ListCommand(Command):
@@ -19,9 +19,7 @@ class ListCommand(Command):
     If no range is specified, it prints all URLs.
     """)
 
-    def run(
-        self, args: list[str], url_list: list[URL], settings: Any = None
-    ) -> list[URL]:
+    def run(self, args: list[str], url_list: URLList, settings: Any = None) -> URLList:
         """
         Print each URL in the list with its index, or a specified range.
 
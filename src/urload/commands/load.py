@@ -5,6 +5,7 @@ from typing import Any
 
 from urload.commands.base import Command, CommandError
 from urload.url import URL
+from urload.urlstore import URLList, concat
 
 
 class LoadCommand(Command):
@@ -19,9 +20,7 @@ class LoadCommand(Command):
         """
     )
 
-    def run(
-        self, args: list[str], url_list: list[URL], settings: Any = None
-    ) -> list[URL]:
+    def run(self, args: list[str], url_list: URLList, settings: Any = None) -> URLList:
         """
         Load URLs from a file, appending to the current list.
 
@@ -49,4 +48,4 @@ class LoadCommand(Command):
                 raise CommandError(f"Error parsing line {i}: {e}")
             new_urls.append(url)
         print(f"Loaded {len(new_urls)} URLs from {filename}.")
-        return url_list + new_urls
+        return concat(url_list, new_urls)
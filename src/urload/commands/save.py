@@ -4,7 +4,7 @@ import textwrap
 from typing import Any
 
 from urload.commands.base import Command, CommandError
-from urload.url import URL
+from urload.urlstore import URLList
 
 
 class SaveCommand(Command):
@@ -19,9 +19,7 @@ class SaveCommand(Command):
         """
     )
 
-    def run(
-        self, args: list[str], url_list: list[URL], settings: Any = None
-    ) -> list[URL]:
+    def run(self, args: list[str], url_list: URLList, settings: Any = None) -> URLList:
         """
         Save URLs to a file.
 
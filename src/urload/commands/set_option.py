@@ -2,13 +2,16 @@
 set-option <key>=<value> - Set an application setting.
 
 Set an application setting (such as filename_template) to a new value. The change is saved to the config file.
+Setting url_store moves the current URL list into a container of the new kind.
 """
 
 import textwrap
 
+from pydantic import ValidationError
+
 from urload.commands.base import Command, CommandError
 from urload.settings import AppSettings
-from urload.url import URL
+from urload.urlstore import URLList, convert
 
 
 class SetOptionCommand(Command):
@@ -16,7 +19,7 @@ class SetOptionCommand(Command):
     Set an application setting to a new value.
 
     :param args: Should be a single argument of the form key=value.
-    :param url_list: Not used.
+    :param url_list: The current URL list, converted if url_store changes.
     :param settings: The AppSettings object.
     :raises CommandError: If the argument is missing or invalid.
     """
@@ -26,11 +29,10 @@ class SetOptionCommand(Command):
     set-option <key>=<value> - Set an application setting.
 
     Set an application setting (such as filename_template) to a new value. The change is saved to the config file.
+    Setting url_store moves the current URL list into a container of the new kind.
     """)
 
-    def run(
-        self, args: list[str], url_list: list[URL], settings: AppSettings
-    ) -> list[URL]:
+    def run(self, args: list[str], url_list: URLList, settings: AppSettings) -> URLList:
         """Set a setting from key=value argument. Does not save to disk."""
         if len(args) != 1 or "=" not in args[0]:
             raise CommandError("Usage: set-option <key>=<value>")
@@ -40,6 +42,12 @@ class SetOptionCommand(Command):
         valid_keys = set(AppSettings.model_fields.keys())
         if key not in valid_keys:
             raise CommandError(f"Unknown setting: {key}")
-        setattr(settings, key, value)
+        old_value = getattr(settings, key)
+        try:
+            setattr(settings, key, value)
+        except ValidationError as e:
+            raise CommandError(f"Invalid value for {key}: {e.errors()[0]['msg']}")
         print(f"{key} set to {value}")
+        if key == "url_store" and settings.url_store != old_value:
+            return convert(url_list, settings)
         return url_list
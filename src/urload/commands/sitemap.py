@@ -0,0 +1,184 @@
+"""Implements the 'sitemap' command for URLoad."""
+
+import itertools
+import textwrap
+import zlib
+from collections.abc import Iterable, Iterator
+from typing import Any, cast
+from urllib.parse import urljoin, urlparse
+from xml.etree.ElementTree import Element, XMLPullParser
+
+from urload import transport
+from urload.commands.base import Command, CommandError
+from urload.retry import RetryLog
+from urload.scheduler import scheduler, url_host
+from urload.url import URL
+from urload.urlstore import URLList, concat
+
+GZIP_MAGIC = b"\x1f\x8b"
+# Maximum number of bytes decompressed from each piece of a gzipped sitemap
+DECOMPRESS_CHUNK = 256 * 1024
+# Elements of a sitemap (<url>) and of a sitemap index (<sitemap>) holding a <loc>
+_ENTRY_TAGS = {"url", "sitemap"}
+
+
+class SitemapCommand(Command):
+    """Adds the URLs listed in a sitemap, following sitemap indexes."""
+
+    name = "sitemap"
+    description = textwrap.dedent("""
+    sitemap <url> - Add the URLs listed in a sitemap to the list.
+
+    The sitemap at <url> is fetched and the <loc> of each of its <url> entries is added to the list. If it is a sitemap index, the sitemaps it lists are fetched in turn, in parallel (see the download_concurrency, host_rate_limit and host_concurrency settings), and so on for nested indexes. Each sitemap is fetched at most once.
+    Sitemaps are parsed as they are downloaded, so even very large ones are never held in memory. Gzipped sitemaps (e.g. sitemap.xml.gz) are decompressed as they are parsed.
+    """)
+
+    def run(self, args: list[str], url_list: URLList, settings: Any = None) -> URLList:
+        """
+        Append the URLs listed in a sitemap (and any sitemaps it indexes) to the list.
+
+        :param args: The URL of the sitemap.
+        :param url_list: List of URL objects to extend.
+        :param settings: The AppSettings object.
+        :return: The list with the sitemap's URLs appended.
+        :raises CommandError: If the arguments are invalid.
+        """
+        if len(args) != 1:
+            raise CommandError("Usage: sitemap <url>")
+        if urlparse(args[0]).scheme not in ("http", "https"):
+            raise CommandError(f"Invalid sitemap URL: {args[0]}")
+        transport.configure(settings)
+        jobs = getattr(settings, "download_concurrency", 1)
+        chunk_size = getattr(settings, "download_chunk_size", 64 * 1024)
+        found: list[URL] = []
+        seen = {args[0]}
+        level: list[str] = [args[0]]
+        while level:
+            work = [(URL(sitemap), RetryLog()) for sitemap in level]
+            results = scheduler().imap(
+                lambda item: _read_sitemap(item[0], item[1], chunk_size),
+                work,
+                jobs,
+                key=lambda item: url_host(item[0].url),
+            )
+            level = []
+            for (sitemap, retries), result in zip(work, results):
+                try:
+                    pages, children = result.result()
+                except Exception as e:
+                    notes = ["Error:", retries.summary(), str(e)]
+                    print(f"{sitemap.url} -> {' '.join(filter(None, notes))}")
+                    continue
+                found.extend(URL(page) for page in pages)
+                new = [child for child in children if child not in seen]
+                seen.update(new)
+                level.extend(new)
+                counts = [f"{len(pages)} URLs"]
+                if children:
+                    counts.append(f"{len(children)} sitemaps")
+                notes = [", ".join(counts), retries.summary()]
+                print(f"{sitemap.url} -> {' '.join(filter(None, notes))}")
+        print(f"Added {len(found)} URLs from sitemaps.")
+        return concat(url_list, found)
+
+
+def _read_sitemap(
+    url: URL, retries: RetryLog, chunk_size: int
+) -> tuple[list[str], list[str]]:
+    """
+    Stream a sitemap or sitemap index and collect the locations it lists.
+
+    :param url: The URL of the sitemap.
+    :param retries: Log that records any retries of the request.
+    :param chunk_size: Number of bytes to read from the network at a time.
+    :return: A tuple of (page URLs, sitemap URLs), resolved against the sitemap's URL.
+    :raises Exception: If the request fails or the sitemap is not well-formed XML.
+    """
+    pages: list[str] = []
+    sitemaps: list[str] = []
+    resp = url.get(stream=True, on_retry=retries)
+    try:
+        resp.raise_for_status()
+        for tag, loc in parse_sitemap(resp.iter_content(chunk_size)):
+            (pages if tag == "url" else sitemaps).append(urljoin(url.url, loc))
+    finally:
+        resp.close()
+    return pages, sitemaps
+
+
+def parse_sitemap(chunks: Iterable[bytes]) -> Iterator[tuple[str, str]]:
+    """
+    Incrementally parse a sitemap or sitemap index, which may be gzipped.
+
+    Each entry is discarded as soon as it has been parsed, so memory use does
+    not grow with the size of the sitemap.
+
+    :param chunks: The body of the sitemap, in pieces.
+    :return: An iterator of (tag, location) pairs, where tag is "url" for a
+        page and "sitemap" for a sitemap listed in an index.
+    :raises xml.etree.ElementTree.ParseError: If the body is not well-formed XML.
+    """
+    chunks = iter(chunks)
+    first = next(chunks, b"")
+    data: Iterable[bytes] = itertools.chain([first], chunks)
+    if first.startswith(GZIP_MAGIC):
+        data = _gunzip(data)
+    parser: XMLPullParser[Element] = XMLPullParser(events=("start", "end"))
+    parents: list[Element] = []
+    for chunk in data:
+        parser.feed(chunk)
+        yield from _entries(parser, parents)
+    parser.close()
+    yield from _entries(parser, parents)
+
+
+def _entries(
+    parser: "XMLPullParser[Element]", parents: list[Element]
+) -> Iterator[tuple[str, str]]:
+    """
+    Return the entries completed by the events read so far.
+
+    :param parser: The parser fed with the sitemap.
+    :param parents: The elements that are open, outermost first; completed
+        entries are removed from their parent to free them.
+    :return: An iterator of (tag, location) pairs.
+    """
+    # Only start and end events were requested, and both carry an element
+    events = cast(Iterator[tuple[str, Element]], parser.read_events())
+    for event, elem in events:
+        if event == "start":
+            parents.append(elem)
+            continue
+        parents.pop()
+        tag = _local_name(elem.tag)
+        if tag not in _ENTRY_TAGS:
+            continue
+        loc = next(
+            (child.text for child in elem if _local_name(child.tag) == "loc"), None
+        )
+        if loc and loc.strip():
+            yield tag, loc.strip()
+        if parents:
+            parents[-1].remove(elem)
+
+
+def _local_name(tag: str) -> str:
+    """Return an element's tag without its namespace."""
+    return tag.rpartition("}")[2]
+
+
+def _gunzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Decompress a gzip stream piece by piece.
+
+    :param chunks: The compressed data, in pieces.
+    :return: An iterator of pieces of decompressed data, each at most DECOMPRESS_CHUNK bytes.
+    :raises zlib.error: If the data is not a valid gzip stream.
+    """
+    decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = chunk
+        while data:
+            yield decompressor.decompress(data, DECOMPRESS_CHUNK)
+            data = decompressor.unconsumed_tail
+    yield decompressor.flush()
@@ -4,7 +4,7 @@ import textwrap
 from typing import Any
 
 from urload.commands.base import Command
-from urload.url import URL
+from urload.urlstore import URLList, sorted_by_url
 
 
 class SortCommand(Command):
@@ -19,10 +19,8 @@ class SortCommand(Command):
     """
     )
 
-    def run(
-        self, args: list[str], url_list: list[URL], settings: Any = None
-    ) -> list[URL]:
+    def run(self, args: list[str], url_list: URLList, settings: Any = None) -> URLList:
         """Sort the URLs in the list lexicographically by URL."""
-        sorted_list = sorted(url_list, key=lambda u: u.url)
+        sorted_list = sorted_by_url(url_list)
         print("Sorted URLs.")
         return sorted_list
@@ -4,7 +4,7 @@ import textwrap
 from typing import Any
 
 from urload.commands.base import Command, CommandError
-from urload.url import URL
+from urload.urlstore import URLList, new_like
 
 
 class TailCommand(Command):
@@ -17,9 +17,7 @@ class TailCommand(Command):
     This command keeps only the last n URLs in the list, discarding the rest.
     """)
 
-    def run(
-        self, args: list[str], url_list: list[URL], settings: Any = None
-    ) -> list[URL]:
+    def run(self, args: list[str], url_list: URLList, settings: Any = None) -> URLList:
         """Keep the last n URLs from the list."""
         if not args:
             raise CommandError("No count provided.")
@@ -32,4 +30,4 @@ class TailCommand(Command):
         if n < 0:
             raise CommandError("Count must be non-negative.")
 
-        return url_list[-n:] if n > 0 else []
+        return url_list[-n:] if n > 0 else new_like(url_list)
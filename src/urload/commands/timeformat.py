@@ -2,10 +2,10 @@
 
 import textwrap
 from datetime import datetime
-from typing import Any
 
 from urload.commands.base import Command, CommandError
 from urload.settings import AppSettings
+from urload.urlstore import URLList
 
 
 class TimeformatCommand(Command):
@@ -20,9 +20,7 @@ class TimeformatCommand(Command):
     Default: "%Y%m%d%H%M%S"
     """)
 
-    def run(
-        self, args: list[str], url_list: list[Any], settings: AppSettings
-    ) -> list[Any]:
+    def run(self, args: list[str], url_list: URLList, settings: AppSettings) -> URLList:
         """
         Get or set the current time format string in settings.
 
@@ -3,10 +3,16 @@
 import textwrap
 from typing import Any
 
-from bs4 import BeautifulSoup
-
+from urload import charset, pagecache, parse, transport
 from urload.commands.base import Command, CommandError
+from urload.pagecache import Page
+from urload.retry import RetryLog
+from urload.scheduler import scheduler, url_host
 from urload.url import URL
+from urload.urlstore import URLList
+
+# Bytes to read from the network at a time while looking for the title
+TITLE_CHUNK_SIZE = 8 * 1024
 
 
 class TitleCommand(Command):
@@ -17,39 +23,50 @@ class TitleCommand(Command):
     title [[m]-[n]] - Retrieve and display HTML titles from URLs in the current list.
 
     This command fetches each URL, extracts the HTML title, and prints it with its index.
+    Only the start of each page is read: reading stops at the end of the title or of the document head, or after title_max_bytes bytes.
+    Pages are fetched in parallel, limited by the download_concurrency, host_rate_limit and host_concurrency settings, and titles are printed in index order.
     If a range is specified (e.g., 0-4), it processes only those URLs.
     If no range is specified, it processes all URLs.
     """)
 
-    def run(
-        self, args: list[str], url_list: list[URL], settings: Any = None
-    ) -> list[URL]:
+    def run(self, args: list[str], url_list: URLList, settings: Any = None) -> URLList:
         """
         Fetch HTML titles from URLs and print them with their index.
 
         :param args: Optional range argument (see command description).
         :param url_list: List of URL objects to process.
+        :param settings: The AppSettings object.
         :return: The original list (unmodified).
         :raises CommandError: If the argument is invalid.
         """
+        max_bytes = getattr(settings, "title_max_bytes", 256 * 1024)
+        jobs = getattr(settings, "download_concurrency", 1)
 
         def print_titles(start: int, end: int) -> None:
             if start < 0 or end < 0 or start > end or end >= len(url_list):
                 raise CommandError("Invalid range argument.")
-            for idx in range(start, end + 1):
-                url = url_list[idx]
+            work = [(idx, url_list[idx], RetryLog()) for idx in range(start, end + 1)]
+            results = scheduler().imap(
+                lambda item: _fetch_title(item[1], item[2], max_bytes),
+                work,
+                jobs,
+                key=lambda item: url_host(item[1].url),
+            )
+            # Results arrive in index order, each as soon as it and all
+            # earlier ones are done.
+            for (idx, _, retries), result in zip(work, results):
                 try:
-                    response = url.get()
-                    response.raise_for_status()
-                    soup = BeautifulSoup(response.text, "html.parser")
-                    title_tag = soup.find("title")
-                    title = (
-                        title_tag.get_text().strip() if title_tag else "No title found"
+                    title = result.result() or "No title found"
+                    print(
+                        " ".join(filter(None, [f"{idx}: {title}", retries.summary()]))
                     )
-                    print(f"{idx}: {title}")
                 except Exception as e:
-                    print(f"{idx}: Error fetching title - {e}")
+                    note = retries.summary()
+                    note = f" {note}" if note else ""
+                    print(f"{idx}: Error fetching title{note} - {e}")
 
+        transport.configure(settings)
+        pagecache.configure(settings)
         if not args:
             print_titles(0, len(url_list) - 1) if url_list else None
             return url_list
@@ -80,3 +97,45 @@ class TitleCommand(Command):
             raise CommandError(
                 "Invalid argument format. Use a single index or a range (e.g., N, -N, N-, N-M)."
             )
+
+
+def _fetch_title(url: URL, retries: RetryLog, max_bytes: int) -> str | None:
+    """
+    Return the title of a page, reading no more of it than necessary.
+
+    A page in the page cache is used without fetching it. Otherwise the
+    response is streamed into a :class:`urload.parse.TitleParser`, and the
+    connection is closed as soon as the title is known or ``max_bytes`` have
+    been read. Pages that are read to the end are added to the page cache;
+    partial ones are not.
+
+    :param url: The URL of the page.
+    :param retries: Log that records any retries of the request.
+    :param max_bytes: Maximum number of bytes to read.
+    :return: The title, or None if the page has none.
+    :raises Exception: If the request fails or returns an error status.
+    """
+    parser = parse.TitleParser()
+    page = pagecache.cached_page(url)
+    if page is not None:
+        parser.feed(page.text)
+        parser.close()
+        return parser.title
+    resp = url.get(stream=True, on_retry=retries)
+    try:
+        resp.raise_for_status()
+        decoder = charset.StreamDecoder(charset.declared_encoding(resp.headers))
+        chunks: list[bytes] = []
+        size = 0
+        for chunk in resp.iter_content(TITLE_CHUNK_SIZE):
+            chunks.append(chunk)
+            size += len(chunk)
+            parser.feed(decoder.decode(chunk))
+            if parser.done or size >= max_bytes:
+                return parser.title
+        parser.feed(decoder.decode(b"", final=True))
+        parser.close()
+        pagecache.store_page(url, Page(url.url, b"".join(chunks), decoder.declared))
+        return parser.title
+    finally:
+        resp.close()
@@ -1,10 +1,13 @@
 """Implements the 'uniq' command for URLoad."""
 
 import textwrap
+from collections.abc import Iterable, Iterator, Sized
 from typing import Any
 
-from urload.commands.base import Command
+from urload.bloom import BloomFilter
+from urload.commands.base import Command, CommandError
 from urload.url import URL
+from urload.urlstore import URLList, new_like
 
 
 class UniqCommand(Command):
@@ -12,20 +15,61 @@ class UniqCommand(Command):
 
     name = "uniq"
     description = textwrap.dedent("""
-    uniq - Remove duplicate URLs, keeping only the first occurrence of each.
+    uniq [--approx] - Remove duplicate URLs, keeping only the first occurrence of each.
 
     This command removes duplicate URLs from the list, preserving order and keeping the first instance of each URL.
+    With --approx, the URLs seen are tracked in a Bloom filter, which uses far less memory on very large lists. A small fraction of unique URLs (set by the bloom_error_rate setting) may then be removed as duplicates.
     """)
 
-    def run(
-        self, args: list[str], url_list: list[URL], settings: Any = None
-    ) -> list[URL]:
-        """Remove duplicate URLs, keeping only the first occurrence."""
-        seen: set[str] = set()
-        unique_list: list[URL] = []
-        for url in url_list:
-            if url.url not in seen:
-                seen.add(url.url)
-                unique_list.append(url)
-        print(f"Removed {len(url_list) - len(unique_list)} duplicate URLs.")
-        return unique_list
+    def run(self, args: list[str], url_list: URLList, settings: Any = None) -> URLList:
+        """
+        Remove duplicate URLs, keeping only the first occurrence.
+
+        :param args: [] for exact de-duplication, or ['--approx'] to use a Bloom filter.
+        :param url_list: List of URL objects to process.
+        :param settings: The AppSettings object.
+        :return: The URLs with duplicates removed.
+        :raises CommandError: If an argument is unknown.
+        """
+        return new_like(url_list, self.stream(args, url_list, settings))
+
+    def stream(
+        self, args: list[str], urls: Iterable[URL], settings: Any = None
+    ) -> Iterator[URL]:
+        """
+        Pass on the first occurrence of each URL, as the URLs arrive.
+
+        :param args: [] for exact de-duplication, or ['--approx'] to use a Bloom filter.
+        :param urls: The URLs to de-duplicate.
+        :param settings: The AppSettings object.
+        :return: An iterator over the URLs with duplicates removed.
+        :raises CommandError: If an argument is unknown.
+        """
+        if args not in ([], ["--approx"]):
+            raise CommandError("Usage: uniq [--approx]")
+        seen: set[str] | BloomFilter = set()
+        if args:
+            # A list's size is known; a stream starts at the configured capacity
+            capacity = (
+                len(urls)
+                if isinstance(urls, Sized)
+                else getattr(settings, "bloom_capacity", 1_000_000)
+            )
+            seen = BloomFilter(
+                max(1, capacity), getattr(settings, "bloom_error_rate", 0.001)
+            )
+        return self._unique(urls, seen)
+
+    @staticmethod
+    def _unique(urls: Iterable[URL], seen: set[str] | BloomFilter) -> Iterator[URL]:
+        """Yield the URLs not yet in seen, then report how many were removed."""
+        removed = 0
+        for url in urls:
+            if url.url in seen:
+                removed += 1
+                continue
+            seen.add(url.url)
+            yield url
+        print(f"Removed {removed} duplicate URLs.")
+        if isinstance(seen, BloomFilter):
+            print(f"Seen-set: {seen.stats()}")
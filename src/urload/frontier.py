@@ -0,0 +1,225 @@
+"""
+Persistent work queues for long-running commands.
+
+A :class:`Frontier` keeps the URLs that a crawl or a download still has to
+process in an SQLite database in the session directory, so the queue does not
+have to fit in memory and an interrupted command can be resumed where it
+stopped. URLs are de-duplicated on insert by a caller-supplied key and are
+taken from the queue in batches. Each item is marked finished in the same
+transaction as the URLs it adds, so a resumed command neither repeats nor
+loses work.
+"""
+
+import json
+import os
+import sqlite3
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from urload.url import URL
+
+# Path that keeps a frontier in memory instead of on disk
+MEMORY = ":memory:"
+
+PENDING = 0
+ACTIVE = 1
+DONE = 2
+FAILED = 3
+# Larger than any level an item can have
+_MAX_LEVEL = 2**62
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    url TEXT NOT NULL,
+    headers TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    state INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_queue ON items (state, level, id);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+_COLUMNS = "id, url, headers, level, data"
+
+
+@dataclass
+class FrontierItem:
+    """
+    A URL taken from a frontier.
+
+    :param id: Position of the item in the order it was added.
+    :param url: The URL, with its headers.
+    :param level: Caller-defined level, such as the crawl depth at which the URL was found.
+    :param data: Caller-defined data, such as the output path of a download.
+    """
+
+    id: int
+    url: URL
+    level: int
+    data: str
+
+
+def frontier_path(settings: Any, name: str) -> str:
+    """
+    Return the path of a frontier database in the session directory.
+
+    The session directory is created if it does not exist.
+
+    :param settings: The AppSettings object, or None to keep the frontier in memory.
+    :param name: File name of the database.
+    :return: The path of the database, or MEMORY if there are no settings.
+    """
+    if settings is None:
+        return MEMORY
+    session_dir = f"{settings.session_dir_num:04d}"
+    os.makedirs(session_dir, exist_ok=True)
+    return os.path.join(session_dir, name)
+
+
+class Frontier:
+    """
+    A persistent, de-duplicating queue of URLs.
+
+    Items are taken in order of level and then of insertion. Items that were
+    taken but not finished when the frontier was last closed are queued again
+    when it is resumed.
+
+    :param path: Path of the database file, or MEMORY.
+    :param resume: If True, continue the frontier stored at path; otherwise start a new, empty one.
+    :raises FileNotFoundError: If resume is True and there is no frontier at path.
+    """
+
+    def __init__(self, path: str, resume: bool = False) -> None:
+        """Open or create the database."""
+        if path != MEMORY:
+            if resume and not os.path.exists(path):
+                raise FileNotFoundError(path)
+            if not resume:
+                _remove_database(path)
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.executescript(_SCHEMA)
+        with self._db:
+            self._db.execute(
+                "UPDATE items SET state = ? WHERE state = ?", (PENDING, ACTIVE)
+            )
+
+    def add(self, key: str, url: URL, level: int = 0, data: str = "") -> bool:
+        """
+        Queue a URL unless an item with the same key was ever added.
+
+        The change is committed with the next call to :meth:`finish` or :meth:`commit`.
+
+        :param key: De-duplication key, such as the URL without its fragment.
+        :param url: The URL to queue.
+        :param level: Caller-defined level of the item.
+        :param data: Caller-defined data stored with the item.
+        :return: True if the URL was queued, False if the key was already present.
+        """
+        cursor = self._db.execute(
+            "INSERT OR IGNORE INTO items (key, url, headers, level, data, state)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (key, url.url, json.dumps(url.headers), level, data, PENDING),
+        )
+        return cursor.rowcount > 0
+
+    def commit(self) -> None:
+        """Commit the items added since the last commit."""
+        self._db.commit()
+
+    def take(self, count: int, below_level: int | None = None) -> list[FrontierItem]:
+        """
+        Take the next items from the queue and mark them as in progress.
+
+        :param count: Maximum number of items to take.
+        :param below_level: If given, only items with a lower level are taken.
+        :return: The items, or an empty list if none are pending.
+        """
+        with self._db:
+            rows = self._db.execute(
+                f"SELECT {_COLUMNS} FROM items WHERE state = ? AND level < ?"
+                " ORDER BY level, id LIMIT ?",
+                (PENDING, _MAX_LEVEL if below_level is None else below_level, count),
+            ).fetchall()
+            self._db.executemany(
+                "UPDATE items SET state = ? WHERE id = ?",
+                [(ACTIVE, row[0]) for row in rows],
+            )
+        return [_item(row) for row in rows]
+
+    def finish(self, item: FrontierItem, failed: bool = False) -> None:
+        """
+        Mark an item as processed and commit it with any URLs added since the last commit.
+
+        :param item: An item returned by :meth:`take`.
+        :param failed: True if processing the item failed.
+        """
+        with self._db:
+            self._db.execute(
+                "UPDATE items SET state = ? WHERE id = ?",
+                (FAILED if failed else DONE, item.id),
+            )
+
+    def items(self, min_level: int = 0) -> Iterator[FrontierItem]:
+        """
+        Iterate over all items in the order they were added, whatever their state.
+
+        :param min_level: Only items with at least this level are returned.
+        :return: An iterator over the items.
+        """
+        cursor = self._db.execute(
+            f"SELECT {_COLUMNS} FROM items WHERE level >= ? ORDER BY id", (min_level,)
+        )
+        return map(_item, cursor)
+
+    def get_meta(self, name: str) -> str | None:
+        """
+        Return a value stored with :meth:`set_meta`.
+
+        :param name: Name of the value.
+        :return: The value, or None if it was never set.
+        """
+        row = self._db.execute(
+            "SELECT value FROM meta WHERE name = ?", (name,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, name: str, value: str) -> None:
+        """
+        Store a value with the frontier, such as the arguments of the command that created it.
+
+        :param name: Name of the value.
+        :param value: The value.
+        """
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, value)
+            )
+
+    def close(self, remove: bool = False) -> None:
+        """
+        Close the database.
+
+        :param remove: If True, also delete the database, as when the work is complete.
+        """
+        self._db.close()
+        if remove and self.path != MEMORY:
+            _remove_database(self.path)
+
+
+def _item(row: tuple[int, str, str, int, str]) -> FrontierItem:
+    """Build a FrontierItem from a database row."""
+    item_id, url, headers, level, data = row
+    return FrontierItem(item_id, URL(url, headers=json.loads(headers)), level, data)
+
+
+def _remove_database(path: str) -> None:
+    """Remove a database file and its write-ahead log, if they exist."""
+    for name in (path, path + "-wal", path + "-shm"):
+        if os.path.exists(name):
+            os.remove(name)
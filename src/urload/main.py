@@ -6,6 +6,7 @@ command-line tool for scraping websites with tab completion and history support.
 """
 
 import atexit
+import itertools
 import os
 import re
 import sys
@@ -17,12 +18,16 @@ from prompt_toolkit.completion import CompleteEvent, Completer, Completion
 from prompt_toolkit.document import Document
 from prompt_toolkit.history import InMemoryHistory
 
+from urload import parse, transport
 from urload.commands.add import AddCommand
 from urload.commands.base import Command
+from urload.commands.cache import CacheCommand
 from urload.commands.clear import ClearCommand
+from urload.commands.crawl import CrawlCommand
 from urload.commands.delete import DeleteCommand
 from urload.commands.discard import DiscardCommand
 from urload.commands.exit import ExitCommand
+from urload.commands.extract import ExtractCommand
 from urload.commands.fileformat import FileformatCommand
 from urload.commands.get import GetCommand
 from urload.commands.get_option import GetOptionCommand
@@ -35,6 +40,7 @@ from urload.commands.list import ListCommand
 from urload.commands.load import LoadCommand
 from urload.commands.save import SaveCommand
 from urload.commands.set_option import SetOptionCommand
+from urload.commands.sitemap import SitemapCommand
 from urload.commands.sort import SortCommand
 from urload.commands.tail import TailCommand
 from urload.commands.timeformat import TimeformatCommand
@@ -42,14 +48,17 @@ from urload.commands.title import TitleCommand
 from urload.commands.uniq import UniqCommand
 from urload.settings import AppSettings
 from urload.url import URL
+from urload.urlstore import URLList, new_like, new_url_list
 
 HELP_ARG_COUNT = 2
+# Separates the commands of a pipeline
+PIPE = "|"
 
 
 class CommandCompleter(Completer):
     """Custom completer for URLoad commands.
 
-    Only completes command names at the start of the line, or as the first argument to 'help'.
+    Only completes command names at the start of the line or after a pipe, or as the first argument to 'help'.
     """
 
     def __init__(self, commands: list[str]):
@@ -61,6 +70,10 @@ class CommandCompleter(Completer):
     ) -> Generator[Completion, None, None]:
         """Yield completions for command names at the start or as help argument."""
         text = document.text_before_cursor
+        # After a pipe, complete the next command as if it started the line
+        pipes = list(re.finditer(rf"(?:^|\s){re.escape(PIPE)}(?=\s)", text))
+        if pipes:
+            text = text[pipes[-1].end() :].lstrip()
         lstripped = text.lstrip()
         parts = lstripped.split()
         word = document.get_word_before_cursor(WORD=True)
@@ -115,10 +128,13 @@ def build_command_objs() -> dict[str, Command]:
     # Keep this list sorted
     command_objs: dict[str, Command] = {}
     command_objs["add"] = AddCommand()
+    command_objs["cache"] = CacheCommand()
     command_objs["clear"] = ClearCommand()
+    command_objs["crawl"] = CrawlCommand()
     command_objs["del"] = DeleteCommand()
     command_objs["discard"] = DiscardCommand()
     command_objs["exit"] = ExitCommand()
+    command_objs["extract"] = ExtractCommand()
     command_objs["fileformat"] = FileformatCommand()
     command_objs["get"] = GetCommand()
     command_objs["get-option"] = GetOptionCommand()
@@ -131,6 +147,7 @@ def build_command_objs() -> dict[str, Command]:
     command_objs["load"] = LoadCommand()
     command_objs["save"] = SaveCommand()
     command_objs["set-option"] = SetOptionCommand()
+    command_objs["sitemap"] = SitemapCommand()
     command_objs["sort"] = SortCommand()
     command_objs["tail"] = TailCommand()
     command_objs["timeformat"] = TimeformatCommand()
@@ -154,13 +171,16 @@ def get_next_numeric_dir(base_path: str) -> int:
 def handle_user_input(
     user_input: str,
     command_objs: dict[str, Command],
-    url_list: list[URL],
+    url_list: URLList,
     settings: AppSettings,
-) -> list[URL]:
+) -> URLList:
     """
     Process a single user input line and return the new url_list.
 
     Parses the input, executes the corresponding command if found, and returns the updated URL list.
+    Commands separated by a standalone ``|`` form a pipeline: each command
+    consumes the URLs produced by the previous one as they are produced (see
+    :meth:`Command.stream`), and the output of the last one becomes the new list.
 
     :param user_input: The command line input from the user
     :param command_objs: Dictionary of command names to Command objects
@@ -172,26 +192,40 @@ def handle_user_input(
     parts = user_input.strip().split()
     if not parts:
         return url_list
-    cmd, *args = parts
-    if cmd in command_objs:
-        try:
-            return command_objs[cmd].run(args, url_list, settings)
-        except SystemExit:
-            raise
-        except Exception as e:
-            print(e)
+    stages = [
+        list(group)
+        for is_pipe, group in itertools.groupby(parts, lambda part: part == PIPE)
+        if not is_pipe
+    ]
+    if len(stages) != parts.count(PIPE) + 1:
+        print("Empty command in pipeline.")
+        return url_list
+    for cmd, *_ in stages:
+        if cmd not in command_objs:
+            print(f"Unknown command: {cmd}")
             return url_list
-    else:
-        print(f"Unknown command: {cmd}")
+    try:
+        if len(stages) == 1:
+            cmd, *args = stages[0]
+            return command_objs[cmd].run(args, url_list, settings)
+        urls: Iterable[URL] = url_list
+        for cmd, *args in stages:
+            urls = command_objs[cmd].stream(args, urls, settings)
+        # Pulling the URLs through the last stage runs the whole pipeline
+        return new_like(url_list, urls)
+    except SystemExit:
+        raise
+    except Exception as e:
+        print(e)
         return url_list
 
 
 def execute_commands_from_source(
     source: Iterable[str],
     command_objs: dict[str, Command],
-    url_list: list[URL],
+    url_list: URLList,
     settings: AppSettings,
-) -> tuple[list[URL], bool]:
+) -> tuple[URLList, bool]:
     """
     Execute commands from a file-like source, line by line.
 
@@ -223,18 +257,22 @@ def main() -> None:
 
     Provides a prompt with tab completion and history support.
     """
-    url_list: list[URL] = []
     settings = AppSettings.load()
 
     # Determine session directory
     session_base = os.getcwd()
     settings.session_dir_num = get_next_numeric_dir(session_base)
+    url_list = new_url_list(settings)
 
     command_objs = build_command_objs()
     completer = CommandCompleter(list(command_objs.keys()))
     history: InMemoryHistory = InMemoryHistory()
     session: PromptSession[Any] = PromptSession(completer=completer, history=history)
     atexit.register(settings.save)
+    transport.configure(settings)
+    parse.configure(settings)
+    atexit.register(transport.close)
+    atexit.register(parse.close)
     print("Welcome to URLoad! Type 'help' for commands.")
     print(f"Current session directory: {settings.session_dir_num:04d}")
 
@@ -0,0 +1,208 @@
+"""
+In-memory cache of fetched pages for URLoad.
+
+Commands that read whole pages (``title``, ``href``, ``img``) are often run one
+after another over the same URL list. :class:`PageCache` keeps the most
+recently fetched bodies in memory, keyed by URL and request headers, so that
+each page is downloaded only once per session. The cache is bounded by a byte
+budget and evicts the least recently used pages first.
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+import requests
+
+from urload import charset
+from urload.retry import RetryCallback
+from urload.settings import AppSettings
+from urload.url import URL
+
+type PageKey = tuple[str, frozenset[tuple[str, str]]]
+
+
+@dataclass(frozen=True)
+class Page:
+    """
+    The body of a successfully fetched page.
+
+    :param url: The URL that was fetched.
+    :param content: The raw response body.
+    :param encoding: The character encoding declared by the server, if any.
+    """
+
+    url: str
+    content: bytes
+    encoding: str | None
+
+    @classmethod
+    def from_response(cls, url: str, resp: requests.Response) -> "Page":
+        """
+        Build a page from a response, reading its whole body.
+
+        The body is kept as bytes; unlike ``resp.text``, this does not run
+        encoding detection over it.
+
+        :param url: The URL that was fetched.
+        :param resp: The response.
+        :return: The page.
+        """
+        return cls(url, resp.content, charset.declared_encoding(resp.headers))
+
+    @property
+    def text(self) -> str:
+        """The body decoded to text (see :func:`urload.charset.decode`)."""
+        return charset.decode(self.content, self.encoding)
+
+
+class PageCache:
+    """
+    A thread-safe, size-bounded LRU cache of pages.
+
+    :param max_bytes: Maximum total size of the cached bodies (0 disables the cache).
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        """Initialize an empty cache."""
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._pages: OrderedDict[PageKey, Page] = OrderedDict()
+        self._total = 0
+
+    @staticmethod
+    def key(url: str, headers: Mapping[str, str]) -> PageKey:
+        """
+        Return the cache key for a request.
+
+        :param url: The requested URL.
+        :param headers: The request headers.
+        :return: A hashable key identifying the request.
+        """
+        return url, frozenset(headers.items())
+
+    def get(self, key: PageKey) -> Page | None:
+        """
+        Return a cached page, marking it as recently used.
+
+        :param key: The cache key.
+        :return: The page, or None on a miss.
+        """
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None:
+                self._pages.move_to_end(key)
+            return page
+
+    def put(self, key: PageKey, page: Page) -> None:
+        """
+        Add a page, evicting the least recently used pages if over budget.
+
+        Pages larger than the whole budget are not stored.
+
+        :param key: The cache key.
+        :param page: The page to store.
+        """
+        size = len(page.content)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._pages.pop(key, None)
+            if old is not None:
+                self._total -= len(old.content)
+            self._pages[key] = page
+            self._total += size
+            while self._total > self.max_bytes:
+                _, evicted = self._pages.popitem(last=False)
+                self._total -= len(evicted.content)
+
+    def resize(self, max_bytes: int) -> None:
+        """
+        Change the byte budget, evicting pages if necessary.
+
+        :param max_bytes: The new budget (0 disables the cache).
+        """
+        with self._lock:
+            self.max_bytes = max_bytes
+            while self._total > self.max_bytes:
+                _, evicted = self._pages.popitem(last=False)
+                self._total -= len(evicted.content)
+
+    def clear(self) -> None:
+        """Remove all pages."""
+        with self._lock:
+            self._pages.clear()
+            self._total = 0
+
+    def stats(self) -> tuple[int, int]:
+        """
+        Return the number of cached pages and their total size.
+
+        :return: A tuple of (pages, bytes).
+        """
+        with self._lock:
+            return len(self._pages), self._total
+
+
+_cache = PageCache(AppSettings.model_fields["page_cache_max_bytes"].default)
+
+
+def configure(settings: AppSettings | None) -> None:
+    """
+    Apply the page cache budget from the settings.
+
+    :param settings: The AppSettings object, or None to use the defaults.
+    """
+    default = AppSettings.model_fields["page_cache_max_bytes"].default
+    _cache.resize(getattr(settings, "page_cache_max_bytes", default))
+
+
+def page_cache() -> PageCache:
+    """
+    Return the process-wide page cache.
+
+    :return: The shared PageCache.
+    """
+    return _cache
+
+
+def cached_page(url: URL) -> Page | None:
+    """
+    Return the cached page for a URL, if any.
+
+    :param url: The URL, with its headers.
+    :return: The page, or None if it is not cached.
+    """
+    return _cache.get(_cache.key(url.url, url.headers))
+
+
+def store_page(url: URL, page: Page) -> None:
+    """
+    Add a complete, successfully fetched page to the cache.
+
+    :param url: The URL that was fetched, with its headers.
+    :param page: The page.
+    """
+    _cache.put(_cache.key(url.url, url.headers), page)
+
+
+def fetch_page(url: URL, on_retry: RetryCallback | None = None) -> Page:
+    """
+    Return the body of a URL, from the page cache if possible.
+
+    Only successful responses are cached.
+
+    :param url: The URL to fetch, with its headers.
+    :param on_retry: Optional function called before each retry of the request.
+    :return: The page.
+    :raises requests.RequestException: If the request fails or returns an error status.
+    """
+    page = cached_page(url)
+    if page is not None:
+        return page
+    resp = url.get(on_retry=on_retry)
+    resp.raise_for_status()
+    page = Page.from_response(url.url, resp)
+    store_page(url, page)
+    return page
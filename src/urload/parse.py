@@ -0,0 +1,357 @@
+"""
+HTML parsing for URLoad.
+
+Pages are parsed with BeautifulSoup using the backend chosen by the
+``html_parser`` setting. ``lxml`` is much faster than Python's built-in
+``html.parser`` but is an optional dependency, so ``auto`` uses it when it is
+installed and falls back to ``html.parser`` otherwise. :func:`make_soup`
+smooths over the places where the two backends disagree, so the links
+extracted from a page do not depend on which one is in use.
+
+:func:`imap_links` extracts links from a stream of fetched pages (and
+:func:`imap_links_and_titles` their titles too). If the
+``parse_workers`` setting is nonzero, the parsing is done by a pool of worker
+processes so that it can use more than one core.
+
+:class:`TitleParser` finds a page's title without building a tree, and can
+be fed the page a piece at a time so that reading can stop early.
+"""
+
+import functools
+import multiprocessing
+import threading
+from collections import deque
+from collections.abc import Callable, Generator, Iterable
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+from bs4.filter import SoupStrainer
+
+from urload import charset
+from urload.pagecache import Page
+from urload.settings import AppSettings
+
+# Values accepted by the html_parser setting
+PARSERS = ("auto", "lxml", "html.parser")
+FALLBACK_PARSER = "html.parser"
+# Elements whose content is text, not markup, in the HTML standard. html.parser
+# builds tags inside them, lxml does not. Everything after <plaintext> is text,
+# even an end tag for it.
+_TEXT_ELEMENTS = ["textarea", "title", "xmp", "iframe", "noembed", "noframes"]
+_PLAINTEXT = "plaintext"
+# Attribute holding the link for each tag that links can be extracted from
+LINK_ATTRS = {"a": "href", "img": "src"}
+
+
+@functools.cache
+def is_available(name: str) -> bool:
+    """
+    Return True if a BeautifulSoup parser backend is installed.
+
+    :param name: The backend name (e.g., "lxml").
+    :return: Whether BeautifulSoup can use the backend.
+    """
+    return builder_registry.lookup(name) is not None
+
+
+def resolve(name: str) -> str:
+    """
+    Choose the backend to use for a value of the html_parser setting.
+
+    :param name: One of PARSERS.
+    :return: The requested backend if it is installed, otherwise html.parser.
+    """
+    if name == "auto":
+        name = "lxml"
+    return name if is_available(name) else FALLBACK_PARSER
+
+
+_parser = resolve(AppSettings.model_fields["html_parser"].default)
+_lock = threading.Lock()
+_workers = AppSettings.model_fields["parse_workers"].default
+_pool: ProcessPoolExecutor | None = None
+
+
+def configure(settings: AppSettings | None) -> None:
+    """
+    Select the parser backend and the number of parse worker processes.
+
+    :param settings: The AppSettings object, or None to use the defaults.
+    """
+    global _parser, _workers  # noqa: PLW0603
+    defaults = AppSettings.model_fields
+    _parser = resolve(getattr(settings, "html_parser", defaults["html_parser"].default))
+    workers = max(
+        0, getattr(settings, "parse_workers", defaults["parse_workers"].default)
+    )
+    if workers != _workers:
+        close()
+        _workers = workers
+
+
+def close() -> None:
+    """Shut down the parse worker processes, if any are running."""
+    global _pool  # noqa: PLW0603
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+def _worker_pool() -> ProcessPoolExecutor | None:
+    """Return the parse worker pool, starting it on first use, or None if parsing is in-process."""
+    global _pool  # noqa: PLW0603
+    with _lock:
+        if _workers and _pool is None:
+            # Worker processes are spawned rather than forked, because forking
+            # a process that is running fetch threads is unsafe.
+            context = multiprocessing.get_context("spawn")
+            _pool = ProcessPoolExecutor(_workers, mp_context=context)
+        return _pool
+
+
+def parser() -> str:
+    """
+    Return the parser backend in use.
+
+    :return: The BeautifulSoup feature name of the backend.
+    """
+    return _parser
+
+
+def make_soup(
+    markup: str, backend: str | None = None, only: list[str] | None = None
+) -> BeautifulSoup:
+    """
+    Parse an HTML document.
+
+    The input and the resulting tree are normalized so that every backend
+    yields the same links: NUL characters become U+FFFD, the first of any
+    duplicate attributes wins, and tags inside elements whose content is
+    text (such as <textarea>, <title> and <iframe>) or after <plaintext> are
+    treated as text.
+
+    If ``only`` is given, just those elements (and their contents) are built,
+    which is much faster and uses less memory than building the whole tree
+    when the caller only needs a few kinds of tags.
+
+    :param markup: The HTML document.
+    :param backend: The backend to use, defaulting to the configured one.
+    :param only: Names of the elements to build, or None to build the whole tree.
+    :return: The parsed document.
+    """
+    backend = backend or _parser
+    markup = markup.replace("\x00", "\ufffd")
+    if backend != FALLBACK_PARSER:
+        strainer = SoupStrainer(only) if only else None
+        return BeautifulSoup(markup, backend, parse_only=strainer)
+    # The text elements must be built to tell which tags are inside them.
+    text_elements = [*_TEXT_ELEMENTS, _PLAINTEXT]
+    strainer = SoupStrainer([*only, *text_elements]) if only else None
+    soup = BeautifulSoup(
+        markup, backend, parse_only=strainer, on_duplicate_attribute="ignore"
+    )
+    for element in soup.find_all(text_elements):
+        for tag in element.find_all(True):
+            tag.unwrap()
+    for plaintext in soup.find_all(_PLAINTEXT, limit=1):
+        for tag in plaintext.find_all_next(True):
+            tag.unwrap()
+    return soup
+
+
+def extract_links(
+    content: bytes,
+    encoding: str | None,
+    base_url: str,
+    tags: tuple[str, ...],
+    backend: str,
+) -> list[str]:
+    """
+    Return the absolute links found in the given kinds of tags of a page, in document order.
+
+    This is a top-level function that takes and returns only plain data, so
+    that it can be run in a worker process.
+
+    :param content: The raw page body.
+    :param encoding: The character encoding declared by the server, if any.
+    :param base_url: The URL of the page, used to resolve relative links.
+    :param tags: The names of the tags to extract links from (see LINK_ATTRS).
+    :param backend: The parser backend to use.
+    :return: The absolute URLs.
+    """
+    markup = charset.decode(content, encoding)
+    soup = make_soup(markup, backend, only=list(tags))
+    return _find_links(soup, base_url, tags)[0]
+
+
+def extract_links_and_title(
+    content: bytes,
+    encoding: str | None,
+    base_url: str,
+    tags: tuple[str, ...],
+    backend: str,
+) -> tuple[list[str], str | None]:
+    """
+    Return the absolute links found in the given kinds of tags of a page, and its title.
+
+    Like :func:`extract_links`, this can be run in a worker process.
+
+    :param content: The raw page body.
+    :param encoding: The character encoding declared by the server, if any.
+    :param base_url: The URL of the page, used to resolve relative links.
+    :param tags: The names of the tags to extract links from (see LINK_ATTRS).
+    :param backend: The parser backend to use.
+    :return: The absolute URLs, and the title or None if the page has none.
+    """
+    markup = charset.decode(content, encoding)
+    soup = make_soup(markup, backend, only=[*tags, "title"])
+    return _find_links(soup, base_url, tags)
+
+
+def _find_links(
+    soup: BeautifulSoup, base_url: str, tags: tuple[str, ...]
+) -> tuple[list[str], str | None]:
+    """
+    Return the absolute links in the given kinds of tags of a parsed page, and its title.
+
+    :param soup: The parsed page.
+    :param base_url: The URL of the page, used to resolve relative links.
+    :param tags: The names of the tags to extract links from.
+    :return: The absolute URLs, and the first title or None if none was parsed.
+    """
+    links: list[str] = []
+    title = None
+    for tag in soup.find_all([*tags, "title"]):
+        if tag.name == "title":
+            title = title if title is not None else tag.get_text().strip()
+        elif isinstance(link := tag.get(LINK_ATTRS[tag.name]), str):
+            links.append(urljoin(base_url, link))
+    return links, title
+
+
+def imap_links(
+    pages: Iterable[Future[Page]], tags: tuple[str, ...]
+) -> Generator[Future[list[str]], None, None]:
+    """
+    Extract links from each of a stream of fetched pages, yielding futures in input order.
+
+    Each input is a completed future holding a page (or the exception that
+    prevented fetching it); each output is a completed future holding the
+    page's links (see :func:`extract_links`) or that exception. With parse
+    worker processes, up to twice as many pages as there are workers are
+    parsed at once, and the input is only read as fast as they finish.
+
+    :param pages: Completed futures of the fetched pages.
+    :param tags: The names of the tags to extract links from.
+    :return: An iterator of completed futures, one per page, in input order.
+    """
+    return _imap(extract_links, pages, tags)
+
+
+def imap_links_and_titles(
+    pages: Iterable[Future[Page]], tags: tuple[str, ...]
+) -> Generator[Future[tuple[list[str], str | None]], None, None]:
+    """
+    Extract links and the title from each of a stream of fetched pages, like :func:`imap_links`.
+
+    :param pages: Completed futures of the fetched pages.
+    :param tags: The names of the tags to extract links from.
+    :return: An iterator of completed futures, one per page, in input order,
+        holding the page's links and title (see :func:`extract_links_and_title`).
+    """
+    return _imap(extract_links_and_title, pages, tags)
+
+
+def _imap[T](
+    extract: Callable[[bytes, str | None, str, tuple[str, ...], str], T],
+    pages: Iterable[Future[Page]],
+    tags: tuple[str, ...],
+) -> Generator[Future[T], None, None]:
+    """
+    Run a top-level extraction function on each of a stream of fetched pages.
+
+    :param extract: The function, called with a page's body, encoding and URL,
+        the tags and the parser backend.
+    :param pages: Completed futures of the fetched pages.
+    :param tags: The names of the tags to extract.
+    :return: An iterator of completed futures, one per page, in input order.
+    """
+    backend = _parser
+    pool = _worker_pool()
+    window = 2 * _workers
+    pending: deque[Future[T]] = deque()
+    for fetched in pages:
+        result: Future[T] = Future()
+        try:
+            page = fetched.result()
+            if pool is None:
+                result.set_result(
+                    extract(page.content, page.encoding, page.url, tags, backend)
+                )
+            else:
+                result = pool.submit(
+                    extract, page.content, page.encoding, page.url, tags, backend
+                )
+        except Exception as e:
+            result.set_exception(e)
+        pending.append(result)
+        while pending and (len(pending) >= window or pending[0].done()):
+            head = pending.popleft()
+            wait([head])
+            yield head
+    while pending:
+        head = pending.popleft()
+        wait([head])
+        yield head
+
+
+class TitleParser(HTMLParser):
+    """
+    An incremental parser that finds the title of an HTML document.
+
+    Feed it the document in pieces with :meth:`feed`; :attr:`done` becomes
+    True once the title is complete or the document head has ended, at which
+    point the rest of the document can be skipped.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a parser that has not seen a title."""
+        super().__init__(convert_charrefs=True)
+        self.done = False
+        self._parts: list[str] | None = None
+        self._title: str | None = None
+
+    @property
+    def title(self) -> str | None:
+        """The stripped title text, or None if no title has been seen."""
+        if self._title is None and self._parts is not None:
+            # The document ended (or reading stopped) inside the title
+            return "".join(self._parts).strip()
+        return self._title
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        """Start collecting the title, or stop at the start of the body."""
+        if self.done:
+            return
+        if tag == "title" and self._parts is None:
+            self._parts = []
+        elif tag == "body":
+            self.done = True
+
+    def handle_endtag(self, tag: str) -> None:
+        """Finish the title, or stop at the end of the head."""
+        if tag == "title" and self._parts is not None:
+            self._title = "".join(self._parts).strip()
+            self._parts = None
+            self.done = True
+        elif tag == "head":
+            self.done = True
+
+    def handle_data(self, data: str) -> None:
+        """Collect text inside the title."""
+        if self._parts is not None:
+            self._parts.append(data)
@@ -0,0 +1,176 @@
+"""
+Retry policy for URLoad fetches.
+
+:class:`RetryPolicy` re-sends requests that fail with a transient error (such
+as a dropped connection or a 429/503 response), waiting between attempts with
+capped exponential backoff and jitter, and honoring ``Retry-After``.
+"""
+
+import random
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+
+import requests
+
+# Exception classes that can be named in the retry_exceptions setting
+RETRYABLE_EXCEPTIONS: dict[str, type[Exception]] = {
+    "connection": requests.ConnectionError,
+    "timeout": requests.Timeout,
+    "chunked": requests.exceptions.ChunkedEncodingError,
+}
+
+type RetryCallback = Callable[[int, str, float], None]
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parse a Retry-After header.
+
+    :param value: The header value, either a number of seconds or an HTTP date.
+    :return: The number of seconds to wait, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Decides whether and when to retry a failed request.
+
+    :param max_attempts: Total number of attempts, including the first (1 disables retries).
+    :param backoff_base: Delay in seconds before the first retry; doubled for each further retry.
+    :param backoff_cap: Maximum delay in seconds between attempts. A Retry-After
+        longer than this is not waited for, and the failure is returned instead.
+    :param jitter: If True, each delay is chosen uniformly between 0 and the backoff delay.
+    :param statuses: HTTP status codes that should be retried.
+    :param exceptions: Exception types that should be retried.
+    """
+
+    max_attempts: int = 3
+    backoff_base: float = 0.5
+    backoff_cap: float = 30.0
+    jitter: bool = True
+    statuses: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+    exceptions: tuple[type[Exception], ...] = tuple(RETRYABLE_EXCEPTIONS.values())
+
+    def backoff(self, retry: int) -> float:
+        """
+        Return the delay before a retry.
+
+        :param retry: The retry number, starting at 1.
+        :return: The delay in seconds.
+        """
+        delay = min(self.backoff_cap, self.backoff_base * 2 ** (retry - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def call(
+        self,
+        send: Callable[[], requests.Response],
+        on_retry: RetryCallback | None = None,
+    ) -> requests.Response:
+        """
+        Send a request, retrying transient failures.
+
+        :param send: Function that performs one attempt of the request.
+        :param on_retry: Optional function called before each retry with the
+            retry number, the reason for it, and the delay in seconds.
+        :return: The first successful response, or the last response if it
+            still has a retryable status when attempts run out.
+        :raises requests.RequestException: If the last attempt raises.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                resp = send()
+            except self.exceptions as e:
+                if attempt >= self.max_attempts:
+                    raise
+                reason = type(e).__name__
+                delay = self.backoff(attempt)
+            else:
+                if (
+                    resp.status_code not in self.statuses
+                    or attempt >= self.max_attempts
+                ):
+                    return resp
+                reason = f"HTTP {resp.status_code}"
+                delay = self.backoff(attempt)
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                if retry_after is not None:
+                    if retry_after > self.backoff_cap:
+                        return resp
+                    delay = max(delay, retry_after)
+                resp.close()
+            if on_retry is not None:
+                on_retry(attempt, reason, delay)
+            time.sleep(delay)
+
+
+class RetryLog:
+    """
+    Records the retries of a request, for reporting in progress output.
+
+    An instance can be passed directly as the ``on_retry`` callback.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty log."""
+        self.reasons: list[str] = []
+
+    def __call__(self, retry: int, reason: str, delay: float) -> None:
+        """Record one retry."""
+        self.reasons.append(reason)
+
+    def summary(self) -> str:
+        """
+        Describe the retries that were made.
+
+        :return: A note such as "(2 retries: HTTP 503)", or an empty string if there were none.
+        """
+        if not self.reasons:
+            return ""
+        count = len(self.reasons)
+        plural = "retry" if count == 1 else "retries"
+        return f"({count} {plural}: {', '.join(dict.fromkeys(self.reasons))})"
+
+
+def parse_statuses(value: str) -> frozenset[int]:
+    """
+    Parse a comma-separated list of HTTP status codes.
+
+    :param value: The list, e.g. "429,503".
+    :return: The set of status codes.
+    :raises ValueError: If an entry is not a valid status code.
+    """
+    statuses = frozenset(int(s) for s in value.split(",") if s.strip())
+    invalid = sorted(s for s in statuses if not 100 <= s <= 599)  # noqa: PLR2004
+    if invalid:
+        raise ValueError(f"Invalid HTTP status code: {invalid[0]}")
+    return statuses
+
+
+def parse_exceptions(value: str) -> tuple[type[Exception], ...]:
+    """
+    Parse a comma-separated list of retryable exception names.
+
+    :param value: The list, e.g. "connection,timeout". See RETRYABLE_EXCEPTIONS.
+    :return: The exception classes.
+    :raises ValueError: If a name is unknown.
+    """
+    names = [n.strip().lower() for n in value.split(",") if n.strip()]
+    for name in names:
+        if name not in RETRYABLE_EXCEPTIONS:
+            choices = ", ".join(RETRYABLE_EXCEPTIONS)
+            raise ValueError(f"Unknown retry exception {name!r} (use: {choices})")
+    return tuple(RETRYABLE_EXCEPTIONS[n] for n in names)
@@ -0,0 +1,129 @@
+"""
+robots.txt support for URLoad.
+
+When the ``robots_txt`` setting is enabled, every fetch made through
+:mod:`urload.transport` is first checked against the robots.txt of its origin.
+Each origin's robots.txt is downloaded once and kept for ``robots_txt_ttl``
+seconds, so obeying it costs one extra request per host. A ``Crawl-delay``
+lowers the host's rate limit in the shared scheduler.
+
+Unavailable robots.txt files (4xx) allow everything, and unreachable ones
+(5xx or a network error) disallow everything, as in RFC 9309. An unreachable
+robots.txt is only kept for a short while, so that a passing outage does not
+block the origin for the whole TTL.
+"""
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+from urload.scheduler import scheduler
+
+HTTP_CLIENT_ERROR = 400
+HTTP_SERVER_ERROR = 500
+_DISALLOW_ALL = ["User-agent: *", "Disallow: /"]
+# Seconds to keep an unreachable robots.txt before trying it again
+FAILURE_TTL = 30.0
+
+type RobotsFetcher = Callable[[str], requests.Response]
+
+
+class RobotsDisallowed(Exception):
+    """Raised when robots.txt does not allow a URL to be fetched."""
+
+    pass
+
+
+@dataclass
+class RobotsEntry:
+    """
+    The parsed robots.txt of one origin.
+
+    :param rules: The parsed rules.
+    :param fetched_at: Time (from time.monotonic()) the rules were downloaded.
+    :param ttl: Seconds to keep the rules.
+    """
+
+    rules: RobotFileParser
+    fetched_at: float
+    ttl: float
+
+
+class RobotsCache:
+    """
+    Downloads and caches robots.txt per origin (scheme, host and port).
+
+    Concurrent checks against the same origin wait for a single download.
+
+    :param ttl: Seconds to keep each robots.txt before downloading it again.
+    :param fetch: Function that performs a GET request for a robots.txt URL.
+    :param failure_ttl: Seconds to keep an unreachable robots.txt, if less than ttl.
+    """
+
+    def __init__(
+        self, ttl: float, fetch: RobotsFetcher, failure_ttl: float = FAILURE_TTL
+    ) -> None:
+        """Initialize an empty cache."""
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self._fetch = fetch
+        self._lock = threading.Lock()
+        self._origin_locks: dict[str, threading.Lock] = {}
+        self._entries: dict[str, RobotsEntry] = {}
+
+    def allowed(self, url: str, user_agent: str) -> bool:
+        """
+        Return True if robots.txt allows a user agent to fetch a URL.
+
+        :param url: The URL to be fetched.
+        :param user_agent: The User-Agent the request will be sent with.
+        :return: Whether the URL may be fetched.
+        """
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https"):
+            return True
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        with self._lock:
+            origin_lock = self._origin_locks.setdefault(origin, threading.Lock())
+        with origin_lock:
+            entry = self._entries.get(origin)
+            if entry is None or time.monotonic() - entry.fetched_at >= entry.ttl:
+                rules, reachable = self._download(origin)
+                ttl = self.ttl if reachable else min(self.ttl, self.failure_ttl)
+                entry = RobotsEntry(rules, time.monotonic(), ttl)
+                self._entries[origin] = entry
+                delay = entry.rules.crawl_delay(user_agent)
+                scheduler().limit_host(
+                    parsed.hostname or "", 1 / float(delay) if delay else 0.0
+                )
+        return entry.rules.can_fetch(user_agent, url)
+
+    def _download(self, origin: str) -> tuple[RobotFileParser, bool]:
+        """
+        Download and parse the robots.txt of an origin.
+
+        :param origin: The scheme and network location, e.g. "https://example.com".
+        :return: The parsed rules, and False if robots.txt was unreachable.
+        """
+        rules = RobotFileParser()
+        try:
+            resp = self._fetch(origin + "/robots.txt")
+        except requests.RequestException:
+            rules.parse(_DISALLOW_ALL)
+            return rules, False
+        try:
+            if resp.status_code >= HTTP_SERVER_ERROR:
+                rules.parse(_DISALLOW_ALL)
+                return rules, False
+            if resp.status_code >= HTTP_CLIENT_ERROR:
+                rules.parse([])
+            else:
+                rules.parse(resp.content.decode("utf-8", "replace").splitlines())
+        finally:
+            resp.close()
+        return rules, True
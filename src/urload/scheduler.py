@@ -0,0 +1,421 @@
+"""
+Per-host politeness scheduling for URLoad fetches.
+
+:class:`HostScheduler` runs fetches on a pool of threads while limiting how hard
+any single host is hit: each host has a token-bucket rate limit and a cap on
+the number of requests in flight. Queued work is grouped by host and dispatched
+round-robin across hosts, so idle capacity goes to other hosts instead of
+waiting on a throttled one. An item is only handed to a worker once its host
+has a token, so no worker sleeps on a rate limit. Results are still yielded in
+input order.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Generator, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Protocol
+from urllib.parse import urlparse
+
+from urload.settings import AppSettings
+
+# Number of items read ahead of the oldest unfinished item, per worker
+LOOKAHEAD_PER_WORKER = 8
+
+
+class TokenBucket:
+    """
+    A thread-safe token-bucket rate limiter.
+
+    :param rate: Tokens added per second; 0 or less disables the limit.
+    :param burst: Maximum number of tokens that can accumulate.
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0) -> None:
+        """Initialize a full bucket."""
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """
+        Take one token if one is available, without waiting.
+
+        :return: 0 if a token was taken, otherwise the number of seconds until one is available.
+        """
+        with self._lock:
+            if self.rate <= 0:
+                return 0.0
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._last) * self.rate
+            )
+            self._last = now
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.rate
+            self._tokens -= 1
+            return 0.0
+
+    def acquire(self) -> None:
+        """
+        Take one token, waiting until one is available.
+
+        The scheduler never waits in a worker; this is for work that makes
+        further requests to its host, such as retries.
+        """
+        while (delay := self.try_acquire()) > 0:
+            time.sleep(delay)
+
+
+def url_host(url: str) -> str:
+    """
+    Return the host name used to group a URL for scheduling.
+
+    :param url: The URL string.
+    :return: The lowercase host name, or an empty string if there is none.
+    """
+    return urlparse(url).hostname or ""
+
+
+class Closeable(Protocol):
+    """An object holding a resource, such as an HTTP response."""
+
+    def close(self) -> None:
+        """Release the resource."""
+        ...
+
+
+class Cancellation:
+    """
+    Lets an abandoned :meth:`HostScheduler.imap` call stop its running work.
+
+    Work running under imap finds its cancellation with :func:`cancellation`,
+    checks :attr:`cancelled` between steps and registers what it is blocked
+    on with :meth:`track`, so that cancelling can close it.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a cancellation that has not been triggered."""
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._open: set[Closeable] = set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Return True once the work has been cancelled."""
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        """Cancel the work and close everything it is tracking."""
+        self._event.set()
+        with self._lock:
+            tracked = list(self._open)
+        for resource in tracked:
+            resource.close()
+
+    @contextmanager
+    def track(self, resource: Closeable) -> Generator[None, None, None]:
+        """
+        Close a resource if the work is cancelled while it is in use.
+
+        :param resource: The resource, such as a streaming response.
+        :raises Cancelled: If the work has already been cancelled.
+        """
+        with self._lock:
+            self._open.add(resource)
+        try:
+            if self.cancelled:
+                raise Cancelled()
+            yield
+        finally:
+            with self._lock:
+                self._open.discard(resource)
+
+
+class Cancelled(Exception):
+    """Raised by work that stops because its imap call was abandoned."""
+
+    def __init__(self) -> None:
+        """Initialize with a fixed message."""
+        super().__init__("Cancelled")
+
+
+_current = threading.local()
+_NOT_CANCELLED = Cancellation()
+
+
+def cancellation() -> Cancellation:
+    """
+    Return the cancellation of the imap call running the current work.
+
+    :return: The Cancellation, or one that is never triggered outside imap.
+    """
+    return getattr(_current, "cancellation", _NOT_CANCELLED)
+
+
+class _Dispatch[T, R]:
+    """
+    The state of one :meth:`HostScheduler.imap` call.
+
+    :param fn: Function to apply to each item.
+    :param workers: Maximum number of concurrent calls to ``fn``.
+    """
+
+    def __init__(self, fn: Callable[[T], R], workers: int) -> None:
+        """Initialize with nothing queued or running."""
+        self.fn = fn
+        self.workers = workers
+        self.queued = _RoundRobin[T]()
+        self.futures: dict[int, Future[R]] = {}
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.active = 0
+        self.cancellation = Cancellation()
+
+    def call(self, item: T) -> R:
+        """Apply the function to an item in a worker, with this call's cancellation."""
+        _current.cancellation = self.cancellation
+        try:
+            return self.fn(item)
+        finally:
+            del _current.cancellation
+
+
+class HostScheduler:
+    """
+    Dispatches work round-robin across hosts with per-host limits.
+
+    The limits are shared by every :meth:`imap` call, so concurrent commands
+    cannot together exceed them.
+
+    :param rate: Maximum requests per second to each host (0 for no limit).
+    :param max_per_host: Maximum requests in flight to each host.
+    """
+
+    def __init__(self, rate: float = 0.0, max_per_host: int = 4) -> None:
+        """Initialize the scheduler with no hosts tracked."""
+        self.rate = rate
+        self.max_per_host = max_per_host
+        self._cond = threading.Condition()
+        self._buckets: dict[str, TokenBucket] = {}
+        self._host_rates: dict[str, float] = {}
+        self._in_flight: dict[str, int] = {}
+
+    def set_limits(self, rate: float, max_per_host: int) -> None:
+        """
+        Change the per-host limits.
+
+        :param rate: Maximum requests per second to each host (0 for no limit).
+        :param max_per_host: Maximum requests in flight to each host.
+        """
+        with self._cond:
+            self.rate = rate
+            self.max_per_host = max(1, max_per_host)
+            for host, bucket in self._buckets.items():
+                bucket.rate = self._rate(host)
+            self._cond.notify_all()
+
+    def limit_host(self, host: str, rate: float) -> None:
+        """
+        Limit one host to a lower rate than the others (e.g., for a robots.txt Crawl-delay).
+
+        :param host: The host name.
+        :param rate: Maximum requests per second to the host (0 to remove the limit).
+        """
+        with self._cond:
+            if rate > 0:
+                self._host_rates[host] = rate
+            else:
+                self._host_rates.pop(host, None)
+            if host in self._buckets:
+                self._buckets[host].rate = self._rate(host)
+
+    def bucket(self, host: str) -> TokenBucket:
+        """
+        Return the rate limiter for a host.
+
+        :param host: The host name.
+        :return: The host's TokenBucket.
+        """
+        with self._cond:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self._rate(host))
+            return self._buckets[host]
+
+    def imap[T, R](
+        self,
+        fn: Callable[[T], R],
+        items: Iterable[T],
+        workers: int,
+        key: Callable[[T], str],
+    ) -> Generator[Future[R], None, None]:
+        """
+        Apply a function to each item, scheduled per host, yielding futures in input order.
+
+        Each yielded future is already complete; call ``result()`` to obtain
+        the value or re-raise the exception raised by ``fn``. Items are read
+        lazily, at most ``LOOKAHEAD_PER_WORKER * workers`` ahead of the oldest
+        item that has not been yielded yet.
+
+        :param fn: Function to apply to each item.
+        :param items: The items to process.
+        :param workers: Maximum number of concurrent calls to ``fn``.
+        :param key: Function returning the host of an item.
+        :return: An iterator of completed futures, one per item, in input order.
+        """
+        run = _Dispatch(fn, max(1, workers))
+        lookahead = LOOKAHEAD_PER_WORKER * run.workers
+        source = iter(items)
+        exhausted = False
+        next_in = next_out = 0
+        try:
+            while True:
+                while not exhausted and next_in - next_out < lookahead:
+                    try:
+                        item = next(source)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    run.queued.push(key(item), next_in, item)
+                    next_in += 1
+                with self._cond:
+                    wake_in = self._start(run)
+                    head = run.futures.get(next_out)
+                    if head is None and not run.queued:
+                        return  # Everything has been yielded
+                    if head is None or not head.done():
+                        # Wake when work finishes or a throttled host gets a token
+                        self._cond.wait(wake_in)
+                        continue
+                del run.futures[next_out]
+                next_out += 1
+                yield head
+        except BaseException:
+            # Interrupted or abandoned (e.g. Ctrl-C): stop the running work
+            # instead of waiting for it to finish.
+            run.cancellation.cancel()
+            raise
+        finally:
+            run.pool.shutdown(wait=not run.cancellation.cancelled, cancel_futures=True)
+
+    def _start[T, R](self, run: _Dispatch[T, R]) -> float | None:
+        """
+        Start as many queued items as the limits allow; call with the lock held.
+
+        An item starts only once its host has a token, so workers never wait
+        on a rate limit and a throttled host cannot hold up the others.
+
+        :param run: The imap call whose items to start.
+        :return: Seconds until a throttled host gets its next token, or None if
+            no host is waiting for one.
+        """
+        next_token = math.inf
+
+        def ready(host: str) -> bool:
+            nonlocal next_token
+            if not self._has_capacity(host):
+                return False
+            delay = self.bucket(host).try_acquire()
+            if delay > 0:
+                next_token = min(next_token, delay)
+            return delay == 0
+
+        while run.active < run.workers and (picked := run.queued.pop(ready)):
+            host, seq, item = picked
+            self._in_flight[host] = self._in_flight.get(host, 0) + 1
+            run.active += 1
+            future = run.futures[seq] = run.pool.submit(run.call, item)
+            future.add_done_callback(lambda _, h=host: self._finished(run, h))
+        return None if next_token == math.inf else next_token
+
+    def _finished[T, R](self, run: _Dispatch[T, R], host: str) -> None:
+        """Release the slot of an item of an imap call that has finished."""
+        with self._cond:
+            self._in_flight[host] -= 1
+            run.active -= 1
+            self._cond.notify_all()
+
+    def _rate(self, host: str) -> float:
+        """Return the rate limit of a host: the lower of its own and the global one."""
+        host_rate = self._host_rates.get(host, 0.0)
+        if host_rate <= 0:
+            return self.rate
+        return host_rate if self.rate <= 0 else min(self.rate, host_rate)
+
+    def _has_capacity(self, host: str) -> bool:
+        """Return True if another request to the host may start."""
+        return self._in_flight.get(host, 0) < self.max_per_host
+
+
+class _RoundRobin[T]:
+    """Items queued per host, taken from each host in turn."""
+
+    def __init__(self) -> None:
+        """Initialize an empty queue."""
+        self._queues: dict[str, deque[tuple[int, T]]] = {}
+        self._hosts: deque[str] = deque()
+        self.total = 0
+
+    def __bool__(self) -> bool:
+        """Return True if any items are queued."""
+        return self.total > 0
+
+    def push(self, host: str, seq: int, item: T) -> None:
+        """Queue an item with its sequence number under its host."""
+        if host not in self._queues:
+            self._queues[host] = deque()
+            self._hosts.append(host)
+        self._queues[host].append((seq, item))
+        self.total += 1
+
+    def pop(self, ready: Callable[[str], bool]) -> tuple[str, int, T] | None:
+        """
+        Take the next item from the first host, in round-robin order, that is ready.
+
+        :param ready: Function returning True if a host can accept more work.
+        :return: A tuple of (host, sequence number, item), or None if no host is ready.
+        """
+        for _ in range(len(self._hosts)):
+            host = self._hosts[0]
+            self._hosts.rotate(-1)
+            if not ready(host):
+                continue
+            seq, item = self._queues[host].popleft()
+            if not self._queues[host]:
+                del self._queues[host]
+                self._hosts.remove(host)
+            self.total -= 1
+            return host, seq, item
+        return None
+
+
+_scheduler = HostScheduler(
+    AppSettings.model_fields["host_rate_limit"].default,
+    AppSettings.model_fields["host_concurrency"].default,
+)
+
+
+def configure(settings: AppSettings | None) -> None:
+    """
+    Apply the per-host limits from the settings to the shared scheduler.
+
+    :param settings: The AppSettings object, or None to use the defaults.
+    """
+    defaults = AppSettings.model_fields
+    _scheduler.set_limits(
+        getattr(settings, "host_rate_limit", defaults["host_rate_limit"].default),
+        getattr(settings, "host_concurrency", defaults["host_concurrency"].default),
+    )
+
+
+def scheduler() -> HostScheduler:
+    """
+    Return the process-wide scheduler.
+
+    :return: The shared HostScheduler.
+    """
+    return _scheduler
@@ -1,10 +1,14 @@
 """Settings infrastructure for URLoad application."""
 
 import os
+from typing import Any
 
 import tomlkit
+from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from urload.retry import parse_exceptions, parse_statuses
+
 CONFIG_FILE = os.environ.get("URLOAD_CONFIG_FILE", "urload.toml")
 
 
@@ -14,8 +18,35 @@ class AppSettings(BaseSettings):
     filename_template: str = "{index:04d}_{filename}"
     time_format: str = "%Y%m%d%H%M%S"
     session_dir_num: int = 0  # Track highest session directory
+    download_concurrency: int = 4  # Number of parallel downloads for get
+    download_chunk_size: int = 64 * 1024  # Bytes to read at a time for get
+    host_rate_limit: float = 0.0  # Requests per second to each host (0 = no limit)
+    host_concurrency: int = 4  # Maximum requests in flight to each host
+    retry_attempts: int = 3  # Attempts per request, including the first
+    retry_backoff: float = 0.5  # Delay before the first retry, doubled each time
+    retry_backoff_max: float = 30.0  # Maximum delay between attempts
+    retry_jitter: bool = True  # Randomize retry delays
+    retry_statuses: str = "429,500,502,503,504"  # HTTP statuses to retry
+    retry_exceptions: str = "connection,timeout,chunked"  # Errors to retry
+    pool_hosts: int = 16  # Number of hosts to keep connection pools for
+    pool_maxsize: int = 16  # Maximum keep-alive connections per host
+    page_cache_max_bytes: int = 32 * 1024 * 1024  # In-memory page cache size
+    title_max_bytes: int = 256 * 1024  # Bytes of a page to read looking for its title
+    parse_workers: int = 0  # Processes for parsing pages in href/img (0 = none)
+    html_parser: str = "auto"  # HTML parser backend: auto, lxml or html.parser
+    robots_txt: bool = False  # Obey robots.txt and its Crawl-delay before fetching
+    robots_txt_ttl: float = 24 * 60 * 60  # Seconds to keep each host's robots.txt
+    bloom_capacity: int = 1_000_000  # Initial capacity of approximate seen-sets
+    bloom_error_rate: float = 0.001  # False-positive rate of approximate seen-sets
+    frontier_batch_size: int = 256  # URLs taken at a time from a crawl or get queue
+    url_store: str = "list"  # URL list container: list, compact or mmap
+    http_cache: bool = False  # Cache responses on disk between runs
+    http_cache_dir: str = ".urload-cache"  # Directory for the HTTP cache
+    http_cache_max_bytes: int = 256 * 1024 * 1024  # Size limit of the HTTP cache
 
-    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
+    model_config = SettingsConfigDict(
+        env_file=".env", env_file_encoding="utf-8", validate_assignment=True
+    )
 
     @classmethod
     def load(cls) -> "AppSettings":
@@ -37,7 +68,7 @@ class AppSettings(BaseSettings):
                     )
                 return str(v)
 
-            data_dict: dict[str, str] = {
+            data_dict: dict[str, Any] = {
                 str(k):  # type: ignore
                 extract_value(v)
                 for k, v in dict(data).items()  # type: ignore
@@ -52,6 +83,67 @@ class AppSettings(BaseSettings):
             return cls(session_dir_num=session_dir_num, **data_dict)
         return cls()
 
+    @field_validator("html_parser")
+    @classmethod
+    def _check_html_parser(cls, value: str) -> str:
+        """Ensure html_parser names a known backend."""
+        if value not in ("auto", "lxml", "html.parser"):
+            raise ValueError("must be one of: auto, lxml, html.parser")
+        return value
+
+    @field_validator("url_store")
+    @classmethod
+    def _check_url_store(cls, value: str) -> str:
+        """Ensure url_store names a known container."""
+        if value not in ("list", "compact", "mmap"):
+            raise ValueError("must be one of: list, compact, mmap")
+        return value
+
+    @field_validator("bloom_error_rate")
+    @classmethod
+    def _check_bloom_error_rate(cls, value: float) -> float:
+        """Ensure bloom_error_rate is a probability strictly between 0 and 1."""
+        if not 0 < value < 1:
+            raise ValueError("must be between 0 and 1")
+        return value
+
+    @field_validator("bloom_capacity")
+    @classmethod
+    def _check_bloom_capacity(cls, value: int) -> int:
+        """Ensure bloom_capacity is positive."""
+        if value < 1:
+            raise ValueError("must be at least 1")
+        return value
+
+    @field_validator(
+        "download_concurrency",
+        "download_chunk_size",
+        "frontier_batch_size",
+        "title_max_bytes",
+        "pool_hosts",
+        "pool_maxsize",
+    )
+    @classmethod
+    def _check_at_least_one(cls, value: int) -> int:
+        """Ensure a count or size that cannot be zero is positive."""
+        if value < 1:
+            raise ValueError("must be at least 1")
+        return value
+
+    @field_validator("retry_statuses")
+    @classmethod
+    def _check_retry_statuses(cls, value: str) -> str:
+        """Ensure retry_statuses is a list of HTTP status codes."""
+        parse_statuses(value)
+        return value
+
+    @field_validator("retry_exceptions")
+    @classmethod
+    def _check_retry_exceptions(cls, value: str) -> str:
+        """Ensure retry_exceptions only names known exceptions."""
+        parse_exceptions(value)
+        return value
+
     def save(self) -> None:
         """Save current settings to urload.toml."""
         doc = tomlkit.document()
@@ -0,0 +1,245 @@
+"""
+Process-wide HTTP transport for URLoad.
+
+All fetches go through a single :class:`requests.Session` so that keep-alive
+connections and TLS sessions are reused across requests to the same host, and
+through an optional on-disk HTTP cache. Both are configured from the
+application settings.
+
+The session keeps no cookies, so that a cookie set by one host or command is
+never sent with a later, unrelated request.
+"""
+
+import http.cookiejar
+import itertools
+import threading
+from collections.abc import Callable, Mapping
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from urload import scheduler
+from urload.cache import DiskCache
+from urload.retry import RetryCallback, RetryPolicy, parse_exceptions, parse_statuses
+from urload.robots import RobotsCache, RobotsDisallowed
+from urload.settings import AppSettings
+
+HTTP_NOT_MODIFIED = 304
+ROBOTS_TIMEOUT = 10.0
+
+_lock = threading.Lock()
+_session: requests.Session | None = None
+_pool_config: tuple[int, int] = (
+    AppSettings.model_fields["pool_hosts"].default,
+    AppSettings.model_fields["pool_maxsize"].default,
+)
+_cache: DiskCache | None = None
+_cache_config: tuple[bool, str, int] = (False, "", 0)
+_retry = RetryPolicy()
+_robots: RobotsCache | None = None
+_robots_config: tuple[bool, float] = (False, 0.0)
+
+
+def _setting(settings: AppSettings | None, name: str) -> Any:
+    """Return the value of a setting, falling back to its default."""
+    return getattr(settings, name, AppSettings.model_fields[name].default)
+
+
+def configure(settings: AppSettings | None) -> None:
+    """
+    Apply the transport settings (connection pools, HTTP cache, retries, robots.txt and per-host limits).
+
+    The session and caches are only rebuilt if their settings have changed, so
+    this is cheap to call at the start of every command that performs fetches.
+
+    :param settings: The AppSettings object, or None to use the defaults.
+    """
+    global _session, _pool_config, _cache, _cache_config, _retry  # noqa: PLW0603
+    global _robots, _robots_config  # noqa: PLW0603
+    pool_config = (
+        _setting(settings, "pool_hosts"),
+        _setting(settings, "pool_maxsize"),
+    )
+    cache_config = (
+        _setting(settings, "http_cache"),
+        _setting(settings, "http_cache_dir"),
+        _setting(settings, "http_cache_max_bytes"),
+    )
+    robots_config = (
+        _setting(settings, "robots_txt"),
+        _setting(settings, "robots_txt_ttl"),
+    )
+    with _lock:
+        if pool_config != _pool_config:
+            _pool_config = pool_config
+            if _session is not None:
+                _session.close()
+                _session = None
+        if cache_config != _cache_config:
+            _cache_config = cache_config
+            enabled, directory, max_bytes = cache_config
+            _cache = DiskCache(directory, max_bytes) if enabled else None
+        _retry = RetryPolicy(
+            _setting(settings, "retry_attempts"),
+            _setting(settings, "retry_backoff"),
+            _setting(settings, "retry_backoff_max"),
+            _setting(settings, "retry_jitter"),
+            parse_statuses(_setting(settings, "retry_statuses")),
+            parse_exceptions(_setting(settings, "retry_exceptions")),
+        )
+        if robots_config != _robots_config:
+            _robots_config = robots_config
+            enabled, ttl = robots_config
+            _robots = RobotsCache(ttl, _fetch_robots) if enabled else None
+    scheduler.configure(settings)
+
+
+def disk_cache() -> DiskCache | None:
+    """
+    Return the HTTP cache, if it is enabled.
+
+    :return: The DiskCache used by :func:`fetch`, or None if caching is disabled.
+    """
+    return _cache
+
+
+def fetch(
+    url: str,
+    headers: Mapping[str, str],
+    timeout: float,
+    stream: bool = False,
+    on_retry: RetryCallback | None = None,
+) -> requests.Response:
+    """
+    Perform an HTTP GET request through the shared session and HTTP cache.
+
+    Requests that fail with a transient error are retried according to the
+    retry settings (see :class:`urload.retry.RetryPolicy`). If the robots_txt
+    setting is enabled, the URL is first checked against the host's robots.txt
+    (see :class:`urload.robots.RobotsCache`).
+
+    If the cache is enabled, fresh cached responses are returned without any
+    network traffic, and stale ones are revalidated with a conditional request.
+    Streamed responses are only added to the cache once their whole body has
+    been read. Range requests always bypass the cache.
+
+    :param url: The URL to fetch.
+    :param headers: The request headers.
+    :param timeout: Timeout in seconds for the request.
+    :param stream: If True, the body is not downloaded until it is read.
+    :param on_retry: Optional function called before each retry with the retry
+        number, the reason for it, and the delay in seconds.
+    :return: The response, either from the network or from the cache.
+    :raises requests.RequestException: If the request fails on every attempt.
+    :raises RobotsDisallowed: If robots.txt does not allow the URL to be fetched.
+    """
+    robots = _robots
+    if robots is not None and not robots.allowed(url, _user_agent(headers)):
+        raise RobotsDisallowed(f"Disallowed by robots.txt: {url}")
+    retry = _retry
+
+    def send(request_headers: dict[str, str]) -> requests.Response:
+        return retry.call(
+            _throttle_retries(
+                url,
+                lambda: session().get(
+                    url, timeout=timeout, headers=request_headers, stream=stream
+                ),
+            ),
+            on_retry,
+        )
+
+    cache = _cache
+    if cache is None or any(k.lower() == "range" for k in headers):
+        return send(dict(headers))
+    entry = cache.lookup(url, headers)
+    if entry is not None and entry.is_fresh():
+        return cache.response(entry, stream)
+    request_headers = dict(headers)
+    if entry is not None:
+        request_headers.update(entry.conditional_headers())
+    resp = send(request_headers)
+    if entry is not None and resp.status_code == HTTP_NOT_MODIFIED:
+        resp.close()
+        cache.refresh(entry, resp.headers)
+        return cache.response(entry, stream)
+    if stream:
+        cache.store_streamed(url, headers, resp)
+    else:
+        cache.store(url, headers, resp)
+    return resp
+
+
+def _fetch_robots(url: str) -> requests.Response:
+    """Fetch a robots.txt file, retrying transient errors but bypassing the HTTP cache."""
+    retry = _retry
+    return retry.call(
+        _throttle_retries(url, lambda: session().get(url, timeout=ROBOTS_TIMEOUT)),
+        None,
+    )
+
+
+def _throttle_retries(
+    url: str, send: Callable[[], requests.Response]
+) -> Callable[[], requests.Response]:
+    """
+    Make every attempt but the first wait for a token of the URL's host.
+
+    The scheduler takes a token for the first attempt when it dispatches the
+    fetch; retries are sent from the worker, and must keep to the host's rate
+    limit (and robots.txt Crawl-delay) too.
+
+    :param url: The URL being fetched.
+    :param send: Function that performs one attempt of the request.
+    :return: A function that performs one attempt, after waiting if it is a retry.
+    """
+    attempts = itertools.count()
+
+    def attempt() -> requests.Response:
+        if next(attempts):
+            scheduler.scheduler().bucket(scheduler.url_host(url)).acquire()
+        return send()
+
+    return attempt
+
+
+def _user_agent(headers: Mapping[str, str]) -> str:
+    """Return the User-Agent a request will be sent with."""
+    for name, value in headers.items():
+        if name.lower() == "user-agent":
+            return value
+    return str(session().headers.get("User-Agent", ""))
+
+
+def session() -> requests.Session:
+    """
+    Return the shared session, creating it on first use.
+
+    :return: The process-wide requests.Session.
+    """
+    global _session  # noqa: PLW0603
+    with _lock:
+        if _session is None:
+            pool_hosts, pool_maxsize = _pool_config
+            adapter = HTTPAdapter(
+                pool_connections=pool_hosts, pool_maxsize=pool_maxsize
+            )
+            new_session = requests.Session()
+            # Accept no cookies into the shared jar
+            new_session.cookies.set_policy(
+                http.cookiejar.DefaultCookiePolicy(allowed_domains=[])
+            )
+            new_session.mount("http://", adapter)
+            new_session.mount("https://", adapter)
+            _session = new_session
+        return _session
+
+
+def close() -> None:
+    """Close the shared session and all of its pooled connections."""
+    global _session  # noqa: PLW0603
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
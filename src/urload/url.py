@@ -3,25 +3,115 @@ A class representing a URL and its associated metadata.
 
 :class:`URL` encapsulates a URL string and optional metadata such as headers.
 This allows commands to manipulate URLs and pass additional information when fetching.
+
+URL lists can hold millions of entries, so URLs are immutable and compact:
+they have no instance dictionary, their hash is computed once, and their
+headers are :class:`Headers` mappings that are interned, so that URLs with
+the same headers (e.g., every link found on one page) share one mapping.
 """
 
 import json
+import threading
+import weakref
+from collections.abc import Mapping
+from typing import Any, NoReturn
 
 import requests
 
+from urload import transport
+from urload.retry import RetryCallback
+
+
+class Headers(dict[str, str]):
+    """
+    An immutable, hashable dictionary of HTTP headers.
+
+    Use :func:`intern_headers` to obtain a shared instance instead of creating
+    one directly. Methods that would modify the headers raise TypeError; use
+    ``dict(headers)`` or ``{**headers, ...}`` to get a modifiable copy.
+
+    :param headers: The headers to hold.
+    """
+
+    __slots__ = ("__weakref__", "_hash")
+
+    def __init__(self, headers: Mapping[str, str] | None = None) -> None:
+        """Initialize the headers and compute their hash."""
+        super().__init__(headers or {})
+        self._hash = hash(frozenset(self.items()))
+
+    def __hash__(self) -> int:  # type: ignore[override]
+        """Return a hash that, like equality, ignores the order of the headers."""
+        return self._hash
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        """Pickle the headers so that they are interned again when unpickled."""
+        return (intern_headers, (dict(self),))
+
+    def _immutable(self, *args: object, **kwargs: object) -> NoReturn:
+        """Refuse to modify the headers."""
+        raise TypeError("URL headers cannot be modified")
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable  # type: ignore[assignment]
+
+
+EMPTY_HEADERS = Headers()
+_interned: weakref.WeakValueDictionary[tuple[tuple[str, str], ...], Headers] = (
+    weakref.WeakValueDictionary()
+)
+_interned_lock = threading.Lock()
+
+
+def intern_headers(headers: Mapping[str, str] | None) -> Headers:
+    """
+    Return the shared Headers instance with the given contents.
+
+    :param headers: The headers, or None for no headers.
+    :return: A Headers equal to ``headers``, shared with every other caller
+        that asked for the same headers in the same order while it is in use.
+    """
+    if not headers:
+        return EMPTY_HEADERS
+    key = tuple(headers.items())
+    with _interned_lock:
+        shared = _interned.get(key)
+        if shared is None:
+            shared = Headers(headers)
+            _interned[key] = shared
+        return shared
+
 
 class URL:
     """
     Represents a URL and its associated metadata.
 
+    URLs are immutable; build a new URL to change the address or headers.
+
     :param url: The URL string.
     :param headers: Optional dictionary of HTTP headers (e.g., may include 'Referer').
+        A Headers instance is used as-is; any other mapping is interned.
     """
 
-    def __init__(self, url: str, headers: dict[str, str] | None = None) -> None:
+    __slots__ = ("_hash", "_headers", "_url")
+
+    def __init__(self, url: str, headers: Mapping[str, str] | None = None) -> None:
         """Initialize a URL with optional headers."""
-        self.url = url
-        self.headers = headers or {}
+        self._url = url
+        self._headers = (
+            headers if isinstance(headers, Headers) else intern_headers(headers)
+        )
+        self._hash = hash((url, self._headers))
+
+    @property
+    def url(self) -> str:
+        """The URL string."""
+        return self._url
+
+    @property
+    def headers(self) -> Headers:
+        """The HTTP headers sent when fetching the URL."""
+        return self._headers
 
     def __repr__(self) -> str:
         """Return a string representation of the URL object."""
@@ -31,21 +121,47 @@ class URL:
         """Return True if the other object is a URL with the same url and headers."""
         if not isinstance(other, URL):
             return NotImplemented
-        return self.url == other.url and self.headers == other.headers
+        return (
+            self._hash == other._hash
+            and self._url == other._url
+            and (self._headers is other._headers or self._headers == other._headers)
+        )
 
     def __hash__(self) -> int:
-        """Return a hash based on the url and headers."""
-        return hash((self.url, frozenset(self.headers.items())))
-
-    def get(self, timeout: float = 10.0) -> requests.Response:
+        """Return the hash of the url and headers, computed when the URL was created."""
+        return self._hash
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        """Pickle the URL without its hash, which differs between processes."""
+        return (URL, (self._url, dict(self._headers)))
+
+    def get(
+        self,
+        timeout: float = 10.0,
+        stream: bool = False,
+        extra_headers: dict[str, str] | None = None,
+        on_retry: RetryCallback | None = None,
+    ) -> requests.Response:
         """
         Perform an HTTP GET request for this URL using its headers.
 
+        The request is sent through the shared transport, so connections to the
+        same host are reused and the HTTP cache is consulted if it is enabled.
+
         :param timeout: Timeout in seconds for the request (default 10.0).
+        :param stream: If True, the body is not downloaded until it is read
+            (e.g., with ``iter_content``), and the caller must close the response.
+        :param extra_headers: Optional headers to send in addition to this URL's
+            own headers (e.g., 'Range' when resuming a download).
+        :param on_retry: Optional function called before each retry of a
+            transient failure (see :class:`urload.retry.RetryPolicy`).
         :return: The requests.Response object from the GET request.
-        :raises requests.RequestException: If the request fails.
+        :raises requests.RequestException: If the request fails on every attempt.
         """
-        return requests.get(self.url, timeout=timeout, headers=self.headers)
+        headers = {**self.headers, **extra_headers} if extra_headers else self.headers
+        return transport.fetch(
+            self.url, headers, timeout, stream=stream, on_retry=on_retry
+        )
 
     def serialize(self) -> str:
         """
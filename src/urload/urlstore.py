@@ -0,0 +1,633 @@
+"""
+Compact storage for very large URL lists.
+
+Commands pass URL lists as :data:`URLList`, a mutable sequence of URLs. A
+plain ``list`` is the default. For lists of millions of URLs, a
+:class:`URLStore` keeps the same sequence without a Python object per entry:
+the URL strings are UTF-8 bytes in a single append-only arena (optionally a
+memory-mapped file), each entry is an offset, a length and the ID of its
+header set in three typed arrays, and each distinct set of headers is stored
+once. :class:`URL` objects are created only when entries are read.
+
+The ``add`` command expands range patterns into a :class:`URLRange`, which
+knows its length and generates each URL when it is read. Adding one to a
+list turns the list into a :class:`SegmentedList`, so slicing and indexing
+(``head``, ``tail``, ``list``) stay lazy, while commands that iterate the
+list (fetching, filtering, sorting) materialize the URLs as they go.
+
+Commands that build a new list from their input use :func:`new_like` so the
+result is the same kind of container as the input.
+"""
+
+import bisect
+import itertools
+import math
+import mmap
+import os
+import tempfile
+from array import array
+from collections.abc import Iterable, Iterator, MutableSequence, Sequence
+from typing import IO, Any, cast, overload
+
+from urload.url import URL, Headers, intern_headers
+
+type URLList = MutableSequence[URL]
+
+_INITIAL_MMAP_SIZE = 1024 * 1024
+
+
+class _Arena:
+    """
+    Append-only storage for the bytes of URL strings.
+
+    :param directory: Directory for a memory-mapped backing file, or None to keep the bytes in memory.
+    """
+
+    def __init__(self, directory: str | None = None) -> None:
+        """Initialize an empty arena."""
+        self.size = 0
+        self._file: IO[bytes] | None = None
+        self._buf: bytearray | mmap.mmap = bytearray()
+        if directory is not None:
+            # The file is deleted as soon as it is closed
+            self._file = tempfile.TemporaryFile(dir=directory)
+            self._file.truncate(_INITIAL_MMAP_SIZE)
+            self._buf = mmap.mmap(self._file.fileno(), _INITIAL_MMAP_SIZE)
+
+    def append(self, data: bytes) -> int:
+        """
+        Store bytes at the end of the arena.
+
+        :param data: The bytes to store.
+        :return: The offset at which they were stored.
+        """
+        start = self.size
+        end = start + len(data)
+        buf = self._buf
+        if isinstance(buf, bytearray):
+            buf += data
+        else:
+            if end > len(buf):
+                buf = self._grow(max(end, 2 * len(buf)))
+            buf[start:end] = data
+        self.size = end
+        return start
+
+    def _grow(self, capacity: int) -> mmap.mmap:
+        """
+        Enlarge the backing file and map it again.
+
+        The old map is closed before the file is enlarged, because not every
+        platform can resize a mapped file or its map (e.g., Windows and macOS).
+
+        :param capacity: The new size of the file in bytes.
+        :return: The new memory map.
+        """
+        assert self._file is not None
+        cast(mmap.mmap, self._buf).close()
+        self._file.truncate(capacity)
+        self._buf = mmap.mmap(self._file.fileno(), capacity)
+        return self._buf
+
+    def read(self, start: int, length: int) -> str:
+        """
+        Return the string stored at an offset.
+
+        :param start: The offset returned by :meth:`append`.
+        :param length: The number of bytes stored.
+        :return: The decoded string.
+        """
+        return self._buf[start : start + length].decode("utf-8")
+
+    def key(self, start: int, length: int) -> bytes:
+        """
+        Return the bytes stored at an offset, which sort in the same order as the strings.
+
+        :param start: The offset returned by :meth:`append`.
+        :param length: The number of bytes stored.
+        :return: The UTF-8 bytes.
+        """
+        return bytes(self._buf[start : start + length])
+
+    def __del__(self) -> None:
+        """Release the memory map and its backing file."""
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+        if self._file is not None:
+            self._file.close()
+
+
+class _HeaderTable:
+    """Distinct header sets, numbered in the order they were first stored."""
+
+    def __init__(self) -> None:
+        """Initialize a table holding only the empty header set, as ID 0."""
+        self.sets: list[Headers] = [intern_headers(None)]
+        self._ids: dict[Headers, int] = {self.sets[0]: 0}
+
+    def id(self, headers: Headers) -> int:
+        """
+        Return the ID of a header set, adding it if it is new.
+
+        :param headers: The header set.
+        :return: The ID.
+        """
+        hid = self._ids.get(headers)
+        if hid is None:
+            hid = self._ids[headers] = len(self.sets)
+            self.sets.append(headers)
+        return hid
+
+
+class URLStore(MutableSequence[URL]):
+    """
+    A mutable sequence of URLs with a small, fixed cost per entry.
+
+    Stores created with :meth:`new` or by slicing share the arena and header
+    table of the store they came from, so filtering or slicing a store does
+    not copy any URL strings. The arena is never compacted; the bytes of
+    removed entries are freed when no store uses the arena any more.
+
+    :param urls: The initial URLs.
+    :param directory: If given, the URL strings are kept in a memory-mapped
+        temporary file in this directory instead of in memory.
+    """
+
+    def __init__(self, urls: Iterable[URL] = (), directory: str | None = None) -> None:
+        """Initialize a store with its own arena and header table."""
+        self._arena = _Arena(directory)
+        self._headers = _HeaderTable()
+        self._starts = array("Q")
+        self._lengths = array("I")
+        self._ids = array("I")
+        self.extend(urls)
+
+    def new(self, urls: Iterable[URL] = ()) -> "URLStore":
+        """
+        Return a new store sharing this store's arena and header table.
+
+        :param urls: The URLs of the new store.
+        :return: The new store.
+        """
+        store = URLStore.__new__(URLStore)
+        store._arena = self._arena
+        store._headers = self._headers
+        store._starts = array("Q")
+        store._lengths = array("I")
+        store._ids = array("I")
+        if isinstance(urls, URLStore) and urls._arena is self._arena:
+            # Entries already in the arena are copied without decoding them
+            store._starts.extend(urls._starts)
+            store._lengths.extend(urls._lengths)
+            store._ids.extend(urls._ids)
+        else:
+            store.extend(urls)
+        return store
+
+    def _entry(self, url: URL) -> tuple[int, int, int]:
+        """Store a URL's string and headers and return its (start, length, header ID)."""
+        data = url.url.encode("utf-8")
+        return self._arena.append(data), len(data), self._headers.id(url.headers)
+
+    def _url(self, index: int) -> URL:
+        """Build the URL at a (non-negative) index."""
+        text = self._arena.read(self._starts[index], self._lengths[index])
+        return URL(text, self._headers.sets[self._ids[index]])
+
+    def __len__(self) -> int:
+        """Return the number of URLs."""
+        return len(self._starts)
+
+    @overload
+    def __getitem__(self, index: int) -> URL: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "URLStore": ...
+
+    def __getitem__(self, index: int | slice) -> "URL | URLStore":
+        """Return the URL at an index, or a store sharing this one's arena for a slice."""
+        if isinstance(index, slice):
+            store = self.new()
+            store._starts = self._starts[index]
+            store._lengths = self._lengths[index]
+            store._ids = self._ids[index]
+            return store
+        return self._url(range(len(self))[index])
+
+    @overload
+    def __setitem__(self, index: int, value: URL) -> None: ...
+
+    @overload
+    def __setitem__(self, index: slice, value: Iterable[URL]) -> None: ...
+
+    def __setitem__(self, index: int | slice, value: Any) -> None:
+        """Replace the URL at an index, or the URLs in a slice."""
+        if isinstance(index, slice):
+            entries = [self._entry(url) for url in value]
+            self._starts[index] = array("Q", [e[0] for e in entries])
+            self._lengths[index] = array("I", [e[1] for e in entries])
+            self._ids[index] = array("I", [e[2] for e in entries])
+            return
+        index = range(len(self))[index]
+        self._starts[index], self._lengths[index], self._ids[index] = self._entry(value)
+
+    def __delitem__(self, index: int | slice) -> None:
+        """Remove the URL at an index, or the URLs in a slice."""
+        del self._starts[index]
+        del self._lengths[index]
+        del self._ids[index]
+
+    def insert(self, index: int, value: URL) -> None:
+        """
+        Insert a URL before an index.
+
+        :param index: The index to insert at.
+        :param value: The URL to insert.
+        """
+        start, length, hid = self._entry(value)
+        self._starts.insert(index, start)
+        self._lengths.insert(index, length)
+        self._ids.insert(index, hid)
+
+    def append(self, value: URL) -> None:
+        """
+        Add a URL at the end.
+
+        :param value: The URL to add.
+        """
+        start, length, hid = self._entry(value)
+        self._starts.append(start)
+        self._lengths.append(length)
+        self._ids.append(hid)
+
+    def extend(self, values: Iterable[URL]) -> None:
+        """
+        Add URLs at the end.
+
+        :param values: The URLs to add.
+        """
+        if values is self:
+            values = list(values)
+        for value in values:
+            self.append(value)
+
+    def __iter__(self) -> Iterator[URL]:
+        """Iterate over the URLs, creating each one as it is reached."""
+        read = self._arena.read
+        sets = self._headers.sets
+        for start, length, hid in zip(self._starts, self._lengths, self._ids):
+            yield URL(read(start, length), sets[hid])
+
+    def __eq__(self, other: object) -> bool:
+        """Return True if the other object is a list or store of the same URLs."""
+        if not isinstance(other, (list, URLStore)):
+            return NotImplemented
+        other_urls = cast(Sequence[object], other)
+        return len(self) == len(other_urls) and all(
+            a == b for a, b in zip(self, other_urls)
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """Return a string representation of the store."""
+        return f"URLStore({list(self)!r})"
+
+    def sorted_by_url(self) -> "URLStore":
+        """
+        Return the URLs sorted by their URL string, without creating URL objects.
+
+        UTF-8 bytes sort in the same order as the strings they encode.
+
+        :return: A sorted store sharing this store's arena.
+        """
+        key = self._arena.key
+        starts, lengths = self._starts, self._lengths
+        order = sorted(range(len(self)), key=lambda i: key(starts[i], lengths[i]))
+        store = self.new()
+        store._starts = array("Q", (starts[i] for i in order))
+        store._lengths = array("I", (lengths[i] for i in order))
+        store._ids = array("I", (self._ids[i] for i in order))
+        return store
+
+    def memory_bytes(self) -> int:
+        """
+        Return the approximate memory used by the index arrays and arena.
+
+        :return: The number of bytes, including any memory-mapped arena.
+        """
+        index = sum(
+            a.itemsize * len(a) for a in (self._starts, self._lengths, self._ids)
+        )
+        return index + self._arena.size
+
+
+class URLRange(Sequence[URL]):
+    """
+    The URLs matching a pattern of numeric ranges, generated on access.
+
+    The URLs are the combinations of the range values in nested order, with
+    the last range varying fastest, as with :func:`itertools.product`.
+
+    :param pieces: The literal text around the ranges; one more than the number of ranges.
+    :param ranges: The values of each range, with the width to zero-pad them to.
+    :param indices: The positions in the full sequence of combinations that
+        this sequence holds; all of them if None.
+    :raises ValueError: If the number of pieces does not match the ranges.
+    """
+
+    def __init__(
+        self,
+        pieces: Sequence[str],
+        ranges: Sequence[tuple[range, int]],
+        indices: range | None = None,
+    ) -> None:
+        """Initialize the sequence without generating any URLs."""
+        if len(pieces) != len(ranges) + 1:
+            raise ValueError("pieces must surround each range")
+        self._pieces = tuple(pieces)
+        self._ranges = tuple(ranges)
+        if indices is None:
+            indices = range(math.prod(len(values) for values, _ in ranges))
+        self._indices = indices
+
+    def _url(self, position: int) -> URL:
+        """Build the URL at a position in the full sequence of combinations."""
+        values: list[str] = []
+        for values_range, width in reversed(self._ranges):
+            position, digit = divmod(position, len(values_range))
+            values.append(str(values_range[digit]).zfill(width))
+        parts = [self._pieces[0]]
+        for value, piece in zip(reversed(values), self._pieces[1:]):
+            parts += (value, piece)
+        return URL("".join(parts))
+
+    def __len__(self) -> int:
+        """Return the number of URLs."""
+        return len(self._indices)
+
+    @overload
+    def __getitem__(self, index: int) -> URL: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "URLRange": ...
+
+    def __getitem__(self, index: int | slice) -> "URL | URLRange":
+        """Return the URL at an index, or a lazy range for a slice."""
+        if isinstance(index, slice):
+            return URLRange(self._pieces, self._ranges, self._indices[index])
+        return self._url(self._indices[index])
+
+    def __iter__(self) -> Iterator[URL]:
+        """Generate the URLs in order."""
+        return map(self._url, self._indices)
+
+    def __repr__(self) -> str:
+        """Return a string representation of the range."""
+        return f"URLRange({len(self)} URLs)"
+
+
+class SegmentedList(MutableSequence[URL]):
+    """
+    A URL list made of concrete segments and lazy :class:`URLRange` segments.
+
+    Indexing and slicing do not generate the URLs of lazy segments that are
+    not read. Changing a URL of a lazy segment in place (e.g., deleting it)
+    splits the segment around the change instead of generating it.
+
+    :param base: The list to start with; new concrete segments and lists
+        built from this one with :func:`new_like` are of the same kind.
+    """
+
+    def __init__(self, base: URLList) -> None:
+        """Initialize a list whose first segment is base."""
+        self.base = base
+        self._segments: list[Sequence[URL]] = [base] if len(base) else []
+
+    def _replace(self, index: int, count: int, values: list[URL]) -> None:
+        """Replace count URLs of one segment, from a (valid) list index, with values."""
+        position, offset = self._locate(index)
+        segment = self._segments[position]
+        if isinstance(segment, URLRange):
+            parts = [
+                segment[:offset],
+                new_like(self.base, values),
+                segment[offset + count :],
+            ]
+            self._segments[position : position + 1] = [p for p in parts if len(p)]
+        else:
+            cast(URLList, segment)[offset : offset + count] = values
+
+    def _locate(self, index: int) -> tuple[int, int]:
+        """Return the segment position and offset within it of a (valid) list index."""
+        ends = list(itertools.accumulate(len(s) for s in self._segments))
+        position = bisect.bisect_right(ends, index)
+        return position, index - (ends[position - 1] if position else 0)
+
+    def materialize(self) -> URLList:
+        """
+        Return the URLs as a list of the same kind as the base, generating any lazy segments.
+
+        :return: The materialized list.
+        """
+        return new_like(self.base, self)
+
+    def __len__(self) -> int:
+        """Return the number of URLs, without generating any."""
+        return sum(len(s) for s in self._segments)
+
+    @overload
+    def __getitem__(self, index: int) -> URL: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "SegmentedList": ...
+
+    def __getitem__(self, index: int | slice) -> "URL | SegmentedList":
+        """Return the URL at an index, or a segmented list for a slice."""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            result = SegmentedList(new_like(self.base))
+            if step != 1:
+                result.extend(self[i] for i in range(start, stop, step))
+                return result
+            offset = 0
+            for segment in self._segments:
+                part = segment[max(0, start - offset) : max(0, stop - offset)]
+                if len(part):
+                    result.extend(part)
+                offset += len(segment)
+            return result
+        position, offset = self._locate(range(len(self))[index])
+        return self._segments[position][offset]
+
+    @overload
+    def __setitem__(self, index: int, value: URL) -> None: ...
+
+    @overload
+    def __setitem__(self, index: slice, value: Iterable[URL]) -> None: ...
+
+    def __setitem__(self, index: int | slice, value: Any) -> None:
+        """Replace the URL at an index, or the URLs in a slice."""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                replaced = self[:start]
+                replaced.extend(list(value))
+                replaced.extend(self[max(start, stop) :])
+                self._segments = replaced._segments
+                return
+            materialized = self.materialize()
+            materialized[index] = value
+            self._segments = [materialized]
+            return
+        self._replace(range(len(self))[index], 1, [value])
+
+    def __delitem__(self, index: int | slice) -> None:
+        """Remove the URL at an index, or the URLs in a slice."""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                kept = self[:start]
+                kept.extend(self[max(start, stop) :])
+                self._segments = kept._segments
+                return
+            materialized = self.materialize()
+            del materialized[index]
+            self._segments = [materialized]
+            return
+        self._replace(range(len(self))[index], 1, [])
+
+    def insert(self, index: int, value: URL) -> None:
+        """
+        Insert a URL before an index.
+
+        :param index: The index to insert at.
+        :param value: The URL to insert.
+        """
+        index = min(max(index + len(self) if index < 0 else index, 0), len(self))
+        if index == len(self):
+            self.append(value)
+            return
+        self._replace(index, 0, [value])
+
+    def append(self, value: URL) -> None:
+        """
+        Add a URL at the end.
+
+        :param value: The URL to add.
+        """
+        if not self._segments or isinstance(self._segments[-1], URLRange):
+            self._segments.append(new_like(self.base))
+        cast(URLList, self._segments[-1]).append(value)
+
+    def extend(self, values: Iterable[URL]) -> None:
+        """
+        Add URLs at the end, keeping URLRanges (and the lazy segments of a SegmentedList) lazy.
+
+        :param values: The URLs to add.
+        """
+        if isinstance(values, URLRange):
+            self._segments.append(values)
+        elif isinstance(values, SegmentedList):
+            for segment in list(values._segments):
+                self.extend(segment)
+        else:
+            for value in list(values) if values is self else values:
+                self.append(value)
+
+    def __iter__(self) -> Iterator[URL]:
+        """Iterate over the URLs, generating those of lazy segments as they are reached."""
+        return itertools.chain.from_iterable(self._segments)
+
+    def __eq__(self, other: object) -> bool:
+        """Return True if the other object is a list or sequence of the same URLs."""
+        if not isinstance(other, (list, URLStore, SegmentedList)):
+            return NotImplemented
+        other_urls = cast(Sequence[object], other)
+        return len(self) == len(other_urls) and all(
+            a == b for a, b in zip(self, other_urls)
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """Return a string representation of the list."""
+        return f"SegmentedList({self._segments!r})"
+
+
+def new_url_list(settings: Any) -> URLList:
+    """
+    Return an empty URL list of the kind selected by the url_store setting.
+
+    :param settings: The AppSettings object, or None for a plain list.
+    :return: An empty list, URLStore, or memory-mapped URLStore.
+    """
+    kind = getattr(settings, "url_store", "list")
+    if kind == "compact":
+        return URLStore()
+    if kind == "mmap":
+        session_dir = f"{settings.session_dir_num:04d}"
+        os.makedirs(session_dir, exist_ok=True)
+        return URLStore(directory=session_dir)
+    return []
+
+
+def convert(url_list: URLList, settings: Any) -> URLList:
+    """
+    Return a list of the kind selected by the url_store setting holding the URLs of another.
+
+    :param url_list: The URLs; its lazy segments, if any, stay lazy.
+    :param settings: The AppSettings object.
+    :return: A new list; url_list is not changed.
+    """
+    result = new_url_list(settings)
+    if isinstance(url_list, SegmentedList):
+        result = SegmentedList(result)
+    result.extend(url_list)
+    return result
+
+
+def new_like(url_list: URLList, urls: Iterable[URL] = ()) -> URLList:
+    """
+    Return a new URL list of the same kind as another.
+
+    :param url_list: The list whose kind to copy (e.g., a command's input).
+    :param urls: The URLs of the new list.
+    :return: A URLStore sharing url_list's storage if it is one, else a list.
+    """
+    if isinstance(url_list, SegmentedList):
+        url_list = url_list.base
+    if isinstance(url_list, URLStore):
+        return url_list.new(urls)
+    return list(urls)
+
+
+def concat(url_list: URLList, urls: Iterable[URL]) -> URLList:
+    """
+    Return a new URL list of the same kind as another, followed by more URLs.
+
+    :param url_list: The list to start with; its lazy segments, if any, stay lazy.
+    :param urls: The URLs to add at the end.
+    :return: A new list; url_list is not changed.
+    """
+    if isinstance(url_list, SegmentedList):
+        result: URLList = SegmentedList(new_like(url_list))
+        result.extend(url_list)
+    else:
+        result = new_like(url_list, url_list)
+    result.extend(urls)
+    return result
+
+
+def sorted_by_url(url_list: URLList) -> URLList:
+    """
+    Return a URL list sorted by URL string, of the same kind as the input.
+
+    :param url_list: The URLs to sort.
+    :return: The sorted URLs.
+    """
+    if isinstance(url_list, SegmentedList):
+        url_list = url_list.materialize()
+    if isinstance(url_list, URLStore):
+        return url_list.sorted_by_url()
+    return sorted(url_list, key=lambda u: u.url)
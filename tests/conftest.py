@@ -0,0 +1,77 @@
+"""Shared fixtures for the URLoad tests."""
+
+from collections.abc import Generator, Iterator, Mapping
+from typing import Any
+
+import pytest
+import requests
+
+from urload import pagecache
+
+HTTP_ERROR = 400
+HTTP_NOT_FOUND = 404
+
+# The URL and headers of each request made through the fetches fixture
+type Fetches = list[tuple[str, dict[str, str]]]
+
+
+class DummyResponse:
+    """A dummy response object for mocking requests.Session.get."""
+
+    def __init__(self, content: str | bytes, status_code: int = 200) -> None:
+        """
+        Initialize with the body, given as text or as bytes.
+
+        :param content: The body; text is encoded as UTF-8.
+        :param status_code: The HTTP status code.
+        """
+        self.status_code = status_code
+        self.content = content.encode("utf-8") if isinstance(content, str) else content
+        self.text = self.content.decode("utf-8", "replace")
+        self.headers: dict[str, str] = {}
+
+    def raise_for_status(self) -> None:
+        """Raise an exception if the status is an error."""
+        if self.status_code >= HTTP_ERROR:
+            raise requests.HTTPError(f"HTTP {self.status_code}")
+
+    def iter_content(self, chunk_size: int = 1) -> Iterator[bytes]:
+        """Yield the body in chunks of chunk_size bytes."""
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i : i + chunk_size]
+
+    def close(self) -> None:
+        """No-op for closing the response."""
+
+
+@pytest.fixture
+def site() -> Mapping[str, str | bytes]:
+    """Return the pages served by the fetches fixture; test modules override this."""
+    return {}
+
+
+@pytest.fixture
+def fetches(
+    monkeypatch: pytest.MonkeyPatch, site: Mapping[str, str | bytes]
+) -> Fetches:
+    """Serve the pages of the site fixture, or 404, and record each request with its headers."""
+    fetched: Fetches = []
+
+    def mock_get(
+        self: Any, url: str, headers: dict[str, str] | None = None, **kwargs: Any
+    ) -> DummyResponse:
+        fetched.append((url, dict(headers or {})))
+        if url not in site:
+            return DummyResponse(b"", HTTP_NOT_FOUND)
+        return DummyResponse(site[url])
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+    return fetched
+
+
+@pytest.fixture(autouse=True)
+def clear_page_cache() -> Generator[None, None, None]:
+    """Keep pages fetched by one test from being served to another."""
+    pagecache.page_cache().clear()
+    yield
+    pagecache.page_cache().clear()
@@ -5,6 +5,7 @@ import pytest
 from urload.commands.add import AddCommand
 from urload.commands.base import CommandError
 from urload.url import URL
+from urload.urlstore import SegmentedList
 
 
 def test_add_command_appends_url(capsys: pytest.CaptureFixture[str]) -> None:
@@ -84,3 +85,33 @@ def test_add_command_multiple_ranges_leading_zeros() -> None:
         "https://ex.com/f02/b003.dat",
         "https://ex.com/f02/b004.dat",
     ]
+
+
+def test_add_command_range_is_lazy(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that a large range is added without generating its URLs."""
+    cmd = AddCommand()
+    url_list: list[URL] = [URL("https://ex.com/first")]
+    result = cmd.run(["https://ex.com/img[0000-9999]/[000-999].jpg"], url_list)
+    assert isinstance(result, SegmentedList)
+    assert len(result) == 10_000_001  # noqa: PLR2004
+    assert result[0].url == "https://ex.com/first"
+    assert result[5_000_124].url == "https://ex.com/img5000/123.jpg"
+    assert [u.url for u in result[-2:]] == [
+        "https://ex.com/img9999/998.jpg",
+        "https://ex.com/img9999/999.jpg",
+    ]
+    assert "Added 10000000 URLs." in capsys.readouterr().out
+
+
+def test_add_command_after_range() -> None:
+    """Test that URLs added after a range follow it."""
+    cmd = AddCommand()
+    result = cmd.run(["https://ex.com/[1-2]"], [])
+    result = cmd.run(["https://ex.com/last"], result)
+    result = cmd.run(["https://ex.com/[3-3]"], result)
+    assert [u.url for u in result] == [
+        "https://ex.com/1",
+        "https://ex.com/2",
+        "https://ex.com/last",
+        "https://ex.com/3",
+    ]
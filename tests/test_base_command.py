@@ -5,7 +5,7 @@ from typing import Any
 import pytest
 
 from urload.commands.base import Command, CommandError
-from urload.url import URL
+from urload.urlstore import URLList
 
 
 class DummyCommand(Command):
@@ -15,8 +15,8 @@ class DummyCommand(Command):
     description = "Dummy command for testing.\nSecond line."
 
     def run(
-        self, args: list[str], url_list: list[URL], settings: Any | None = None
-    ) -> list[URL]:
+        self, args: list[str], url_list: URLList, settings: Any | None = None
+    ) -> URLList:
         """Raise CommandError if 'error' is in args, else store args and return url_list unchanged."""
         if "error" in args:
             raise CommandError("Dummy error!")
@@ -0,0 +1,68 @@
+"""Tests for the Bloom filter seen-set."""
+
+import pytest
+
+from urload.bloom import BloomFilter
+
+
+def test_no_false_negatives() -> None:
+    """Test that every added entry is reported as present."""
+    seen = BloomFilter(1000, 0.01)
+    items = [f"https://x.com/{i}" for i in range(1000)]
+    for item in items:
+        seen.add(item)
+    assert all(item in seen for item in items)
+
+
+def test_add_reports_new_entries() -> None:
+    """Test that add returns whether the entry was new."""
+    seen = BloomFilter(10)
+    assert seen.add("https://a.com")
+    assert not seen.add("https://a.com")
+    assert len(seen) == 1
+
+
+def test_false_positive_rate() -> None:
+    """Test that the false-positive rate is close to the requested one."""
+    seen = BloomFilter(10_000, 0.01)
+    for i in range(10_000):
+        seen.add(f"https://x.com/{i}")
+    false_positives = sum(f"https://y.com/{i}" in seen for i in range(10_000))
+    assert false_positives < 200  # noqa: PLR2004
+
+
+def test_grows_past_capacity() -> None:
+    """Test that the filter adds slices and keeps its error rate when overfilled."""
+    seen = BloomFilter(100, 0.01)
+    items = [f"https://x.com/{i}" for i in range(1000)]
+    for item in items:
+        seen.add(item)
+    assert all(item in seen for item in items)
+    stats = seen.stats()
+    assert stats.slices > 1
+    assert stats.error_rate < 0.01  # noqa: PLR2004
+    false_positives = sum(f"https://y.com/{i}" in seen for i in range(10_000))
+    assert false_positives < 200  # noqa: PLR2004
+
+
+def test_stats() -> None:
+    """Test the reported memory use and fill ratio."""
+    seen = BloomFilter(1000, 0.001)
+    empty = seen.stats()
+    assert empty.entries == 0
+    assert empty.fill_ratio == 0
+    for i in range(1000):
+        seen.add(str(i))
+    stats = seen.stats()
+    assert stats.entries > 990  # noqa: PLR2004
+    # About 1.8 bytes per entry at a 0.05% per-slice rate
+    assert stats.memory_bytes < 2500  # noqa: PLR2004
+    assert 0.4 < stats.fill_ratio < 0.6  # noqa: PLR2004
+    assert "entries" in str(stats)
+
+
+@pytest.mark.parametrize(("capacity", "error_rate"), [(0, 0.01), (10, 0), (10, 1)])
+def test_invalid_arguments(capacity: int, error_rate: float) -> None:
+    """Test that out-of-range arguments are rejected."""
+    with pytest.raises(ValueError):
+        BloomFilter(capacity, error_rate)
@@ -0,0 +1,188 @@
+"""Tests for the on-disk HTTP cache."""
+
+import io
+from collections.abc import Generator
+from pathlib import Path
+from typing import Any
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from urload import transport
+from urload.cache import DiskCache, freshness_lifetime, is_storable
+from urload.settings import AppSettings
+from urload.url import URL
+
+MAX_AGE = 60
+
+
+def make_response(
+    body: bytes, status: int = 200, headers: dict[str, str] | None = None
+) -> requests.Response:
+    """Build a real requests.Response serving the given body."""
+    resp = requests.Response()
+    resp.status_code = status
+    resp.headers = CaseInsensitiveDict(headers or {})
+    resp.raw = io.BytesIO(body)
+    return resp
+
+
+class FakeServer:
+    """Serve canned responses to requests.Session.get and record the requests."""
+
+    def __init__(self, *responses: requests.Response) -> None:
+        """Initialize with the responses to return, in order."""
+        self.responses = list(responses)
+        self.requests: list[dict[str, str]] = []
+
+    def get(
+        self, url: str, headers: dict[str, str], **kwargs: Any
+    ) -> requests.Response:
+        """Return the next canned response."""
+        self.requests.append(headers)
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def cached_transport(tmp_path: Path) -> Generator[DiskCache, None, None]:
+    """Enable the HTTP cache in a temporary directory."""
+    settings = AppSettings()
+    settings.http_cache = True
+    settings.http_cache_dir = str(tmp_path / "cache")
+    transport.configure(settings)
+    disk_cache = transport.disk_cache()
+    assert disk_cache is not None
+    yield disk_cache
+    transport.configure(None)
+
+
+def test_freshness_lifetime() -> None:
+    """Test freshness computed from Cache-Control and Expires."""
+    assert (
+        freshness_lifetime({"Cache-Control": f"public, max-age={MAX_AGE}"}) == MAX_AGE
+    )
+    assert freshness_lifetime({"Cache-Control": "no-cache, max-age=60"}) == 0
+    assert (
+        freshness_lifetime(
+            {
+                "Date": "Mon, 01 Jan 2024 00:00:00 GMT",
+                "Expires": "Mon, 01 Jan 2024 00:01:00 GMT",
+            }
+        )
+        == MAX_AGE
+    )
+    assert freshness_lifetime({}) == 0
+
+
+def test_is_storable() -> None:
+    """Test that only cacheable responses are stored."""
+    assert is_storable(200, {"ETag": '"a"'})
+    assert is_storable(200, {"Cache-Control": "max-age=10"})
+    assert not is_storable(200, {})
+    assert not is_storable(404, {"ETag": '"a"'})
+    assert not is_storable(200, {"ETag": '"a"', "Cache-Control": "no-store"})
+
+
+def test_fresh_entry_served_without_network(
+    cached_transport: DiskCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a fresh entry is served from the cache."""
+    server = FakeServer(make_response(b"page", headers={"Cache-Control": "max-age=60"}))
+    monkeypatch.setattr("requests.Session.get", server.get)
+    url = URL("https://example.com/")
+    assert url.get().content == b"page"
+    assert url.get().content == b"page"
+    assert len(server.requests) == 1
+    assert cached_transport.stats() == (1, 4)
+
+
+def test_stale_entry_revalidated(
+    cached_transport: DiskCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a stale entry is revalidated and reused on 304."""
+    server = FakeServer(
+        make_response(b"page", headers={"ETag": '"v1"'}),
+        make_response(b"", status=304, headers={"ETag": '"v1"'}),
+    )
+    monkeypatch.setattr("requests.Session.get", server.get)
+    url = URL("https://example.com/", headers={"Referer": "https://ref.com"})
+    assert url.get().content == b"page"
+    resp = url.get()
+    assert resp.status_code == 200  # noqa: PLR2004
+    assert resp.content == b"page"
+    assert server.requests[1] == {"Referer": "https://ref.com", "If-None-Match": '"v1"'}
+
+
+def test_streamed_response_served_from_cache(
+    cached_transport: DiskCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that cached entries can be streamed."""
+    server = FakeServer(
+        make_response(b"0123456789", headers={"Cache-Control": "max-age=60"})
+    )
+    monkeypatch.setattr("requests.Session.get", server.get)
+    url = URL("https://example.com/data")
+    url.get().close()
+    resp = url.get(stream=True)
+    assert list(resp.iter_content(4)) == [b"0123", b"4567", b"89"]
+    assert resp.raw.closed
+    resp.close()
+
+
+def test_streamed_fetch_stored_once_read(
+    cached_transport: DiskCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a streamed fetch is cached only once its body has been read."""
+    headers = {"Cache-Control": "max-age=60"}
+    server = FakeServer(
+        make_response(b"0123456789", headers=headers),
+        make_response(b"0123456789", headers=headers),
+    )
+    monkeypatch.setattr("requests.Session.get", server.get)
+    url = URL("https://example.com/data")
+    resp = url.get(stream=True)
+    chunks = resp.iter_content(4)
+    assert next(chunks) == b"0123"
+    del chunks
+    resp.close()
+    assert cached_transport.stats() == (0, 0)
+    resp = url.get(stream=True)
+    assert b"".join(resp.iter_content(4)) == b"0123456789"
+    assert cached_transport.stats() == (1, 10)
+    assert url.get().content == b"0123456789"
+    assert len(server.requests) == 2  # noqa: PLR2004
+    assert list(Path(cached_transport.directory).glob("*.tmp")) == []
+
+
+def test_streamed_response_closed_with_response(tmp_path: Path) -> None:
+    """Test that a partly read cached body is closed along with its response."""
+    disk_cache = DiskCache(str(tmp_path), max_bytes=100)
+    headers = {"Cache-Control": "max-age=60"}
+    disk_cache.store("https://a", {}, make_response(b"aaaa", headers=headers))
+    entry = disk_cache.lookup("https://a", {})
+    assert entry is not None
+    resp = disk_cache.response(entry, stream=True)
+    assert next(resp.iter_content(2)) == b"aa"
+    resp.close()
+    assert resp.raw.closed
+
+
+def test_lru_eviction(tmp_path: Path) -> None:
+    """Test that the least recently used entries are evicted first."""
+    disk_cache = DiskCache(str(tmp_path), max_bytes=10)
+    headers = {"Cache-Control": "max-age=60"}
+    disk_cache.store("https://a", {}, make_response(b"aaaa", headers=headers))
+    disk_cache.store("https://b", {}, make_response(b"bbbb", headers=headers))
+    entry = disk_cache.lookup("https://a", {})
+    assert entry is not None
+    disk_cache.response(entry).close()
+    disk_cache.store("https://c", {}, make_response(b"cccc", headers=headers))
+    assert disk_cache.lookup("https://a", {}) is not None
+    assert disk_cache.lookup("https://b", {}) is None
+    assert disk_cache.lookup("https://c", {}) is not None
+    # The index is rebuilt from disk
+    assert DiskCache(str(tmp_path), max_bytes=10).stats() == (2, 8)
+    disk_cache.clear()
+    assert disk_cache.stats() == (0, 0)
+    assert list(tmp_path.iterdir()) == []
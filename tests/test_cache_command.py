@@ -0,0 +1,54 @@
+"""Tests for the CacheCommand."""
+
+import io
+from pathlib import Path
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from urload import transport
+from urload.commands.base import CommandError
+from urload.commands.cache import CacheCommand
+from urload.settings import AppSettings
+from urload.url import URL
+
+
+def test_cache_command_disabled(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that the command reports when the cache is disabled."""
+    url_list = [URL("https://example.com")]
+    assert CacheCommand().run([], url_list, AppSettings()) is url_list
+    assert "HTTP cache is disabled." in capsys.readouterr().out
+
+
+def test_cache_command_stats_and_clear(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that the command shows statistics and clears the cache."""
+    settings = AppSettings()
+    settings.http_cache = True
+    settings.http_cache_dir = str(tmp_path)
+    settings.http_cache_max_bytes = 1000
+    cmd = CacheCommand()
+    try:
+        cmd.run([], [], settings)
+        disk_cache = transport.disk_cache()
+        assert disk_cache is not None
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.headers = CaseInsensitiveDict({"ETag": '"a"'})
+        resp.raw = io.BytesIO(b"hello")
+        disk_cache.store("https://example.com", {}, resp)
+        cmd.run([], [], settings)
+        assert "1 entries, 5 of 1000 bytes" in capsys.readouterr().out
+        cmd.run(["clear"], [], settings)
+        assert "HTTP cache cleared." in capsys.readouterr().out
+        assert disk_cache.stats() == (0, 0)
+    finally:
+        transport.configure(None)
+
+
+def test_cache_command_invalid_args() -> None:
+    """Test that unknown arguments raise CommandError."""
+    with pytest.raises(CommandError):
+        CacheCommand().run(["purge"], [], AppSettings())
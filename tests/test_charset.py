@@ -0,0 +1,72 @@
+"""Tests for page encoding detection."""
+
+import codecs
+
+import pytest
+
+from urload import charset
+from urload.charset import StreamDecoder, declared_encoding, sniff_encoding
+
+
+@pytest.mark.parametrize(
+    ("content_type", "expected"),
+    [
+        ("text/html; charset=UTF-8", "utf-8"),
+        ('text/html; charset="Shift_JIS"', "shift_jis"),
+        ("text/html; charset=iso-8859-1", "windows-1252"),
+        ("text/html", None),
+        ("text/html; charset=bogus", None),
+    ],
+)
+def test_declared_encoding(content_type: str, expected: str | None) -> None:
+    """Test that only an explicit, known charset is reported."""
+    assert declared_encoding({"content-type": content_type}) == expected
+
+
+def test_declared_encoding_without_header() -> None:
+    """Test that a missing Content-Type declares nothing."""
+    assert declared_encoding({}) is None
+
+
+@pytest.mark.parametrize(
+    ("prefix", "declared", "expected"),
+    [
+        (codecs.BOM_UTF8 + b"<meta charset=latin1>", "koi8-r", "utf-8-sig"),
+        (b'<meta charset="koi8-r">', "cp1251", "cp1251"),
+        (b'<meta charset="koi8-r">', None, "koi8-r"),
+        (
+            b'<meta http-equiv="Content-Type" content="text/html; charset=euc-jp">',
+            None,
+            "euc_jp",
+        ),
+        (b"<meta charset=utf-16>", None, "utf-8"),
+        (b" " * 2000 + b"<meta charset=koi8-r>", None, "utf-8"),
+        (b"<p>plain</p>", None, "utf-8"),
+    ],
+)
+def test_sniff_encoding(prefix: bytes, declared: str | None, expected: str) -> None:
+    """Test the order of precedence: BOM, header, <meta> in the prefix, UTF-8."""
+    assert sniff_encoding(prefix, declared) == expected
+
+
+def test_decode() -> None:
+    """Test that a page is decoded with its <meta> charset."""
+    body = '<meta charset="koi8-r"><title>Привет</title>'.encode("koi8-r")
+    assert charset.decode(body) == '<meta charset="koi8-r"><title>Привет</title>'
+
+
+def test_stream_decoder_buffers_prefix() -> None:
+    """Test that the stream decoder waits for the prefix before choosing."""
+    body = ("<meta charset=cp1251>" + " " * 2000 + "Ж").encode("cp1251")
+    decoder = StreamDecoder()
+    pieces = [decoder.decode(body[i : i + 100]) for i in range(0, len(body), 100)]
+    pieces.append(decoder.decode(b"", final=True))
+    assert pieces[0] == ""
+    assert "".join(pieces) == body.decode("cp1251")
+
+
+def test_stream_decoder_short_body() -> None:
+    """Test that a body shorter than the prefix is decoded at the end."""
+    decoder = StreamDecoder("utf-8")
+    assert decoder.decode("é".encode()) == ""
+    assert decoder.decode(b"", final=True) == "é"
@@ -79,3 +79,16 @@ def test_no_completion_for_other_args(
     assert get_completions(completer, "add foo", event) == []
     assert get_completions(completer, "del 1", event) == []
     assert get_completions(completer, "uniq something", event) == []
+
+
+def test_complete_after_pipe(completer: CommandCompleter, event: CompleteEvent) -> None:
+    """Test that command names are completed after a standalone pipe."""
+    assert get_completions(completer, "list | u", event) == ["uniq"]
+    assert set(get_completions(completer, "list | ", event)) == {
+        "add",
+        "del",
+        "help",
+        "list",
+        "uniq",
+    }
+    assert get_completions(completer, "list a|u", event) == []
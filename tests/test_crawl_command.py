@@ -0,0 +1,143 @@
+"""Tests for the crawl command."""
+
+import os
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+import pytest
+from conftest import DummyResponse, Fetches
+
+from urload.commands.base import CommandError
+from urload.commands.crawl import CrawlCommand
+from urload.settings import AppSettings
+from urload.url import URL
+
+SITE = {
+    "https://a.com/": '<a href="/1">1</a><a href="/2#top">2</a><a href="https://b.com/">b</a>',
+    "https://a.com/1": '<a href="/">home</a><a href="/1/deep">deep</a>',
+    "https://a.com/2": '<a href="/1">1</a><a href="mailto:x@a.com">mail</a>',
+    "https://a.com/1/deep": '<a href="/deeper">deeper</a>',
+    "https://b.com/": '<a href="/x">x</a>',
+}
+
+
+@pytest.fixture
+def site() -> Mapping[str, str | bytes]:
+    """Serve SITE to the fetches fixture."""
+    return SITE
+
+
+def test_crawl_depth_one_matches_href(
+    fetches: Fetches,
+) -> None:
+    """Test that depth 1 returns the in-scope links of the original pages."""
+    result = CrawlCommand().run(["1"], [URL("https://a.com/")])
+    assert [u.url for u in result] == ["https://a.com/1", "https://a.com/2"]
+    assert all(u.headers == {"Referer": "https://a.com/"} for u in result)
+    assert [url for url, _ in fetches] == ["https://a.com/"]
+
+
+def test_crawl_visits_each_page_once(
+    fetches: Fetches,
+) -> None:
+    """Test breadth-first order, de-duplication and the Referer of discovered pages."""
+    result = CrawlCommand().run(["2"], [URL("https://a.com/")])
+    assert [u.url for u in result] == [
+        "https://a.com/1",
+        "https://a.com/2",
+        "https://a.com/1/deep",
+    ]
+    assert result[2].headers == {"Referer": "https://a.com/1"}
+    fetched = [url for url, _ in fetches]
+    assert fetched == ["https://a.com/", "https://a.com/1", "https://a.com/2"]
+    assert fetches[1][1] == {"Referer": "https://a.com/"}
+
+
+def test_crawl_approx(fetches: Fetches, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that a Bloom filter seen-set gives the same crawl on a small site."""
+    result = CrawlCommand().run(["2", "--approx"], [URL("https://a.com/")])
+    assert [u.url for u in result] == [
+        "https://a.com/1",
+        "https://a.com/2",
+        "https://a.com/1/deep",
+    ]
+    assert "Seen-set: 4 entries" in capsys.readouterr().out
+
+
+def test_crawl_any_host(fetches: Fetches) -> None:
+    """Test that -H follows links to other hosts."""
+    result = CrawlCommand().run(["2", "-H"], [URL("https://a.com/")])
+    assert "https://b.com/x" in {u.url for u in result}
+
+
+def test_crawl_regex_scope(fetches: Fetches) -> None:
+    """Test that -r restricts which links are followed."""
+    result = CrawlCommand().run(["3", "-r", "/1"], [URL("https://a.com/")])
+    assert [u.url for u in result] == ["https://a.com/1", "https://a.com/1/deep"]
+
+
+def test_crawl_reports_errors(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that pages that fail to fetch are reported and skipped."""
+
+    def mock_get(self: Any, url: str, **kwargs: Any) -> DummyResponse:
+        raise Exception("fail")
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+    assert CrawlCommand().run(["2"], [URL("https://a.com/")]) == []
+    assert "[1] https://a.com/ -> Error: fail" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize(
+    "args",
+    [[], ["x"], ["0"], ["1", "-r"], ["1", "-r", "("], ["1", "-z"], ["--resume"]],
+)
+def test_crawl_invalid_args(args: list[str]) -> None:
+    """Test that invalid arguments raise CommandError."""
+    with pytest.raises(CommandError):
+        CrawlCommand().run(args, [URL("https://a.com/")])
+
+
+def test_crawl_resume_after_interruption(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Test that --resume finishes an interrupted crawl without refetching pages."""
+    monkeypatch.chdir(tmp_path)
+    settings = AppSettings()
+    settings.download_concurrency = 1
+    fetched: list[str] = []
+    interrupt = ["https://a.com/2"]
+
+    def mock_get(self: Any, url: str, **kwargs: Any) -> DummyResponse:
+        if url in interrupt:
+            interrupt.remove(url)
+            raise KeyboardInterrupt
+        fetched.append(url)
+        return DummyResponse(SITE.get(url, ""))
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+    with pytest.raises(KeyboardInterrupt):
+        CrawlCommand().run(["3"], [URL("https://a.com/")], settings)
+    assert os.path.exists(os.path.join("0000", "crawl-frontier.sqlite"))
+    assert fetched == ["https://a.com/", "https://a.com/1"]
+
+    result = CrawlCommand().run(["--resume", "0000"], [], settings)
+    assert fetched[2:] == ["https://a.com/2", "https://a.com/1/deep"]
+    assert [u.url for u in result] == [
+        "https://a.com/1",
+        "https://a.com/2",
+        "https://a.com/1/deep",
+        "https://a.com/deeper",
+    ]
+    assert os.listdir("0000") == []
+
+
+def test_crawl_resume_without_queue(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Test that resuming a session with no interrupted crawl is an error."""
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(CommandError):
+        CrawlCommand().run(["--resume", "0000"], [])
@@ -0,0 +1,121 @@
+"""Tests for the extract command."""
+
+import threading
+from collections.abc import Mapping
+from typing import Any
+
+import pytest
+from conftest import DummyResponse, Fetches
+
+from urload.commands.base import CommandError
+from urload.commands.extract import ExtractCommand
+from urload.settings import AppSettings
+from urload.url import URL
+
+HTML = (
+    "<html><head><title> Page </title></head><body>"
+    '<a href="/one">1</a><img src="pic.png"><a href="https://b.com/two">2</a>'
+    "<a>no link</a><img alt='no source'>"
+    "</body></html>"
+)
+
+
+@pytest.fixture
+def site() -> Mapping[str, str | bytes]:
+    """Serve HTML to the fetches fixture."""
+    return {"https://example.com/": HTML, "https://example.com/dir/": HTML}
+
+
+def test_extract_links_and_images_in_document_order(fetches: Fetches) -> None:
+    """Test that anchors and images are extracted together in document order."""
+    result = ExtractCommand().run([], [URL("https://example.com/dir/")])
+    assert [u.url for u in result] == [
+        "https://example.com/one",
+        "https://example.com/dir/pic.png",
+        "https://b.com/two",
+    ]
+    for u in result:
+        assert u.headers == {"Referer": "https://example.com/dir/"}
+    assert [url for url, _ in fetches] == ["https://example.com/dir/"]
+
+
+@pytest.mark.parametrize(
+    ("args", "expected"),
+    [
+        (["-a"], ["https://example.com/one", "https://b.com/two"]),
+        (["-i"], ["https://example.com/pic.png"]),
+        (
+            ["-a", "-i"],
+            [
+                "https://example.com/one",
+                "https://example.com/pic.png",
+                "https://b.com/two",
+            ],
+        ),
+    ],
+)
+def test_extract_selects_kinds(
+    fetches: Fetches, args: list[str], expected: list[str]
+) -> None:
+    """Test that -a and -i choose which kinds of links are extracted."""
+    result = ExtractCommand().run(args, [URL("https://example.com/")])
+    assert [u.url for u in result] == expected
+
+
+def test_extract_prints_title(
+    fetches: Fetches, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that -t prints the page title."""
+    ExtractCommand().run(["-t", "-a"], [URL("https://example.com/")])
+    out = capsys.readouterr().out
+    assert "https://example.com/ -> 2 found" in out
+    assert "title: Page" in out
+
+
+def test_extract_handles_fetch_error(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that fetch errors are reported and the URL is skipped."""
+
+    def mock_get(self: Any, url: str, **kwargs: Any) -> DummyResponse:
+        raise Exception("fail")
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+    assert ExtractCommand().run([], [URL("https://example.com/")]) == []
+    assert "Error: fail" in capsys.readouterr().out
+
+
+def test_extract_rejects_unknown_args() -> None:
+    """Test that unknown arguments raise CommandError."""
+    with pytest.raises(CommandError):
+        ExtractCommand().run(["-x"], [URL("https://example.com/")])
+
+
+def test_extract_fetches_in_parallel_and_prints_in_order(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that pages are fetched concurrently and complete lines keep list order."""
+    workers = 4
+    barrier = threading.Barrier(workers, timeout=5)
+
+    def mock_get(self: Any, url: str, **kwargs: Any) -> DummyResponse:
+        barrier.wait()  # Every fetch must be in flight at the same time
+        return DummyResponse(f'<title>{url}</title><a href="{url}next">next</a>')
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+    settings = AppSettings()
+    settings.download_concurrency = workers
+    url_list = [URL(f"https://host{i}.com/") for i in range(workers)]
+    result = ExtractCommand().run(["-t"], url_list, settings)
+    assert [u.url for u in result] == [
+        f"https://host{i}.com/next" for i in range(workers)
+    ]
+    lines = capsys.readouterr().out.splitlines()
+    assert lines == [
+        line
+        for i in range(workers)
+        for line in (
+            f"https://host{i}.com/ -> 1 found",
+            f"  title: https://host{i}.com/",
+        )
+    ]
@@ -0,0 +1,94 @@
+"""Tests for the persistent crawl and download queue."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from urload.frontier import MEMORY, Frontier, frontier_path
+from urload.settings import AppSettings
+from urload.url import URL
+
+
+def test_add_deduplicates_by_key() -> None:
+    """Test that a key is queued only once, even after it has been processed."""
+    frontier = Frontier(MEMORY)
+    assert frontier.add("a", URL("https://a.com/#x"))
+    assert not frontier.add("a", URL("https://a.com/#y"))
+    (item,) = frontier.take(10)
+    frontier.finish(item)
+    assert not frontier.add("a", URL("https://a.com/"))
+    assert frontier.take(10) == []
+
+
+def test_take_in_batches_by_level() -> None:
+    """Test that items are taken in order of level, then insertion, in batches."""
+    frontier = Frontier(MEMORY)
+    frontier.add("deep", URL("https://a.com/deep"), level=1)
+    for i in range(3):
+        frontier.add(str(i), URL(f"https://a.com/{i}"))
+    assert [item.url.url for item in frontier.take(2)] == [
+        "https://a.com/0",
+        "https://a.com/1",
+    ]
+    assert [item.url.url for item in frontier.take(2, below_level=1)] == [
+        "https://a.com/2"
+    ]
+    assert frontier.take(2, below_level=1) == []
+    assert [item.level for item in frontier.take(2)] == [1]
+
+
+def test_items_round_trip_headers_and_data() -> None:
+    """Test that headers and caller data are stored with each item."""
+    frontier = Frontier(MEMORY)
+    frontier.add("k", URL("https://a.com/", {"Referer": "https://r.com/"}), 2, "data")
+    (item,) = frontier.items(min_level=2)
+    assert item.url == URL("https://a.com/", {"Referer": "https://r.com/"})
+    assert (item.level, item.data) == (2, "data")
+    assert list(frontier.items(min_level=3)) == []
+
+
+def test_resume_requeues_unfinished_items(tmp_path: Path) -> None:
+    """Test that a reopened frontier continues where the previous one stopped."""
+    path = os.path.join(tmp_path, "frontier.sqlite")
+    frontier = Frontier(path)
+    frontier.set_meta("args", "[1]")
+    for i in range(3):
+        frontier.add(str(i), URL(f"https://a.com/{i}"))
+    frontier.commit()
+    done, interrupted = frontier.take(2)
+    frontier.add("new", URL("https://a.com/new"))
+    frontier.finish(done)
+    frontier.add("lost", URL("https://a.com/lost"))
+    frontier.close()
+
+    frontier = Frontier(path, resume=True)
+    assert frontier.get_meta("args") == "[1]"
+    assert [item.url.url for item in frontier.take(10)] == [
+        interrupted.url.url,
+        "https://a.com/2",
+        "https://a.com/new",
+    ]
+    frontier.close(remove=True)
+    assert os.listdir(tmp_path) == []
+
+
+def test_new_frontier_replaces_old(tmp_path: Path) -> None:
+    """Test that starting a new frontier discards an old one at the same path."""
+    path = os.path.join(tmp_path, "frontier.sqlite")
+    frontier = Frontier(path)
+    frontier.add("a", URL("https://a.com/"))
+    frontier.close()
+    frontier = Frontier(path)
+    assert frontier.take(10) == []
+    frontier.close()
+
+
+def test_frontier_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that frontiers live in the session directory, or in memory without settings."""
+    monkeypatch.chdir(tmp_path)
+    settings = AppSettings()
+    settings.session_dir_num = 7
+    assert frontier_path(settings, "f.sqlite") == os.path.join("0007", "f.sqlite")
+    assert os.path.isdir("0007")
+    assert frontier_path(None, "f.sqlite") == MEMORY
@@ -2,16 +2,20 @@
 
 import os
 import tempfile
+import threading
+import time
 from collections.abc import Generator
 from typing import Any
-from unittest.mock import MagicMock
+from unittest.mock import ANY, MagicMock
 
 import pytest
 
 import urload.commands.get
+from urload.commands.base import CommandError
 from urload.commands.get import GetCommand
 from urload.settings import AppSettings
 from urload.url import URL
+from urload.urlstore import SegmentedList, URLRange
 
 
 class DummyResponse:
@@ -22,16 +26,21 @@ class DummyResponse:
         content: bytes = b"data",
         status_code: int = 200,
         raise_exc: Exception | None = None,
+        headers: dict[str, str] | None = None,
     ):
         """Initialize DummyResponse.
 
         :param content: The response content.
         :param status_code: The HTTP status code.
         :param raise_exc: Exception to raise on raise_for_status, or None.
+        :param headers: The response headers.
         """
         self.content = content
         self._raise_exc = raise_exc
         self._status_code = status_code
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
 
     def raise_for_status(self) -> None:
         """Raise an exception if the response is an error or if raise_exc is set."""
@@ -41,6 +50,19 @@ class DummyResponse:
         if self._status_code >= HTTP_ERROR:
             raise Exception(f"HTTP {self._status_code}")
 
+    def iter_content(self, chunk_size: int = 1) -> Generator[bytes, None, None]:
+        """Yield the content in chunks of chunk_size bytes."""
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i : i + chunk_size]
+
+    def close(self) -> None:
+        """Mark the response as closed."""
+        self.closed = True
+
+
+class MockURL(URL):
+    """A URL whose get() method can be replaced (URL instances have no __dict__)."""
+
 
 @pytest.fixture
 def temp_cwd(monkeypatch: Any) -> Generator[str, None, None]:
@@ -57,7 +79,7 @@ def make_url(
     raise_exc: Exception | None = None,
 ) -> URL:
     """Create a URL object with a mocked get() method returning DummyResponse."""
-    url = URL(url_str)
+    url = MockURL(url_str)
     url.get = MagicMock(return_value=DummyResponse(content, status_code, raise_exc))
     return url
 
@@ -173,3 +195,400 @@ def test_get_command_index_template(temp_cwd: str) -> None:
     assert os.path.exists(file_path3)
     with open(file_path3, "rb") as f:
         assert f.read() == b"C"
+
+
+def test_get_command_parallel_keeps_order(temp_cwd: str, capsys: Any) -> None:
+    """Test that parallel downloads keep index assignment and output in list order."""
+    reset_get_index()
+    urls = [make_url(f"http://example.com/{i}.txt", str(i).encode()) for i in range(8)]
+    urls[3] = make_url("http://example.com/3.txt", raise_exc=Exception("fail"))
+    settings = AppSettings()
+    settings.filename_template = "{index:02d}_{filename}"
+    cmd = GetCommand()
+    result = cmd.run(["-j", "4"], urls, settings)
+    assert result == [urls[3]]
+    lines = capsys.readouterr().out.strip().splitlines()
+    assert [line.split()[0] for line in lines] == [f"[{i}]" for i in range(8)]
+    assert lines[3].endswith("[FAILED] fail")
+    session_dir = f"{settings.session_dir_num:04d}"
+    for i in range(8):
+        file_path = os.path.join(session_dir, f"{i:02d}_{i}.txt")
+        assert os.path.exists(file_path) == (i != 3)  # noqa: PLR2004
+    assert urload.commands.get._get_index == 8  # type: ignore # noqa: PLR2004
+
+
+def test_get_command_jobs_from_settings(temp_cwd: str) -> None:
+    """Test that the download_concurrency setting is used when -j is not given."""
+    url = make_url("http://example.com/file.txt", b"hello")
+    settings = AppSettings()
+    settings.download_concurrency = 3
+    settings.filename_template = "{filename}"
+    result = GetCommand().run([], [url], settings)
+    assert result == []
+    session_dir = f"{settings.session_dir_num:04d}"
+    assert os.path.exists(os.path.join(session_dir, "file.txt"))
+
+
+@pytest.mark.parametrize(
+    "args",
+    [["-j"], ["-j", "0"], ["-jx"], ["--bogus"], ["--resume"], ["-n", "--resume", "0"]],
+)
+def test_get_command_invalid_args(temp_cwd: str, args: list[str]) -> None:
+    """Test that invalid arguments raise CommandError."""
+    with pytest.raises(CommandError):
+        GetCommand().run(args, [make_url("http://example.com/a")], AppSettings())
+
+
+def test_get_command_streams_in_chunks(temp_cwd: str) -> None:
+    """Test that downloads are streamed in chunks and the response is closed."""
+    url = make_url("http://example.com/big.bin", b"x" * 1000)
+    settings = AppSettings()
+    settings.filename_template = "{filename}"
+    settings.download_chunk_size = 64
+    assert GetCommand().run([], [url], settings) == []
+    url.get.assert_called_once_with(stream=True, extra_headers={}, on_retry=ANY)  # type: ignore
+    assert url.get.return_value.closed  # type: ignore
+    session_dir = f"{settings.session_dir_num:04d}"
+    with open(os.path.join(session_dir, "big.bin"), "rb") as f:
+        assert f.read() == b"x" * 1000
+    assert os.listdir(session_dir) == ["big.bin"]
+
+
+def test_get_command_reports_retries(temp_cwd: str, capsys: Any) -> None:
+    """Test that retries made by the transport are noted in the progress line."""
+    url = make_url("http://example.com/file.txt")
+    response = url.get.return_value  # type: ignore
+
+    def get_with_retry(**kwargs: Any) -> DummyResponse:
+        kwargs["on_retry"](1, "HTTP 503", 0.0)
+        return response  # type: ignore
+
+    url.get.side_effect = get_with_retry  # type: ignore
+    assert GetCommand().run([], [url], AppSettings()) == []
+    assert "[ok] (1 retry: HTTP 503)" in capsys.readouterr().out
+
+
+def test_get_command_interrupted_stream_leaves_no_file(temp_cwd: str) -> None:
+    """Test that a download failing mid-stream leaves no file behind."""
+    url = make_url("http://example.com/big.bin", b"x" * 1000)
+
+    def broken_iter(chunk_size: int = 1) -> Generator[bytes, None, None]:
+        yield b"partial"
+        raise ConnectionError("connection reset")
+
+    url.get.return_value.iter_content = broken_iter  # type: ignore
+    settings = AppSettings()
+    result = GetCommand().run([], [url], settings)
+    assert result == [url]
+    session_dir = f"{settings.session_dir_num:04d}"
+    assert os.listdir(session_dir) == []
+
+
+class RangeServer:
+    """A fake server for URL.get() that honors Range and If-Range requests."""
+
+    def __init__(self, body: bytes, etag: str = '"v1"', fail_after: int = 0):
+        """Initialize RangeServer.
+
+        :param body: The full resource body.
+        :param etag: The ETag of the resource.
+        :param fail_after: If nonzero, the first response breaks after this many bytes.
+        """
+        self.body = body
+        self.etag = etag
+        self.fail_after = fail_after
+        # Bytes before the requested start that a range response begins at
+        self.range_shift = 0
+        self.requests: list[dict[str, str]] = []
+
+    def get(
+        self,
+        stream: bool = False,
+        extra_headers: dict[str, str] | None = None,
+        on_retry: Any = None,
+    ) -> DummyResponse:
+        """Serve the body, or the requested range if If-Range matches."""
+        headers = extra_headers or {}
+        self.requests.append(headers)
+        resp_headers = {"ETag": self.etag}
+        if "Range" in headers and headers.get("If-Range") == self.etag:
+            start = int(headers["Range"].removeprefix("bytes=").rstrip("-"))
+            start -= self.range_shift
+            resp_headers["Content-Range"] = (
+                f"bytes {start}-{len(self.body) - 1}/{len(self.body)}"
+            )
+            return DummyResponse(self.body[start:], 206, headers=resp_headers)
+        resp = DummyResponse(self.body, headers=resp_headers)
+        if self.fail_after:
+            sent = self.body[: self.fail_after]
+            self.fail_after = 0
+
+            def broken_iter(chunk_size: int = 1) -> Generator[bytes, None, None]:
+                yield sent
+                raise ConnectionError("connection reset")
+
+            resp.iter_content = broken_iter
+        return resp
+
+
+def test_get_command_resumes_partial_download(temp_cwd: str, capsys: Any) -> None:
+    """Test that a failed download is resumed with a Range request on retry."""
+    server = RangeServer(b"0123456789" * 10, fail_after=30)
+    url = MockURL("http://example.com/video.mp4")
+    url.get = server.get  # type: ignore
+    settings = AppSettings()
+    settings.filename_template = "{filename}"
+    assert GetCommand().run([], [url], settings) == [url]
+    session_dir = f"{settings.session_dir_num:04d}"
+    assert not os.path.exists(os.path.join(session_dir, "video.mp4"))
+    assert len([f for f in os.listdir(session_dir) if f.endswith(".part")]) == 1
+    capsys.readouterr()
+
+    assert GetCommand().run([], [url], settings) == []
+    assert server.requests[-1] == {"Range": "bytes=30-", "If-Range": '"v1"'}
+    with open(os.path.join(session_dir, "video.mp4"), "rb") as f:
+        assert f.read() == server.body
+    assert os.listdir(session_dir) == ["video.mp4"]
+    assert "(resumed at byte 30)" in capsys.readouterr().out
+
+
+def test_get_command_refetches_changed_resource(temp_cwd: str) -> None:
+    """Test that a partial file is replaced if the resource has changed."""
+    server = RangeServer(b"old content " * 10, fail_after=20)
+    url = MockURL("http://example.com/file.bin")
+    url.get = server.get  # type: ignore
+    settings = AppSettings()
+    settings.filename_template = "{filename}"
+    assert GetCommand().run([], [url], settings) == [url]
+    server.body = b"new content " * 10
+    server.etag = '"v2"'
+    assert GetCommand().run([], [url], settings) == []
+    session_dir = f"{settings.session_dir_num:04d}"
+    with open(os.path.join(session_dir, "file.bin"), "rb") as f:
+        assert f.read() == server.body
+
+
+def test_get_command_refetches_on_misaligned_range(temp_cwd: str) -> None:
+    """Test that a range starting elsewhere than the partial file's end is not appended."""
+    server = RangeServer(b"0123456789" * 10, fail_after=30)
+    url = MockURL("http://example.com/file.bin")
+    url.get = server.get  # type: ignore
+    settings = AppSettings()
+    settings.filename_template = "{filename}"
+    assert GetCommand().run([], [url], settings) == [url]
+    server.range_shift = 10
+    assert GetCommand().run([], [url], settings) == []
+    assert server.requests[-2] == {"Range": "bytes=30-", "If-Range": '"v1"'}
+    assert server.requests[-1] == {}
+    session_dir = f"{settings.session_dir_num:04d}"
+    with open(os.path.join(session_dir, "file.bin"), "rb") as f:
+        assert f.read() == server.body
+
+
+def test_get_command_rejects_unrequested_partial_content(temp_cwd: str) -> None:
+    """Test that a 206 response to a request without Range is a failure."""
+    url = make_url("http://example.com/file.bin", b"part", status_code=206)
+    settings = AppSettings()
+    settings.filename_template = "{filename}"
+    assert GetCommand().run([], [url], settings) == [url]
+    session_dir = f"{settings.session_dir_num:04d}"
+    assert os.listdir(session_dir) == []
+
+
+def test_get_command_resume_after_interruption(
+    temp_cwd: str, monkeypatch: pytest.MonkeyPatch, capsys: Any
+) -> None:
+    """Test that --resume downloads only what an interrupted get had not finished."""
+    reset_get_index()
+    a = make_url("http://example.com/a.txt", b"a")
+    b = MockURL("http://example.com/b.txt")
+    b.get = MagicMock(side_effect=KeyboardInterrupt)
+    c = make_url("http://example.com/c.txt", b"c")
+    settings = AppSettings()
+    settings.filename_template = "{index}_{filename}"
+    with pytest.raises(KeyboardInterrupt):
+        GetCommand().run(["-j", "1"], [a, b, c], settings)
+    session_dir = f"{settings.session_dir_num:04d}"
+    assert os.path.exists(os.path.join(session_dir, "get-frontier.sqlite"))
+    capsys.readouterr()
+
+    fetched: list[str] = []
+
+    def mock_get(self: Any, url: str, **kwargs: Any) -> DummyResponse:
+        fetched.append(url)
+        return DummyResponse(url.encode())
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+    assert GetCommand().run(["--resume", session_dir, "-j", "1"], [], settings) == []
+    assert fetched == ["http://example.com/b.txt", "http://example.com/c.txt"]
+    with open(os.path.join(session_dir, "1_b.txt"), "rb") as f:
+        assert f.read() == b"http://example.com/b.txt"
+    assert sorted(os.listdir(session_dir)) == ["0_a.txt", "1_b.txt", "2_c.txt"]
+    assert "[2] http://example.com/c.txt" in capsys.readouterr().out
+
+
+def test_get_command_resume_without_queue(temp_cwd: str) -> None:
+    """Test that resuming a session with no interrupted get is an error."""
+    with pytest.raises(CommandError):
+        GetCommand().run(["--resume", "0042"], [], AppSettings())
+
+
+def test_get_command_stream_downloads_in_batches(temp_cwd: str) -> None:
+    """Test that streaming get downloads each batch as it arrives and yields failures."""
+    reset_get_index()
+    settings = AppSettings()
+    settings.filename_template = "{index}"
+    settings.frontier_batch_size = 2
+    urls = [
+        make_url(f"http://example.com/{i}", status_code=500 if i == 1 else 200)
+        for i in range(3)
+    ]
+    read: list[str] = []
+
+    def source() -> Generator[URL, None, None]:
+        for url in urls:
+            read.append(url.url)
+            yield url
+
+    failed = GetCommand().stream([], source(), settings)
+    assert next(failed) == urls[1]
+    # The first batch was downloaded before the last URL was read
+    assert read == [u.url for u in urls[:2]]
+    assert list(failed) == []
+    session_dir = f"{settings.session_dir_num:04d}"
+    assert sorted(os.listdir(session_dir)) == ["0", "2"]
+
+
+def test_get_command_stream_dry_run(temp_cwd: str, capsys: Any) -> None:
+    """Test that a streaming dry run prints each URL and passes it on."""
+    reset_get_index()
+    settings = AppSettings()
+    settings.filename_template = "{index}"
+    urls = [URL("http://example.com/a"), URL("http://example.com/b")]
+    assert list(GetCommand().stream(["-n"], iter(urls), settings)) == urls
+    assert "[1] http://example.com/b 1" in capsys.readouterr().out
+
+
+class EndlessResponse(DummyResponse):
+    """A response whose body lasts about five seconds unless it is closed."""
+
+    def iter_content(self, chunk_size: int = 1) -> Generator[bytes, None, None]:
+        """Yield a chunk every few milliseconds until closed."""
+        for _ in range(500):
+            if self.closed:
+                return
+            time.sleep(0.01)
+            yield b"x"
+
+
+def test_get_command_interrupt_cancels_running_downloads(
+    temp_cwd: str, monkeypatch: Any
+) -> None:
+    """Test that Ctrl-C stops the downloads in flight instead of waiting for them."""
+    reset_get_index()
+    quick = make_url("http://example.com/quick")
+    endless = MockURL("http://example.com/endless")
+    response = EndlessResponse()
+    endless.get = MagicMock(return_value=response)
+
+    def interrupt(*args: Any, **kwargs: Any) -> None:
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(urload.commands.get, "print", interrupt, raising=False)
+    settings = AppSettings()
+    start = time.monotonic()
+    with pytest.raises(KeyboardInterrupt):
+        GetCommand().run(["-j", "2"], [quick, endless], settings)
+    assert time.monotonic() - start < 1
+    deadline = time.monotonic() + 1
+    while not response.closed and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert response.closed
+
+
+def test_get_command_same_url_twice_in_parallel(
+    temp_cwd: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that two downloads of one URL do not share a partial file."""
+    reset_get_index()
+    barrier = threading.Barrier(2, timeout=5)
+
+    class SlowResponse(DummyResponse):
+        def iter_content(self, chunk_size: int = 1) -> Generator[bytes, None, None]:
+            yield b"first half "
+            barrier.wait()  # Both downloads are writing at the same time
+            yield b"second half"
+
+    def mock_get(self: Any, url: str, **kwargs: Any) -> DummyResponse:
+        return SlowResponse(headers={"ETag": '"v1"'})
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+    settings = AppSettings()
+    settings.filename_template = "{index}_{filename}"
+    url = "http://example.com/file.bin"
+    assert GetCommand().run(["-j", "2"], [URL(url), URL(url)], settings) == []
+    session_dir = f"{settings.session_dir_num:04d}"
+    assert sorted(os.listdir(session_dir)) == ["0_file.bin", "1_file.bin"]
+    for name in os.listdir(session_dir):
+        with open(os.path.join(session_dir, name), "rb") as f:
+            assert f.read() == b"first half second half"
+
+
+def test_get_command_reports_output_file_clash(temp_cwd: str, capsys: Any) -> None:
+    """Test that a URL saved to the same file as an earlier one is reported as failed."""
+    reset_get_index()
+    first = make_url("http://example.com/a/x.bin", b"a")
+    second = make_url("http://example.com/b/x.bin", b"b")
+    settings = AppSettings()
+    settings.filename_template = "{filename}"
+    assert GetCommand().run([], [first, second], settings) == [second]
+    session_dir = f"{settings.session_dir_num:04d}"
+    with open(os.path.join(session_dir, "x.bin"), "rb") as f:
+        assert f.read() == b"a"
+    out = capsys.readouterr().out
+    assert "[1] http://example.com/b/x.bin" in out
+    assert "[FAILED] Another URL in this get is saved to the same file." in out
+
+
+def test_get_command_stream_reports_output_file_clash(temp_cwd: str) -> None:
+    """Test that streaming get yields a URL whose file clashes with an earlier one."""
+    reset_get_index()
+    first = make_url("http://example.com/a/x.bin", b"a")
+    second = make_url("http://example.com/b/x.bin", b"b")
+    settings = AppSettings()
+    settings.filename_template = "{filename}"
+    assert list(GetCommand().stream([], iter([first, second]), settings)) == [second]
+
+
+def test_get_command_resume_finishes_every_batch(
+    temp_cwd: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that --resume finishes a list longer than one batch after an interruption."""
+    reset_get_index()
+    fetched: list[str] = []
+    interrupted = {"http://example.com/5"}
+
+    def mock_get(self: Any, url: str, **kwargs: Any) -> DummyResponse:
+        fetched.append(url)
+        if url in interrupted:
+            raise KeyboardInterrupt
+        return DummyResponse(url.encode())
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+    urls = SegmentedList([])
+    urls.extend(URLRange(["http://example.com/", ""], [(range(10), 1)]))
+    settings = AppSettings()
+    settings.filename_template = "{index}"
+    settings.frontier_batch_size = 4
+    with pytest.raises(KeyboardInterrupt):
+        GetCommand().run(["-j", "1"], urls, settings)
+    session_dir = f"{settings.session_dir_num:04d}"
+    assert "http://example.com/9" not in fetched
+
+    fetched.clear()
+    interrupted.clear()
+    assert GetCommand().run(["--resume", session_dir, "-j", "1"], [], settings) == []
+    assert fetched[0] == "http://example.com/5"
+    assert fetched[-1] == "http://example.com/9"
+    names = sorted(n for n in os.listdir(session_dir) if not n.endswith(".part"))
+    assert names == sorted(str(i) for i in range(10))
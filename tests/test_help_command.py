@@ -6,7 +6,7 @@ from pytest import CaptureFixture
 
 from urload.commands.base import Command
 from urload.commands.help import HelpCommand
-from urload.url import URL
+from urload.urlstore import URLList
 
 
 class DummyCommand(Command):
@@ -15,9 +15,7 @@ class DummyCommand(Command):
     name = "dummy"
     description = "Dummy command."
 
-    def run(
-        self, args: list[str], url_list: list[URL], settings: Any = None
-    ) -> list[URL]:
+    def run(self, args: list[str], url_list: URLList, settings: Any = None) -> URLList:
         """No-op for testing."""
         return url_list
 
@@ -1,26 +1,16 @@
 """Tests for the href command."""
 
+import threading
 from typing import Any
 
 import pytest
+from conftest import DummyResponse
 
 from urload.commands.base import CommandError
 from urload.commands.href import HrefCommand
+from urload.settings import AppSettings
 from urload.url import URL
 
-
-class DummyResponse:
-    """A dummy response object for mocking requests.get."""
-
-    def __init__(self, text: str):
-        """Initialize with HTML text."""
-        self.text = text
-
-    def raise_for_status(self) -> None:
-        """No-op for status check."""
-        pass
-
-
 EXPECTED_LINK_COUNT = 2
 
 
@@ -31,11 +21,11 @@ def test_href_command_extracts_links(monkeypatch: pytest.MonkeyPatch) -> None:
     )
 
     def mock_get(
-        url: str, timeout: int = 10, headers: dict[str, str] | None = None
+        self: Any, url: str, headers: dict[str, str] | None = None, **kwargs: Any
     ) -> DummyResponse:
         return DummyResponse(html)
 
-    monkeypatch.setattr("requests.get", mock_get)
+    monkeypatch.setattr("requests.Session.get", mock_get)
     cmd = HrefCommand()
     url_list = [URL("https://example.com")]
     result = cmd.run([], url_list)
@@ -52,11 +42,11 @@ def test_href_command_removes_original(monkeypatch: pytest.MonkeyPatch) -> None:
     html = '<a href="/foo">foo</a>'
 
     def mock_get(
-        url: str, timeout: int = 10, headers: dict[str, str] | None = None
+        self: Any, url: str, headers: dict[str, str] | None = None, **kwargs: Any
     ) -> DummyResponse:
         return DummyResponse(html)
 
-    monkeypatch.setattr("requests.get", mock_get)
+    monkeypatch.setattr("requests.Session.get", mock_get)
     cmd = HrefCommand()
     url_list = [URL("https://x.com")]
     result = cmd.run([], url_list)
@@ -78,11 +68,11 @@ def test_href_command_handles_fetch_error(
     """Test that fetch errors are handled and print an error message."""
 
     def mock_get(
-        url: str, timeout: int = 10, headers: dict[str, str] | None = None
+        self: Any, url: str, headers: dict[str, str] | None = None, **kwargs: Any
     ) -> DummyResponse:
         raise Exception("fail")
 
-    monkeypatch.setattr("requests.get", mock_get)
+    monkeypatch.setattr("requests.Session.get", mock_get)
     cmd = HrefCommand()
     url_list = [URL("https://fail.com")]
     result = cmd.run([], url_list)
@@ -101,11 +91,11 @@ def test_href_command_relative_links(monkeypatch: pytest.MonkeyPatch) -> None:
     )
 
     def mock_get(
-        url: str, timeout: int = 10, headers: dict[str, str] | None = None
+        self: Any, url: str, headers: dict[str, str] | None = None, **kwargs: Any
     ) -> DummyResponse:
         return DummyResponse(html)
 
-    monkeypatch.setattr("requests.get", mock_get)
+    monkeypatch.setattr("requests.Session.get", mock_get)
     cmd = HrefCommand()
     url_list = [URL("https://host.com/base/")]
     result = cmd.run([], url_list)
@@ -123,11 +113,11 @@ def test_href_command_nested_links(monkeypatch: pytest.MonkeyPatch) -> None:
     html = """<html><body><ul><li><a href="/nested1">One</a></li><li><div><a href="/nested2">Two</a></div></li></ul></body></html>"""
 
     def mock_get(
-        url: str, timeout: int = 10, headers: dict[str, str] | None = None
+        self: Any, url: str, headers: dict[str, str] | None = None, **kwargs: Any
     ) -> DummyResponse:
         return DummyResponse(html)
 
-    monkeypatch.setattr("requests.get", mock_get)
+    monkeypatch.setattr("requests.Session.get", mock_get)
     cmd = HrefCommand()
     url_list = [URL("https://nest.com/")]
     result = cmd.run([], url_list)
@@ -137,18 +127,41 @@ def test_href_command_nested_links(monkeypatch: pytest.MonkeyPatch) -> None:
 
 
 def test_href_command_passes_headers(monkeypatch: pytest.MonkeyPatch) -> None:
-    """Test that the URL's headers are passed to requests.get."""
+    """Test that the URL's headers are passed to the HTTP session."""
     html = '<a href="/foo">foo</a>'
     called = {}
 
     def mock_get(
-        url: str, timeout: int = 10, headers: dict[str, str] | None = None
+        self: Any, url: str, headers: dict[str, str] | None = None, **kwargs: Any
     ) -> DummyResponse:
         called["headers"] = headers
         return DummyResponse(html)
 
-    monkeypatch.setattr("requests.get", mock_get)
+    monkeypatch.setattr("requests.Session.get", mock_get)
     cmd = HrefCommand()
     url_list = [URL("https://x.com", headers={"X-Test": "yes", "Referer": "abc"})]
     cmd.run([], url_list)
     assert called["headers"] == {"X-Test": "yes", "Referer": "abc"}
+
+
+def test_href_command_fetches_while_parsing(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that pages are fetched concurrently and results keep list order."""
+    workers = 4
+    barrier = threading.Barrier(workers, timeout=5)
+
+    def mock_get(self: Any, url: str, **kwargs: Any) -> DummyResponse:
+        barrier.wait()  # Every fetch must be in flight at the same time
+        return DummyResponse(f'<a href="{url}next">next</a>')
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+    settings = AppSettings()
+    settings.download_concurrency = workers
+    url_list = [URL(f"https://host{i}.com/") for i in range(workers)]
+    result = HrefCommand().run([], url_list, settings)
+    assert [u.url for u in result] == [
+        f"https://host{i}.com/next" for i in range(workers)
+    ]
+    lines = capsys.readouterr().out.splitlines()
+    assert lines == [f"https://host{i}.com/ -> 1 found" for i in range(workers)]
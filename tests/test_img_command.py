@@ -3,24 +3,12 @@
 from typing import Any
 
 import pytest
+from conftest import DummyResponse
 
 from urload.commands.base import CommandError
 from urload.commands.img import ImgCommand
 from urload.url import URL
 
-
-class DummyResponse:
-    """A dummy response object for mocking requests.get."""
-
-    def __init__(self, text: str):
-        """Initialize with HTML text."""
-        self.text = text
-
-    def raise_for_status(self) -> None:
-        """No-op for status check."""
-        pass
-
-
 EXPECTED_IMG_COUNT = 2
 
 
@@ -31,11 +19,11 @@ def test_img_command_extracts_sources(monkeypatch: pytest.MonkeyPatch) -> None:
     )
 
     def mock_get(
-        url: str, timeout: int = 10, headers: dict[str, str] | None = None
+        self: Any, url: str, headers: dict[str, str] | None = None, **kwargs: Any
     ) -> DummyResponse:
         return DummyResponse(html)
 
-    monkeypatch.setattr("requests.get", mock_get)
+    monkeypatch.setattr("requests.Session.get", mock_get)
     cmd = ImgCommand()
     url_list = [URL("https://example.com")]
     result = cmd.run([], url_list)
@@ -52,11 +40,11 @@ def test_img_command_removes_original(monkeypatch: pytest.MonkeyPatch) -> None:
     html = '<img src="/foo.png">'
 
     def mock_get(
-        url: str, timeout: int = 10, headers: dict[str, str] | None = None
+        self: Any, url: str, headers: dict[str, str] | None = None, **kwargs: Any
     ) -> DummyResponse:
         return DummyResponse(html)
 
-    monkeypatch.setattr("requests.get", mock_get)
+    monkeypatch.setattr("requests.Session.get", mock_get)
     cmd = ImgCommand()
     url_list = [URL("https://x.com")]
     result = cmd.run([], url_list)
@@ -78,11 +66,11 @@ def test_img_command_handles_fetch_error(
     """Test that fetch errors are handled and print an error message."""
 
     def mock_get(
-        url: str, timeout: int = 10, headers: dict[str, str] | None = None
+        self: Any, url: str, headers: dict[str, str] | None = None, **kwargs: Any
     ) -> DummyResponse:
         raise Exception("fail")
 
-    monkeypatch.setattr("requests.get", mock_get)
+    monkeypatch.setattr("requests.Session.get", mock_get)
     cmd = ImgCommand()
     url_list = [URL("https://fail.com")]
     result = cmd.run([], url_list)
@@ -101,11 +89,11 @@ def test_img_command_relative_sources(monkeypatch: pytest.MonkeyPatch) -> None:
     )
 
     def mock_get(
-        url: str, timeout: int = 10, headers: dict[str, str] | None = None
+        self: Any, url: str, headers: dict[str, str] | None = None, **kwargs: Any
     ) -> DummyResponse:
         return DummyResponse(html)
 
-    monkeypatch.setattr("requests.get", mock_get)
+    monkeypatch.setattr("requests.Session.get", mock_get)
     cmd = ImgCommand()
     url_list = [URL("https://host.com/base/")]
     result = cmd.run([], url_list)
@@ -121,11 +109,11 @@ def test_img_command_nested_sources(monkeypatch: pytest.MonkeyPatch) -> None:
     html = '<html><body><ul><li><img src="/nested1.png"></li><li><div><img src="/nested2.png"></div></li></ul></body></html>'
 
     def mock_get(
-        url: str, timeout: int = 10, headers: dict[str, str] | None = None
+        self: Any, url: str, headers: dict[str, str] | None = None, **kwargs: Any
     ) -> DummyResponse:
         return DummyResponse(html)
 
-    monkeypatch.setattr("requests.get", mock_get)
+    monkeypatch.setattr("requests.Session.get", mock_get)
     cmd = ImgCommand()
     url_list = [URL("https://nest.com/")]
     result = cmd.run([], url_list)
@@ -135,17 +123,17 @@ def test_img_command_nested_sources(monkeypatch: pytest.MonkeyPatch) -> None:
 
 
 def test_img_command_passes_headers(monkeypatch: pytest.MonkeyPatch) -> None:
-    """Test that the URL's headers are passed to requests.get."""
+    """Test that the URL's headers are passed to the HTTP session."""
     html = '<img src="/foo.png">'
     called = {}
 
     def mock_get(
-        url: str, timeout: int = 10, headers: dict[str, str] | None = None
+        self: Any, url: str, headers: dict[str, str] | None = None, **kwargs: Any
     ) -> DummyResponse:
         called["headers"] = headers
         return DummyResponse(html)
 
-    monkeypatch.setattr("requests.get", mock_get)
+    monkeypatch.setattr("requests.Session.get", mock_get)
     cmd = ImgCommand()
     url_list = [URL("https://x.com", headers={"X-Test": "yes", "Referer": "abc"})]
     cmd.run([], url_list)
@@ -10,6 +10,7 @@ from urload.commands.base import CommandError
 from urload.commands.load import LoadCommand
 from urload.commands.save import SaveCommand
 from urload.url import URL
+from urload.urlstore import SegmentedList, URLRange
 
 ROUNDTRIP_URL_COUNT = 3
 
@@ -76,3 +77,16 @@ def test_load_invalid_args():
         LoadCommand().run([], [])
     with pytest.raises(CommandError):
         LoadCommand().run(["a", "b"], [])
+
+
+def test_load_keeps_lazy_ranges(tmp_path: Path):
+    """Test that loading onto a list with a huge lazy range does not generate it."""
+    fname = tmp_path / "urls.txt"
+    fname.write_text("http://loaded.com\n")
+    urls = SegmentedList([URL("http://first.com")])
+    urls.extend(URLRange(["http://example.com/", ""], [(range(10**12), 1)]))
+    loaded = LoadCommand().run([str(fname)], urls)
+    assert len(loaded) == 10**12 + 2
+    assert loaded[-2].url == f"http://example.com/{10**12 - 1}"
+    assert loaded[-1] == URL("http://loaded.com")
+    assert len(urls) == 10**12 + 1
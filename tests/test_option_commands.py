@@ -4,10 +4,12 @@ from pathlib import Path
 
 import pytest
 
+from urload.commands.base import CommandError
 from urload.commands.get_option import GetOptionCommand
 from urload.commands.set_option import SetOptionCommand
 from urload.settings import AppSettings
 from urload.url import URL
+from urload.urlstore import SegmentedList, URLRange, URLStore
 
 
 class DummyURL:
@@ -39,3 +41,34 @@ def test_set_and_get_option(
         set_cmd.run(["notakey=foo"], url_list, settings)
     with pytest.raises(Exception):
         get_cmd.run(["notakey"], url_list, settings)
+
+
+def test_set_option_invalid_value(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Test that set-option validates and converts typed settings."""
+    monkeypatch.setattr("urload.settings.CONFIG_FILE", str(tmp_path / "urload.toml"))
+    settings = AppSettings()
+    SetOptionCommand().run(["download_concurrency=8"], [], settings)
+    assert settings.download_concurrency == 8  # noqa: PLR2004
+    with pytest.raises(CommandError):
+        SetOptionCommand().run(["download_concurrency=many"], [], settings)
+
+
+def test_set_option_converts_url_list(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Test that changing url_store converts the current list, keeping lazy ranges lazy."""
+    monkeypatch.setattr("urload.settings.CONFIG_FILE", str(tmp_path / "urload.toml"))
+    settings = AppSettings()
+    url_list = SegmentedList([URL("https://a.com", {"Referer": "https://b.com"})])
+    url_list.extend(URLRange(["https://c.com/", ""], [(range(10**12), 1)]))
+    converted = SetOptionCommand().run(["url_store=compact"], url_list, settings)
+    assert isinstance(converted, SegmentedList)
+    assert isinstance(converted.base, URLStore)
+    assert len(converted) == 10**12 + 1
+    assert converted[0] == url_list[0]
+    assert converted[-1].url == "https://c.com/999999999999"
+    plain = SetOptionCommand().run(["url_store=list"], [URL("https://a.com")], settings)
+    assert plain == [URL("https://a.com")]
+    assert type(plain) is list
@@ -0,0 +1,119 @@
+"""Tests for the in-memory page cache."""
+
+from typing import Any
+
+import pytest
+import requests
+
+from urload import pagecache
+from urload.commands.href import HrefCommand
+from urload.commands.img import ImgCommand
+from urload.commands.title import TitleCommand
+from urload.pagecache import Page, PageCache
+from urload.settings import AppSettings
+from urload.url import URL
+
+
+def make_page(url: str, size: int) -> Page:
+    """Build a page with a body of the given size."""
+    return Page(url, b"x" * size, "utf-8")
+
+
+def test_lru_eviction() -> None:
+    """Test that the least recently used pages are evicted when over budget."""
+    cache = PageCache(100)
+    keys = [cache.key(f"https://a.com/{i}", {}) for i in range(3)]
+    cache.put(keys[0], make_page("https://a.com/0", 40))
+    cache.put(keys[1], make_page("https://a.com/1", 40))
+    assert cache.get(keys[0]) is not None
+    cache.put(keys[2], make_page("https://a.com/2", 40))
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.stats() == (2, 80)
+
+
+def test_oversized_page_is_not_stored() -> None:
+    """Test that a page larger than the budget is not cached."""
+    cache = PageCache(10)
+    key = cache.key("https://a.com/", {})
+    cache.put(key, make_page("https://a.com/", 11))
+    assert cache.get(key) is None
+    assert cache.stats() == (0, 0)
+
+
+def test_resize_evicts() -> None:
+    """Test that shrinking the budget evicts pages, and 0 disables the cache."""
+    cache = PageCache(100)
+    for i in range(3):
+        cache.put(cache.key(f"https://a.com/{i}", {}), make_page("", 30))
+    cache.resize(60)
+    assert cache.stats() == (2, 60)
+    cache.resize(0)
+    assert cache.stats() == (0, 0)
+
+
+def test_key_includes_headers() -> None:
+    """Test that requests with different headers are cached separately."""
+    cache = PageCache(100)
+    cache.put(cache.key("https://a.com/", {"Referer": "x"}), make_page("", 1))
+    assert cache.get(cache.key("https://a.com/", {})) is None
+    assert cache.get(cache.key("https://a.com/", {"Referer": "x"})) is not None
+
+
+def test_page_text_uses_encoding() -> None:
+    """Test that the page text is decoded with its encoding."""
+    assert Page("", "café".encode("latin-1"), "latin-1").text == "café"
+
+
+def test_commands_share_fetched_pages(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that href, img and title fetch each page only once."""
+    html = b'<title>T</title><a href="/a">a</a><img src="/i.png">'
+    fetched: list[str] = []
+
+    def mock_get(self: Any, url: str, **kwargs: Any) -> requests.Response:
+        fetched.append(url)
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.encoding = "utf-8"
+        resp._content = html
+        return resp
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+    url_list = [URL("https://example.com/")]
+    assert len(HrefCommand().run([], url_list)) == 1
+    assert len(ImgCommand().run([], url_list)) == 1
+    TitleCommand().run([], url_list)
+    assert fetched == ["https://example.com/"]
+    assert "0: T" in capsys.readouterr().out
+
+
+def test_errors_are_not_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that failed fetches are retried by the next command."""
+    calls = 0
+
+    def mock_get(self: Any, url: str, **kwargs: Any) -> requests.Response:
+        nonlocal calls
+        calls += 1
+        resp = requests.Response()
+        resp.status_code = 404
+        resp._content = b""
+        return resp
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+    url_list = [URL("https://example.com/")]
+    HrefCommand().run([], url_list)
+    HrefCommand().run([], url_list)
+    assert calls == 2  # noqa: PLR2004
+
+
+def test_configure_sets_budget() -> None:
+    """Test that the page_cache_max_bytes setting is applied."""
+    settings = AppSettings()
+    settings.page_cache_max_bytes = 1234
+    try:
+        pagecache.configure(settings)
+        assert pagecache.page_cache().max_bytes == 1234  # noqa: PLR2004
+    finally:
+        pagecache.configure(None)
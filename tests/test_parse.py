@@ -0,0 +1,176 @@
+"""Tests for HTML parser backend selection."""
+
+from concurrent.futures import Future
+
+import pytest
+
+from urload import parse
+from urload.pagecache import Page
+from urload.settings import AppSettings
+
+# Documents on which lxml and html.parser build different trees
+SAMPLES = [
+    '<a href="/x" href="/y">duplicate</a><img src="/a.png" src="/b.png">',
+    '<a href="/n\x00ul">x</a><a href="/next">',
+    '<textarea><a href="/ta"></textarea><a href="/after">',
+    '<title><a href="/t">T</a></title><a href="/body">',
+    '<p><a href="/x"><a href="/y">nested</a></a>',
+    '<table><a href="/t"><tr><td><img src="/i"></td></tr></table>',
+    '<html><body></body></html><a href="/late">',
+    '<script>document.write("<a href=/s>")</script><a href="/after">',
+    '<a HREF="/Upper">x</a><IMG SRC="/UP.png">',
+    '<a href="a?x=1&amp;y=2&copy=3">x</a>',
+    '<iframe><a href="/if"></iframe><a href="/after">',
+    '<xmp><a href="/x"></xmp><noembed><a href="/e"></noembed><a href="/after">',
+    '<noframes><a href="/f"><img src="/i"></noframes><img src="/after">',
+    '<a href="/before"><plaintext><a href="/p"></plaintext><a href="/after">',
+]
+
+
+def links(
+    markup: str, backend: str, only: list[str] | None = None
+) -> list[tuple[str, str | None]]:
+    """Return the (tag, link) pairs found by the given backend, in document order."""
+    soup = parse.make_soup(markup, backend, only)
+    result: list[tuple[str, str | None]] = []
+    for tag in soup.find_all(only or ["a", "img"]):
+        value = tag.get("href" if tag.name == "a" else "src")
+        result.append((tag.name, value if isinstance(value, str) else None))
+    return result
+
+
+def test_html_parser_normalization() -> None:
+    """Test that html.parser output follows the HTML parsing rules."""
+    assert links(SAMPLES[0], "html.parser") == [("a", "/x"), ("img", "/a.png")]
+    assert links(SAMPLES[1], "html.parser") == [("a", "/n\ufffdul"), ("a", "/next")]
+    assert links(SAMPLES[2], "html.parser") == [("a", "/after")]
+    assert links(SAMPLES[3], "html.parser") == [("a", "/body")]
+    assert links(SAMPLES[10], "html.parser") == [("a", "/after")]
+    assert links(SAMPLES[13], "html.parser") == [("a", "/before")]
+
+
+@pytest.mark.skipif(not parse.is_available("lxml"), reason="lxml is not installed")
+@pytest.mark.parametrize("markup", SAMPLES)
+@pytest.mark.parametrize("only", [None, ["a", "img"], ["a"]])
+def test_backends_agree(markup: str, only: list[str] | None) -> None:
+    """Test that lxml and html.parser extract the same links."""
+    assert links(markup, "lxml", only) == links(markup, "html.parser", only)
+
+
+@pytest.mark.parametrize("backend", ["html.parser", "lxml"])
+@pytest.mark.parametrize("markup", SAMPLES)
+def test_restricted_parse_matches_full_parse(markup: str, backend: str) -> None:
+    """Test that building only some tags finds the same links as the full tree."""
+    if not parse.is_available(backend):
+        pytest.skip(f"{backend} is not installed")
+    for only in (["a", "img"], ["a"], ["img"]):
+        expected = [link for link in links(markup, backend) if link[0] in only]
+        assert links(markup, backend, only) == expected
+
+
+def test_restricted_parse_builds_only_requested_tags() -> None:
+    """Test that other elements are not built."""
+    soup = parse.make_soup(
+        '<div><p><a href="/x"><span>x</span></a></p><img src="/i"></div>',
+        "html.parser",
+        only=["a"],
+    )
+    assert [tag.name for tag in soup.find_all(True)] == ["a", "span"]
+
+
+def test_resolve_falls_back(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a missing backend falls back to html.parser."""
+
+    def is_available(name: str) -> bool:
+        return name == "html.parser"
+
+    monkeypatch.setattr(parse, "is_available", is_available)
+    assert parse.resolve("auto") == "html.parser"
+    assert parse.resolve("lxml") == "html.parser"
+    assert parse.resolve("html.parser") == "html.parser"
+
+
+def test_resolve_prefers_lxml(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that auto selects lxml when it is installed."""
+
+    def is_available(name: str) -> bool:
+        return True
+
+    monkeypatch.setattr(parse, "is_available", is_available)
+    assert parse.resolve("auto") == "lxml"
+
+
+def test_configure_selects_backend() -> None:
+    """Test that the html_parser setting selects the backend."""
+    settings = AppSettings()
+    settings.html_parser = "html.parser"
+    try:
+        parse.configure(settings)
+        assert parse.parser() == "html.parser"
+    finally:
+        parse.configure(None)
+
+
+def test_invalid_setting_is_rejected() -> None:
+    """Test that unknown backends fail validation."""
+    settings = AppSettings()
+    with pytest.raises(ValueError):
+        settings.html_parser = "html5lib"
+
+
+def test_extract_links() -> None:
+    """Test that links are resolved against the base URL in document order."""
+    content = '<a href="/a">a</a><img src="i.png"><a name="x"><a href="b">b</a>'
+    links = parse.extract_links(
+        content.encode("latin-1"), "latin-1", "https://x.com/d/", ("a",), "html.parser"
+    )
+    assert links == ["https://x.com/a", "https://x.com/d/b"]
+
+
+@pytest.mark.parametrize("backend", ["html.parser", "lxml"])
+def test_extract_links_and_title(backend: str) -> None:
+    """Test that the first title is found along with the links."""
+    if not parse.is_available(backend):
+        pytest.skip(f"{backend} is not installed")
+    content = b'<title> T </title><a href="/a">a</a><title>U</title><img src="i">'
+    assert parse.extract_links_and_title(
+        content, "utf-8", "https://x.com/", ("a", "img"), backend
+    ) == (["https://x.com/a", "https://x.com/i"], "T")
+    assert parse.extract_links_and_title(
+        b'<a href="/a">', None, "https://x.com/", ("a",), backend
+    ) == (["https://x.com/a"], None)
+
+
+def completed[T](value: T | Exception) -> Future[T]:
+    """Return a completed future holding a value or an exception."""
+    future: Future[T] = Future()
+    if isinstance(value, Exception):
+        future.set_exception(value)
+    else:
+        future.set_result(value)
+    return future
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_imap_links(workers: int) -> None:
+    """Test that links are extracted in order, in-process or in worker processes."""
+    settings = AppSettings()
+    settings.parse_workers = workers
+    pages: list[Page | Exception] = [
+        Page(f"https://x.com/{i}/", f'<a href="p{i}">'.encode(), "utf-8")
+        for i in range(6)
+    ]
+    pages[2] = ValueError("fetch failed")
+    try:
+        parse.configure(settings)
+        results = list(parse.imap_links(map(completed, pages), ("a",)))
+    finally:
+        parse.configure(None)
+        parse.close()
+    assert len(results) == len(pages)
+    for i, result in enumerate(results):
+        if i == 2:  # noqa: PLR2004
+            with pytest.raises(ValueError):
+                result.result()
+        else:
+            assert result.result() == [f"https://x.com/{i}/p{i}"]
@@ -0,0 +1,168 @@
+"""Tests for pipelines of commands (``cmd | cmd ...``) in handle_user_input."""
+
+import os
+from collections.abc import Generator, Iterable, Iterator, Mapping
+from typing import Any
+
+import pytest
+from conftest import Fetches
+
+from urload.commands.base import Command
+from urload.main import build_command_objs, handle_user_input
+from urload.settings import AppSettings
+from urload.url import URL
+from urload.urlstore import URLList, URLStore
+
+
+class RecordingCommand(Command):
+    """A command that records when each URL passes through it."""
+
+    description = "Record URLs."
+
+    def __init__(self, name: str, events: list[str]) -> None:
+        """Initialize with a name for the events and the list to record them in."""
+        self.name = name
+        self.events = events
+
+    def run(self, args: list[str], url_list: URLList, settings: Any = None) -> URLList:
+        """Return the list unchanged."""
+        return url_list
+
+    def stream(
+        self, args: list[str], urls: Iterable[URL], settings: Any = None
+    ) -> Iterator[URL]:
+        """Pass the URLs on, recording each one."""
+        for url in urls:
+            self.events.append(f"{self.name} {url.url}")
+            yield url
+
+
+@pytest.fixture
+def commands() -> dict[str, Command]:
+    """Return the CLI's commands."""
+    return build_command_objs()
+
+
+@pytest.fixture
+def temp_cwd(
+    tmp_path: str, monkeypatch: pytest.MonkeyPatch
+) -> Generator[str, None, None]:
+    """Change to a temporary directory for the duration of the test."""
+    monkeypatch.chdir(tmp_path)
+    yield str(tmp_path)
+
+
+def test_pipeline_passes_urls_through_each_stage(
+    commands: dict[str, Command], capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that each stage consumes the output of the previous one."""
+    url_list = [URL(u) for u in ("a1", "b1", "a2", "a1", "a3")]
+    result = handle_user_input("keep ^a | uniq", commands, url_list, AppSettings())
+    assert result == [URL("a1"), URL("a2"), URL("a3")]
+    assert url_list == [URL(u) for u in ("a1", "b1", "a2", "a1", "a3")]
+    out = capsys.readouterr().out
+    assert "Kept 4 URLs matching pattern." in out
+    assert "Removed 1 duplicate URLs." in out
+
+
+def test_pipeline_is_lazy() -> None:
+    """Test that a URL reaches the last stage before the first stage reads the next one."""
+    events: list[str] = []
+    commands: dict[str, Command] = {
+        "first": RecordingCommand("first", events),
+        "second": RecordingCommand("second", events),
+    }
+    handle_user_input("first | second", commands, [URL("a"), URL("b")], AppSettings())
+    assert events == ["first a", "second a", "first b", "second b"]
+
+
+def test_head_stops_reading_earlier_stages() -> None:
+    """Test that head stops pulling URLs from the previous stage once it has enough."""
+    events: list[str] = []
+    commands = build_command_objs()
+    commands["first"] = RecordingCommand("first", events)
+    url_list = [URL("a"), URL("b"), URL("c")]
+    result = handle_user_input("first | head 1", commands, url_list, AppSettings())
+    assert result == [URL("a")]
+    assert events == ["first a"]
+
+
+def test_pipeline_runs_commands_without_stream(commands: dict[str, Command]) -> None:
+    """Test that commands without a streaming implementation run on the collected URLs."""
+    url_list = [URL("c"), URL("a"), URL("b"), URL("a")]
+    result = handle_user_input(
+        "uniq | sort | tail 2", commands, url_list, AppSettings()
+    )
+    assert result == [URL("b"), URL("c")]
+
+
+def test_pipeline_keeps_container_kind(commands: dict[str, Command]) -> None:
+    """Test that the result of a pipeline is the same kind of list as its input."""
+    url_list = URLStore([URL("a"), URL("b")])
+    result = handle_user_input("keep a | uniq", commands, url_list, AppSettings())
+    assert isinstance(result, URLStore)
+    assert result == [URL("a")]
+
+
+@pytest.mark.parametrize(
+    ("line", "message"),
+    [
+        ("keep a |", "Empty command in pipeline."),
+        ("| keep a", "Empty command in pipeline."),
+        ("keep a | | uniq", "Empty command in pipeline."),
+        ("keep a | bogus", "Unknown command: bogus"),
+        ("uniq | keep [", "Invalid regex"),
+    ],
+)
+def test_pipeline_errors_leave_list_unchanged(
+    commands: dict[str, Command],
+    capsys: pytest.CaptureFixture[str],
+    line: str,
+    message: str,
+) -> None:
+    """Test that an invalid pipeline prints an error and returns the list unchanged."""
+    url_list = [URL("a"), URL("b")]
+    result = handle_user_input(line, commands, url_list, AppSettings())
+    assert result is url_list
+    assert message in capsys.readouterr().out
+
+
+def test_pipe_inside_argument_is_not_a_pipeline(commands: dict[str, Command]) -> None:
+    """Test that only a standalone | separates commands."""
+    url_list = [URL("a"), URL("b"), URL("c")]
+    result = handle_user_input("keep a|b", commands, url_list, AppSettings())
+    assert result == [URL("a"), URL("b")]
+
+
+SITE = {
+    "https://ex.com/1": '<a href="/a.jpg">a</a><a href="/x.html">x</a>',
+    "https://ex.com/2": '<a href="/a.jpg">a</a><a href="/b.jpg">b</a>',
+    "https://ex.com/a.jpg": b"a",
+    "https://ex.com/b.jpg": b"b",
+}
+
+
+@pytest.fixture
+def site() -> Mapping[str, str | bytes]:
+    """Serve SITE to the fetches fixture."""
+    return SITE
+
+
+def test_href_keep_uniq_get_pipeline(
+    commands: dict[str, Command],
+    temp_cwd: str,
+    fetches: Fetches,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test that images found by href are downloaded as each page is processed."""
+    settings = AppSettings(filename_template="{filename}", frontier_batch_size=1)
+    url_list = [URL("https://ex.com/1"), URL("https://ex.com/2")]
+    result = handle_user_input(
+        r"href | keep \.jpg$ | uniq | get", commands, url_list, settings
+    )
+    assert result == []
+    session_dir = f"{settings.session_dir_num:04d}"
+    assert sorted(os.listdir(session_dir)) == ["a.jpg", "b.jpg"]
+    out = capsys.readouterr().out
+    # The first page's image is downloaded before the second page is fetched
+    assert out.index("a.jpg [ok]") < out.index("https://ex.com/2 ->")
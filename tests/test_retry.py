@@ -0,0 +1,182 @@
+"""Tests for the retry policy."""
+
+import io
+import itertools
+import time
+from typing import Any
+
+import pytest
+import requests
+
+from urload import retry, transport
+from urload.retry import RetryLog, RetryPolicy, parse_exceptions, parse_statuses
+from urload.settings import AppSettings
+
+
+def make_response(status: int, headers: dict[str, str] | None = None) -> Any:
+    """Build a requests.Response with the given status and headers."""
+    resp = requests.Response()
+    resp.status_code = status
+    resp.headers.update(headers or {})
+    resp.raw = io.BytesIO(b"")
+    return resp
+
+
+@pytest.fixture
+def sleeps(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Record calls to time.sleep instead of sleeping."""
+    calls: list[float] = []
+    monkeypatch.setattr(retry.time, "sleep", calls.append)
+    return calls
+
+
+def test_retries_status_until_success(sleeps: list[float]) -> None:
+    """Test that retryable statuses are retried with exponential backoff."""
+    responses = [make_response(503), make_response(503), make_response(200)]
+    log = RetryLog()
+    policy = RetryPolicy(max_attempts=3, backoff_base=1.0, jitter=False)
+    resp = policy.call(lambda: responses.pop(0), log)
+    assert resp.status_code == 200  # noqa: PLR2004
+    assert sleeps == [1.0, 2.0]
+    assert log.summary() == "(2 retries: HTTP 503)"
+
+
+def test_returns_last_response_when_attempts_run_out(sleeps: list[float]) -> None:
+    """Test that the final failing response is returned after the last attempt."""
+    responses = [make_response(500), make_response(502)]
+    resp = RetryPolicy(max_attempts=2).call(lambda: responses.pop(0))
+    assert resp.status_code == 502  # noqa: PLR2004
+    assert len(sleeps) == 1
+
+
+def test_non_retryable_status_is_returned(sleeps: list[float]) -> None:
+    """Test that a 404 is not retried."""
+    resp = RetryPolicy().call(lambda: make_response(404))
+    assert resp.status_code == 404  # noqa: PLR2004
+    assert sleeps == []
+
+
+def test_retries_exceptions(sleeps: list[float]) -> None:
+    """Test that connection errors are retried and re-raised when attempts run out."""
+    calls = 0
+
+    def send() -> requests.Response:
+        nonlocal calls
+        calls += 1
+        raise requests.ConnectionError("reset")
+
+    log = RetryLog()
+    with pytest.raises(requests.ConnectionError):
+        RetryPolicy(max_attempts=3).call(send, log)
+    assert calls == 3  # noqa: PLR2004
+    assert log.summary() == "(2 retries: ConnectionError)"
+
+
+def test_other_exceptions_are_not_retried(sleeps: list[float]) -> None:
+    """Test that exceptions not in the policy propagate immediately."""
+
+    def send() -> requests.Response:
+        raise requests.ConnectionError("reset")
+
+    policy = RetryPolicy(exceptions=parse_exceptions("timeout"))
+    with pytest.raises(requests.ConnectionError):
+        policy.call(send)
+    assert sleeps == []
+
+
+def test_retry_after_is_honored(sleeps: list[float]) -> None:
+    """Test that Retry-After extends the backoff delay."""
+    responses = [make_response(429, {"Retry-After": "5"}), make_response(200)]
+    RetryPolicy(backoff_base=0.1, jitter=False).call(lambda: responses.pop(0))
+    assert sleeps == [5.0]
+
+
+def test_retry_after_beyond_cap_is_not_waited_for(sleeps: list[float]) -> None:
+    """Test that a Retry-After longer than the cap returns the response."""
+    resp = RetryPolicy(backoff_cap=10.0).call(
+        lambda: make_response(503, {"Retry-After": "3600"})
+    )
+    assert resp.status_code == 503  # noqa: PLR2004
+    assert sleeps == []
+
+
+def test_jitter_stays_within_backoff() -> None:
+    """Test that jittered delays never exceed the capped backoff."""
+    policy = RetryPolicy(backoff_base=1.0, backoff_cap=4.0)
+    for attempt in range(1, 10):
+        assert 0 <= policy.backoff(attempt) <= 4.0  # noqa: PLR2004
+
+
+def test_parse_retry_after() -> None:
+    """Test parsing of Retry-After values."""
+    assert retry.parse_retry_after("120") == 120.0  # noqa: PLR2004
+    assert retry.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert retry.parse_retry_after("soon") is None
+    assert retry.parse_retry_after(None) is None
+
+
+def test_parse_settings() -> None:
+    """Test parsing of the retry_statuses and retry_exceptions settings."""
+    assert parse_statuses("429, 503") == frozenset({429, 503})
+    assert parse_exceptions("timeout") == (requests.Timeout,)
+    with pytest.raises(ValueError):
+        parse_statuses("700")
+    with pytest.raises(ValueError):
+        parse_exceptions("bogus")
+
+
+def test_invalid_settings_are_rejected() -> None:
+    """Test that invalid retry settings fail validation."""
+    settings = AppSettings()
+    with pytest.raises(ValueError):
+        settings.retry_statuses = "abc"
+    with pytest.raises(ValueError):
+        settings.retry_exceptions = "bogus"
+
+
+def test_fetch_retries(monkeypatch: pytest.MonkeyPatch, sleeps: list[float]) -> None:
+    """Test that transport.fetch applies the configured retry policy."""
+    responses = [make_response(503), make_response(200)]
+
+    def mock_get(self: Any, url: str, **kwargs: Any) -> requests.Response:
+        return responses.pop(0)
+
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+    settings = AppSettings()
+    settings.retry_jitter = False
+    settings.retry_backoff = 0.25
+    transport.configure(settings)
+    log = RetryLog()
+    try:
+        resp = transport.fetch("http://example.com/", {}, 1.0, on_retry=log)
+    finally:
+        transport.configure(None)
+    assert resp.status_code == 200  # noqa: PLR2004
+    assert sleeps == [0.25]
+    assert log.summary() == "(1 retry: HTTP 503)"
+
+
+def test_fetch_retries_keep_to_host_rate_limit(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that retries wait for the host's rate limit, not just the backoff."""
+    sent: list[float] = []
+    responses = [make_response(503), make_response(503), make_response(200)]
+
+    def mock_get(self: Any, url: str, **kwargs: Any) -> requests.Response:
+        sent.append(time.monotonic())
+        return responses.pop(0)
+
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+    settings = AppSettings()
+    settings.retry_jitter = False
+    settings.retry_backoff = 0.001
+    settings.host_rate_limit = 10
+    transport.configure(settings)
+    try:
+        resp = transport.fetch("http://rate-limited.example/", {}, 1.0)
+    finally:
+        transport.configure(None)
+    assert resp.status_code == 200  # noqa: PLR2004
+    gaps = [later - earlier for earlier, later in itertools.pairwise(sent)]
+    assert len(gaps) == 2  # noqa: PLR2004
+    # The first retry may use the bucket's burst token, the second may not
+    assert gaps[1] >= 0.09  # noqa: PLR2004
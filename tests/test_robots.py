@@ -0,0 +1,155 @@
+"""Tests for robots.txt support."""
+
+import io
+import threading
+from collections.abc import Generator
+from typing import Any
+
+import pytest
+import requests
+
+from urload import transport
+from urload.robots import RobotsCache, RobotsDisallowed
+from urload.scheduler import scheduler
+from urload.settings import AppSettings
+
+ROBOTS = b"User-agent: *\nDisallow: /private\nCrawl-delay: 2\n"
+
+
+def make_response(status: int, body: bytes = b"") -> Any:
+    """Build a requests.Response with the given status and body."""
+    resp = requests.Response()
+    resp.status_code = status
+    resp.raw = io.BytesIO(body)
+    return resp
+
+
+class RobotsServer:
+    """A fetch function serving one robots.txt and recording each request."""
+
+    def __init__(self, status: int = 200, body: bytes = ROBOTS) -> None:
+        """Initialize the server with the response to return."""
+        self.status = status
+        self.body = body
+        self.requests: list[str] = []
+
+    def __call__(self, url: str) -> Any:
+        """Return the robots.txt response."""
+        self.requests.append(url)
+        return make_response(self.status, self.body)
+
+
+@pytest.fixture(autouse=True)
+def reset_host_limits() -> Generator[None, None, None]:
+    """Remove any Crawl-delay applied to the test hosts."""
+    yield
+    scheduler().limit_host("a.com", 0)
+
+
+def test_rules_are_applied() -> None:
+    """Test that disallowed paths are refused and others allowed."""
+    cache = RobotsCache(60, RobotsServer())
+    assert cache.allowed("https://a.com/page", "urload")
+    assert not cache.allowed("https://a.com/private/x", "urload")
+
+
+def test_fetched_once_per_origin() -> None:
+    """Test that robots.txt is downloaded once, even by concurrent checks."""
+    server = RobotsServer()
+    cache = RobotsCache(60, server)
+    threads = [
+        threading.Thread(target=cache.allowed, args=(f"https://a.com/{i}", "urload"))
+        for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    cache.allowed("http://a.com/", "urload")
+    assert server.requests == ["https://a.com/robots.txt", "http://a.com/robots.txt"]
+
+
+def test_entries_expire() -> None:
+    """Test that robots.txt is downloaded again once its entry has expired."""
+    server = RobotsServer()
+    cache = RobotsCache(0, server)
+    cache.allowed("https://a.com/1", "urload")
+    cache.allowed("https://a.com/2", "urload")
+    assert len(server.requests) == 2  # noqa: PLR2004
+
+
+@pytest.mark.parametrize(("status", "allowed"), [(404, True), (503, False)])
+def test_missing_robots(status: int, allowed: bool) -> None:
+    """Test that 4xx allows everything and 5xx disallows everything."""
+    cache = RobotsCache(60, RobotsServer(status))
+    assert cache.allowed("https://a.com/page", "urload") is allowed
+
+
+def test_unreachable_robots() -> None:
+    """Test that a network error disallows everything."""
+
+    def fetch(url: str) -> Any:
+        raise requests.ConnectionError("refused")
+
+    assert not RobotsCache(60, fetch).allowed("https://a.com/page", "urload")
+
+
+def test_unreachable_robots_are_retried() -> None:
+    """Test that an unreachable robots.txt is retried, and a later 200 lifts the block."""
+    server = RobotsServer(503)
+    cache = RobotsCache(60, server, failure_ttl=0)
+    assert not cache.allowed("https://a.com/page", "urload")
+    server.status = 200
+    assert cache.allowed("https://a.com/page", "urload")
+    assert cache.allowed("https://a.com/other", "urload")
+    assert len(server.requests) == 2  # noqa: PLR2004
+
+
+def test_unreachable_robots_are_kept_briefly() -> None:
+    """Test that an unreachable robots.txt is not downloaded again on every check."""
+    server = RobotsServer(503)
+    cache = RobotsCache(60, server)
+    cache.allowed("https://a.com/1", "urload")
+    cache.allowed("https://a.com/2", "urload")
+    assert len(server.requests) == 1
+
+
+def test_non_http_urls_are_allowed() -> None:
+    """Test that URLs without an HTTP origin are not checked."""
+    server = RobotsServer()
+    assert RobotsCache(60, server).allowed("file:///etc/hosts", "urload")
+    assert server.requests == []
+
+
+def test_crawl_delay_limits_host() -> None:
+    """Test that Crawl-delay sets the host's rate limit in the scheduler."""
+    RobotsCache(60, RobotsServer()).allowed("https://a.com/", "urload")
+    assert scheduler().bucket("a.com").rate == 0.5  # noqa: PLR2004
+    RobotsCache(60, RobotsServer(body=b"")).allowed("https://a.com/", "urload")
+    assert scheduler().bucket("a.com").rate == scheduler().rate
+
+
+def test_transport_checks_robots(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that fetches are refused when robots.txt disallows them."""
+    fetched: list[str] = []
+
+    def mock_get(self: Any, url: str, **kwargs: Any) -> Any:
+        fetched.append(url)
+        return make_response(200, ROBOTS if url.endswith("/robots.txt") else b"ok")
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+    settings = AppSettings()
+    settings.robots_txt = True
+    try:
+        transport.configure(settings)
+        assert transport.fetch("https://a.com/1", {}, 1.0).content == b"ok"
+        assert transport.fetch("https://a.com/2", {}, 1.0).content == b"ok"
+        with pytest.raises(RobotsDisallowed):
+            transport.fetch("https://a.com/private", {}, 1.0)
+    finally:
+        transport.configure(None)
+    assert fetched == [
+        "https://a.com/robots.txt",
+        "https://a.com/1",
+        "https://a.com/2",
+    ]
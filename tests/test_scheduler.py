@@ -0,0 +1,145 @@
+"""Tests for the per-host scheduler."""
+
+import threading
+import time
+
+import pytest
+
+from urload.scheduler import (
+    Cancelled,
+    HostScheduler,
+    TokenBucket,
+    cancellation,
+    url_host,
+)
+
+RATE = 50.0
+
+
+def test_url_host() -> None:
+    """Test that URLs are grouped by lowercase host name."""
+    assert url_host("https://Example.COM:8080/a?b") == "example.com"
+    assert url_host("not a url") == ""
+
+
+def test_token_bucket_spaces_requests() -> None:
+    """Test that the token bucket limits the request rate without waiting itself."""
+    bucket = TokenBucket(RATE)
+    assert bucket.try_acquire() == 0
+    delay = bucket.try_acquire()
+    assert 0 < delay <= 1 / RATE
+    time.sleep(delay)
+    assert bucket.try_acquire() == 0
+
+
+def test_token_bucket_unlimited() -> None:
+    """Test that a rate of zero always has a token."""
+    bucket = TokenBucket(0)
+    assert all(bucket.try_acquire() == 0 for _ in range(1000))
+
+
+def test_imap_preserves_order_and_errors() -> None:
+    """Test that results are yielded in input order with exceptions preserved."""
+
+    def work(n: int) -> int:
+        time.sleep(0.001 * (10 - n))
+        if n == 3:  # noqa: PLR2004
+            raise ValueError("three")
+        return n * n
+
+    sched = HostScheduler()
+    results = list(sched.imap(work, range(10), 4, key=lambda n: f"host{n % 3}"))
+    assert len(results) == 10  # noqa: PLR2004
+    for n, future in enumerate(results):
+        if n == 3:  # noqa: PLR2004
+            with pytest.raises(ValueError, match="three"):
+                future.result()
+        else:
+            assert future.result() == n * n
+
+
+def test_imap_round_robins_across_hosts() -> None:
+    """Test that queued work alternates between hosts."""
+    started: list[str] = []
+    items = ["a1", "a2", "a3", "b1", "b2", "c1"]
+    sched = HostScheduler()
+    list(sched.imap(started.append, items, 1, key=lambda s: s[0]))
+    assert started == ["a1", "b1", "c1", "a2", "b2", "a3"]
+
+
+def test_imap_limits_requests_per_host() -> None:
+    """Test that no host has more than max_per_host requests in flight."""
+    lock = threading.Lock()
+    in_flight: dict[str, int] = {}
+    peak: dict[str, int] = {}
+
+    def work(item: tuple[str, int]) -> None:
+        host = item[0]
+        with lock:
+            in_flight[host] = in_flight.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), in_flight[host])
+        time.sleep(0.005)
+        with lock:
+            in_flight[host] -= 1
+
+    items = [(host, i) for i in range(12) for host in ("a", "b")]
+    sched = HostScheduler(max_per_host=2)
+    list(sched.imap(work, items, 8, key=lambda item: item[0]))
+    assert peak == {"a": 2, "b": 2}
+
+
+def test_limit_host() -> None:
+    """Test that a per-host limit applies only below the global limit."""
+    sched = HostScheduler(rate=0.0)
+    sched.limit_host("slow.com", 0.5)
+    assert sched.bucket("slow.com").rate == 0.5  # noqa: PLR2004
+    assert sched.bucket("fast.com").rate == 0.0
+    sched.set_limits(0.25, 4)
+    assert sched.bucket("slow.com").rate == 0.25  # noqa: PLR2004
+    sched.set_limits(2.0, 4)
+    assert sched.bucket("slow.com").rate == 0.5  # noqa: PLR2004
+    sched.limit_host("slow.com", 0)
+    assert sched.bucket("slow.com").rate == 2.0  # noqa: PLR2004
+
+
+def test_imap_throttled_host_does_not_starve_others() -> None:
+    """Test that items for a rate-limited host do not occupy the workers while waiting."""
+    sched = HostScheduler()
+    sched.limit_host("slow", 2.0)
+    start = time.monotonic()
+    started: dict[str, float] = {}
+
+    def work(item: str) -> None:
+        started[item] = time.monotonic() - start
+
+    items = [f"slow{i}" for i in range(4)] + [f"fast{i}" for i in range(4)]
+    list(sched.imap(work, items, 2, key=lambda item: item[:4]))
+    assert max(started[f"fast{i}"] for i in range(4)) < 0.25  # noqa: PLR2004
+    # The slow host still gets one request per half second
+    assert started["slow3"] >= 1.4  # noqa: PLR2004
+
+
+def test_imap_cancels_running_work_when_abandoned() -> None:
+    """Test that closing an imap call cancels its running work instead of waiting for it."""
+    closed = threading.Event()
+
+    class Resource:
+        def close(self) -> None:
+            closed.set()
+
+    def work(n: int) -> int:
+        if n == 0:
+            return n
+        token = cancellation()
+        with token.track(Resource()):
+            while not token.cancelled:
+                time.sleep(0.01)
+        raise Cancelled()
+
+    results = HostScheduler().imap(work, range(3), 3, key=str)
+    assert next(results).result() == 0
+    start = time.monotonic()
+    results.close()
+    assert time.monotonic() - start < 0.5  # noqa: PLR2004
+    assert closed.is_set()
+    assert not cancellation().cancelled
@@ -3,6 +3,9 @@
 import os
 from pathlib import Path
 
+import pytest
+from pydantic import ValidationError
+
 from urload.settings import AppSettings
 
 
@@ -26,3 +29,24 @@ def test_settings_load_and_save(tmp_path: Path) -> None:
         os.environ["URLOAD_CONFIG_FILE"] = orig_env
     else:
         del os.environ["URLOAD_CONFIG_FILE"]
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "download_concurrency",
+        "download_chunk_size",
+        "frontier_batch_size",
+        "title_max_bytes",
+        "pool_hosts",
+        "pool_maxsize",
+    ],
+)
+def test_sizes_must_be_positive(name: str) -> None:
+    """Test that counts and sizes below 1 are rejected, and 1 is accepted."""
+    settings = AppSettings()
+    for value in (0, -1):
+        with pytest.raises(ValidationError):
+            setattr(settings, name, value)
+    setattr(settings, name, 1)
+    assert getattr(settings, name) == 1
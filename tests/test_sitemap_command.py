@@ -0,0 +1,112 @@
+"""Tests for the sitemap command."""
+
+import gzip
+from collections.abc import Iterator, Mapping
+
+import pytest
+from conftest import Fetches
+
+from urload.commands.base import CommandError
+from urload.commands.sitemap import SitemapCommand, parse_sitemap
+from urload.url import URL
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def urlset(*locs: str) -> bytes:
+    """Return a sitemap listing the given locations."""
+    entries = "".join(
+        f"<url><loc> {loc} </loc><priority>1</priority></url>" for loc in locs
+    )
+    return f'<?xml version="1.0"?><urlset {NS}>{entries}</urlset>'.encode()
+
+
+def index(*locs: str) -> bytes:
+    """Return a sitemap index listing the given sitemaps."""
+    entries = "".join(f"<sitemap><loc>{loc}</loc></sitemap>" for loc in locs)
+    return f"<sitemapindex {NS}>{entries}</sitemapindex>".encode()
+
+
+SITE = {
+    "https://a.com/sitemap.xml": index(
+        "https://a.com/pages.xml.gz",
+        "https://a.com/posts.xml",
+        "https://a.com/sitemap.xml",
+    ),
+    "https://a.com/pages.xml.gz": gzip.compress(
+        urlset("https://a.com/", "https://a.com/about")
+    ),
+    "https://a.com/posts.xml": urlset("https://a.com/p/1", "/p/2"),
+    "https://a.com/bad.xml": b"<urlset><url><loc>x</loc></url>",
+}
+
+
+@pytest.fixture
+def site() -> Mapping[str, str | bytes]:
+    """Serve SITE to the fetches fixture."""
+    return SITE
+
+
+def test_sitemap_appends_urls(fetches: Fetches) -> None:
+    """Test that the URLs of a sitemap are added after the existing list."""
+    result = SitemapCommand().run(["https://a.com/posts.xml"], [URL("https://x.com/")])
+    assert [u.url for u in result] == [
+        "https://x.com/",
+        "https://a.com/p/1",
+        "https://a.com/p/2",
+    ]
+
+
+def test_sitemap_index(fetches: Fetches, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that indexed sitemaps, including gzipped ones, are fetched once each."""
+    result = SitemapCommand().run(["https://a.com/sitemap.xml"], [])
+    assert [u.url for u in result] == [
+        "https://a.com/",
+        "https://a.com/about",
+        "https://a.com/p/1",
+        "https://a.com/p/2",
+    ]
+    assert [url for url, _ in fetches] == [
+        "https://a.com/sitemap.xml",
+        "https://a.com/pages.xml.gz",
+        "https://a.com/posts.xml",
+    ]
+    out = capsys.readouterr().out
+    assert "https://a.com/sitemap.xml -> 0 URLs, 3 sitemaps" in out
+    assert "Added 4 URLs from sitemaps." in out
+
+
+@pytest.mark.parametrize("url", ["https://a.com/bad.xml", "https://a.com/missing.xml"])
+def test_sitemap_errors(
+    url: str, fetches: Fetches, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that malformed or missing sitemaps are reported."""
+    assert SitemapCommand().run([url], []) == []
+    assert f"{url} -> Error:" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("args", [[], ["a", "b"], ["ftp://a.com/sitemap.xml"]])
+def test_sitemap_invalid_args(args: list[str]) -> None:
+    """Test that invalid arguments raise CommandError."""
+    with pytest.raises(CommandError):
+        SitemapCommand().run(args, [])
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_parse_sitemap_streams(compress: bool) -> None:
+    """Test that entries are produced before the whole sitemap has been read."""
+    body = urlset(*(f"https://a.com/{i}" for i in range(1000)))
+    if compress:
+        body = gzip.compress(body)
+    consumed = 0
+
+    def chunks() -> Iterator[bytes]:
+        nonlocal consumed
+        for i in range(0, len(body), 100):
+            consumed = i + 100
+            yield body[i : i + 100]
+
+    entries = parse_sitemap(chunks())
+    assert next(entries) == ("url", "https://a.com/0")
+    assert consumed < len(body)
+    assert len(list(entries)) == 999  # noqa: PLR2004
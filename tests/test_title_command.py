@@ -1,26 +1,22 @@
 """Tests for the TitleCommand."""
 
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any
+
 import pytest
+from conftest import DummyResponse
 from pytest import CaptureFixture
 
+from urload import pagecache
 from urload.commands.base import CommandError
 from urload.commands.title import TitleCommand
+from urload.parse import TitleParser
+from urload.settings import AppSettings
 from urload.url import URL
 
 
-class DummyResponse:
-    """A dummy response object for mocking requests.get."""
-
-    def __init__(self, content: bytes):
-        """Initialize with HTML content."""
-        self.content = content
-        self.text = content.decode("utf-8")
-
-    def raise_for_status(self) -> None:
-        """No-op for status check."""
-        pass
-
-
 def url_list() -> list[URL]:
     """Return a list of test URLs."""
     return [URL(f"https://site.com/{i}") for i in range(5)]
@@ -38,7 +34,7 @@ def test_title_command_extracts_titles(
     """Test that TitleCommand extracts and prints HTML titles."""
 
     def mock_get(
-        url: str, timeout: int = 10, headers: dict[str, str] | None = None
+        self: Any, url: str, headers: dict[str, str] | None = None, **kwargs: Any
     ) -> DummyResponse:
         if "site.com/0" in url:
             return DummyResponse(b"<html><head><title>Page Zero</title></head></html>")
@@ -47,7 +43,7 @@ def test_title_command_extracts_titles(
         else:
             return DummyResponse(b"<html><head><title>Other Page</title></head></html>")
 
-    monkeypatch.setattr("requests.get", mock_get)
+    monkeypatch.setattr("requests.Session.get", mock_get)
 
     cmd = TitleCommand()
     test_urls = [URL("https://site.com/0"), URL("https://site.com/1")]
@@ -67,11 +63,11 @@ def test_title_command_no_title_tag(
     """Test that TitleCommand handles HTML without title tag."""
 
     def mock_get(
-        url: str, timeout: int = 10, headers: dict[str, str] | None = None
+        self: Any, url: str, headers: dict[str, str] | None = None, **kwargs: Any
     ) -> DummyResponse:
         return DummyResponse(b"<html><body>No title here</body></html>")
 
-    monkeypatch.setattr("requests.get", mock_get)
+    monkeypatch.setattr("requests.Session.get", mock_get)
 
     cmd = TitleCommand()
     test_urls = [URL("https://site.com/notitle")]
@@ -90,11 +86,11 @@ def test_title_command_network_error(
     """Test that TitleCommand handles network errors gracefully."""
 
     def mock_get(
-        url: str, timeout: int = 10, headers: dict[str, str] | None = None
+        self: Any, url: str, headers: dict[str, str] | None = None, **kwargs: Any
     ) -> DummyResponse:
         raise ConnectionError("Network error")
 
-    monkeypatch.setattr("requests.get", mock_get)
+    monkeypatch.setattr("requests.Session.get", mock_get)
 
     cmd = TitleCommand()
     test_urls = [URL("https://site.com/error")]
@@ -125,11 +121,11 @@ def test_title_command_single_index(
     """Test that title with a single index processes only that URL."""
 
     def mock_get(
-        url: str, timeout: int = 10, headers: dict[str, str] | None = None
+        self: Any, url: str, headers: dict[str, str] | None = None, **kwargs: Any
     ) -> DummyResponse:
         return DummyResponse(b"<html><head><title>Single Title</title></head></html>")
 
-    monkeypatch.setattr("requests.get", mock_get)
+    monkeypatch.setattr("requests.Session.get", mock_get)
 
     cmd = TitleCommand()
     urls = url_list()
@@ -148,11 +144,11 @@ def test_title_command_range_start_dash(
     """Test that title with -N processes from 0 to N inclusive."""
 
     def mock_get(
-        url: str, timeout: int = 10, headers: dict[str, str] | None = None
+        self: Any, url: str, headers: dict[str, str] | None = None, **kwargs: Any
     ) -> DummyResponse:
         return DummyResponse(b"<html><head><title>Range Title</title></head></html>")
 
-    monkeypatch.setattr("requests.get", mock_get)
+    monkeypatch.setattr("requests.Session.get", mock_get)
 
     cmd = TitleCommand()
     urls = url_list()
@@ -173,13 +169,13 @@ def test_title_command_range_end_dash(
     """Test that title with N- processes from N to the end."""
 
     def mock_get(
-        url: str, timeout: int = 10, headers: dict[str, str] | None = None
+        self: Any, url: str, headers: dict[str, str] | None = None, **kwargs: Any
     ) -> DummyResponse:
         return DummyResponse(
             b"<html><head><title>End Range Title</title></head></html>"
         )
 
-    monkeypatch.setattr("requests.get", mock_get)
+    monkeypatch.setattr("requests.Session.get", mock_get)
 
     cmd = TitleCommand()
     urls = url_list()
@@ -199,13 +195,13 @@ def test_title_command_range_inclusive(
     """Test that title with N-M processes from N to M inclusive."""
 
     def mock_get(
-        url: str, timeout: int = 10, headers: dict[str, str] | None = None
+        self: Any, url: str, headers: dict[str, str] | None = None, **kwargs: Any
     ) -> DummyResponse:
         return DummyResponse(
             b"<html><head><title>Inclusive Title</title></head></html>"
         )
 
-    monkeypatch.setattr("requests.get", mock_get)
+    monkeypatch.setattr("requests.Session.get", mock_get)
 
     cmd = TitleCommand()
     urls = url_list()
@@ -246,13 +242,13 @@ def test_title_command_whitespace_handling(
     """Test that TitleCommand handles whitespace in titles correctly."""
 
     def mock_get(
-        url: str, timeout: int = 10, headers: dict[str, str] | None = None
+        self: Any, url: str, headers: dict[str, str] | None = None, **kwargs: Any
     ) -> DummyResponse:
         return DummyResponse(
             b"<html><head><title>  \n  Trimmed Title  \n  </title></head></html>"
         )
 
-    monkeypatch.setattr("requests.get", mock_get)
+    monkeypatch.setattr("requests.Session.get", mock_get)
 
     cmd = TitleCommand()
     test_urls = [URL("https://site.com/whitespace")]
@@ -263,3 +259,114 @@ def test_title_command_whitespace_handling(
 
     assert "0: Trimmed Title" in output
     assert result == test_urls
+
+
+class TrackingResponse(DummyResponse):
+    """A DummyResponse that records how much of the body was read."""
+
+    def __init__(self, content: bytes):
+        """Initialize with HTML content."""
+        super().__init__(content)
+        self.bytes_read = 0
+        self.closed = False
+
+    def iter_content(self, chunk_size: int = 1) -> Iterator[bytes]:
+        """Yield the content in chunks, counting the bytes read."""
+        for chunk in super().iter_content(chunk_size):
+            self.bytes_read += len(chunk)
+            yield chunk
+
+    def close(self) -> None:
+        """Record that the response was closed."""
+        self.closed = True
+
+
+def test_title_command_stops_reading_after_title(
+    capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that the rest of the page is not read once the title is known."""
+    body = b"<html><head><title>Early</title>" + b"x" * 1_000_000
+    resp = TrackingResponse(body)
+    monkeypatch.setattr("requests.Session.get", lambda *args, **kwargs: resp)  # type: ignore
+
+    TitleCommand().run([], [URL("https://site.com/big")])
+
+    assert "0: Early" in capsys.readouterr().out
+    assert resp.bytes_read < 64 * 1024
+    assert resp.closed
+
+
+def test_title_command_respects_byte_limit(
+    capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that reading stops at title_max_bytes when no title is found."""
+    resp = TrackingResponse(b"<html><head>" + b"<meta>" * 100_000)
+    monkeypatch.setattr("requests.Session.get", lambda *args, **kwargs: resp)  # type: ignore
+    settings = AppSettings()
+    settings.title_max_bytes = 20_000
+
+    TitleCommand().run([], [URL("https://site.com/big")], settings)
+
+    assert "0: No title found" in capsys.readouterr().out
+    assert 20_000 <= resp.bytes_read < 20_000 + 8 * 1024  # noqa: PLR2004
+    assert resp.closed
+
+
+def test_title_command_caches_only_complete_pages(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that fully read pages are cached and partially read ones are not."""
+    bodies = {
+        "https://site.com/short": b"<p>no head</p>",
+        "https://site.com/long": b"<title>T</title>" + b"x" * 100_000,
+    }
+
+    def mock_get(self: Any, url: str, **kwargs: Any) -> DummyResponse:
+        return DummyResponse(bodies[url])
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+    urls = [URL(url) for url in bodies]
+    TitleCommand().run([], urls)
+    assert pagecache.cached_page(urls[0]) is not None
+    assert pagecache.cached_page(urls[1]) is None
+
+
+@pytest.mark.parametrize(
+    ("html", "expected"),
+    [
+        ("<title>A &amp; <b>B</b></title>", "A & B"),
+        ("<head></head><body><svg><title>icon</title></svg>", None),
+        ("<title>Unterminated", "Unterminated"),
+        ("<TITLE>Upper</TITLE><title>Second</title>", "Upper"),
+    ],
+)
+def test_title_parser(html: str, expected: str | None) -> None:
+    """Test that TitleParser finds the first title in the document head."""
+    parser = TitleParser()
+    parser.feed(html)
+    parser.close()
+    assert parser.title == expected
+
+
+def test_title_command_fetches_concurrently_in_order(
+    capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that pages are fetched in parallel and titles printed in index order."""
+    workers = 3
+    barrier = threading.Barrier(workers, timeout=5)
+
+    def mock_get(self: Any, url: str, **kwargs: Any) -> DummyResponse:
+        idx = int(url.rsplit("/", 1)[1])
+        barrier.wait()  # Every fetch must be in flight at the same time
+        time.sleep(0.01 * (workers - idx))  # Finish in reverse order
+        return DummyResponse(f"<title>Page {idx}</title>".encode())
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+    settings = AppSettings()
+    settings.download_concurrency = workers
+    urls = [URL(f"https://host{i}.com/{i}") for i in range(workers)]
+
+    TitleCommand().run([], urls, settings)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines == [f"{i}: Page {i}" for i in range(workers)]
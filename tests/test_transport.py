@@ -0,0 +1,84 @@
+"""Tests for the shared HTTP transport."""
+
+import http.client
+from collections.abc import Generator
+from typing import Any
+
+import pytest
+import requests
+from requests.cookies import MockRequest, MockResponse
+
+from urload import transport
+from urload.settings import AppSettings
+from urload.url import URL
+
+
+@pytest.fixture(autouse=True)
+def fresh_transport() -> Generator[None, None, None]:
+    """Start and end each test with no shared session."""
+    transport.configure(None)
+    transport.close()
+    yield
+    transport.configure(None)
+    transport.close()
+
+
+def test_session_is_shared() -> None:
+    """Test that the same session is returned until it is closed."""
+    first = transport.session()
+    assert transport.session() is first
+    transport.close()
+    assert transport.session() is not first
+
+
+def test_session_keeps_no_cookies() -> None:
+    """Test that cookies set by a response are not kept for later requests."""
+    headers = http.client.HTTPMessage()
+    headers["Set-Cookie"] = "session=secret; Path=/"
+    request = requests.Request("GET", "https://example.com/").prepare()
+    jar: Any = transport.session().cookies
+    jar.extract_cookies(MockResponse(headers), MockRequest(request))
+    assert len(jar) == 0
+
+
+def test_configure_sizes_pools() -> None:
+    """Test that the pool settings are applied to the session adapters."""
+    settings = AppSettings()
+    settings.pool_hosts = 3
+    settings.pool_maxsize = 7
+    transport.configure(settings)
+    adapter: Any = transport.session().get_adapter("https://example.com")
+    assert adapter._pool_connections == 3  # noqa: PLR2004
+    assert adapter._pool_maxsize == 7  # noqa: PLR2004
+
+
+def test_configure_keeps_session_if_unchanged() -> None:
+    """Test that reconfiguring with the same settings keeps the session."""
+    first = transport.session()
+    transport.configure(AppSettings())
+    assert transport.session() is first
+    settings = AppSettings()
+    settings.pool_maxsize = 2
+    transport.configure(settings)
+    assert transport.session() is not first
+
+
+def test_url_get_uses_shared_session(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that URL.get sends its request through the shared session."""
+    seen: list[requests.Session] = []
+
+    def mock_get(
+        self: requests.Session,
+        url: str,
+        headers: dict[str, str] | None = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        seen.append(self)
+        resp = requests.Response()
+        resp.status_code = 200
+        return resp
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+    URL("https://a.com/1").get()
+    URL("https://a.com/2").get()
+    assert seen == [transport.session(), transport.session()]
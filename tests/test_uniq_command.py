@@ -2,6 +2,7 @@
 
 import pytest
 
+from urload.commands.base import CommandError
 from urload.commands.uniq import UniqCommand
 from urload.url import URL
 
@@ -57,3 +58,20 @@ def test_uniq_command_keeps_first_occurrence() -> None:
     result = cmd.run([], url_list)
     urls = [u.url for u in result]
     assert urls == ["https://a.com", "https://b.com"]
+
+
+def test_uniq_command_approx(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that --approx removes duplicates and reports the filter statistics."""
+    cmd = UniqCommand()
+    url_list = [URL("https://a.com"), URL("https://b.com"), URL("https://a.com")]
+    result = cmd.run(["--approx"], url_list)
+    assert [u.url for u in result] == ["https://a.com", "https://b.com"]
+    out = capsys.readouterr().out
+    assert "Removed 1 duplicate URLs." in out
+    assert "Seen-set: 2 entries" in out
+
+
+def test_uniq_command_invalid_args() -> None:
+    """Test that unknown arguments raise CommandError."""
+    with pytest.raises(CommandError):
+        UniqCommand().run(["--fast"], [URL("https://a.com")])
@@ -1,6 +1,12 @@
 """Tests for the URL class."""
 
-from urload.url import URL
+import pickle
+import subprocess
+import sys
+
+import pytest
+
+from urload.url import URL, intern_headers
 
 
 def test_url_basic() -> None:
@@ -21,3 +27,54 @@ def test_url_repr() -> None:
     assert (
         rep == "URL(url='https://example.com', headers={'Referer': 'https://ref.com'})"
     )
+
+
+def test_url_is_immutable() -> None:
+    """Test that neither the URL nor its headers can be changed."""
+    url = URL("https://example.com", headers={"Referer": "https://ref.com"})
+    with pytest.raises(AttributeError):
+        url.url = "https://other.com"  # type: ignore[misc]
+    with pytest.raises(TypeError):
+        url.headers["Referer"] = "https://other.com"
+    with pytest.raises(TypeError):
+        url.headers.update({"Cookie": "x"})
+    assert not hasattr(url, "__dict__")
+    assert {**url.headers, "Cookie": "x"} == {
+        "Referer": "https://ref.com",
+        "Cookie": "x",
+    }
+
+
+def test_headers_are_interned() -> None:
+    """Test that URLs with the same headers share one mapping."""
+    a = URL("https://example.com/a", headers={"Referer": "https://ref.com"})
+    b = URL("https://example.com/b", headers={"Referer": "https://ref.com"})
+    assert a.headers is b.headers
+    assert URL("https://example.com").headers is URL("https://x.com", {}).headers
+    shared = intern_headers({"Referer": "https://ref.com"})
+    assert URL("https://example.com/c", shared).headers is shared
+
+
+def test_url_equality_and_hash() -> None:
+    """Test that URLs with equal headers in any order are equal and hash alike."""
+    a = URL("https://example.com", headers={"A": "1", "B": "2"})
+    b = URL("https://example.com", headers={"B": "2", "A": "1"})
+    assert a == b
+    assert hash(a) == hash(b)
+    assert len({a, b, URL("https://example.com")}) == 2  # noqa: PLR2004
+    assert a != URL("https://example.com", headers={"A": "1"})
+
+
+def test_url_pickles() -> None:
+    """Test that URLs and their headers survive pickling into another process."""
+    url = URL("https://example.com", headers={"Referer": "https://ref.com"})
+    check = (
+        "import pickle, sys\n"
+        "from urload.url import URL, Headers\n"
+        "copy = pickle.loads(sys.stdin.buffer.read())\n"
+        "same = URL('https://example.com', headers={'Referer': 'https://ref.com'})\n"
+        "assert isinstance(copy.headers, Headers)\n"
+        "assert copy == same and hash(copy) == hash(same)\n"
+        "assert copy in {same}\n"
+    )
+    subprocess.run([sys.executable, "-c", check], input=pickle.dumps(url), check=True)
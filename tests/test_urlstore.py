@@ -0,0 +1,215 @@
+"""Tests for the columnar URL list store."""
+
+from pathlib import Path
+
+import pytest
+
+from urload.commands.discard import DiscardCommand
+from urload.commands.head import HeadCommand
+from urload.commands.keep import KeepCommand
+from urload.commands.list import ListCommand
+from urload.commands.save import SaveCommand
+from urload.commands.sort import SortCommand
+from urload.commands.tail import TailCommand
+from urload.commands.uniq import UniqCommand
+from urload.settings import AppSettings
+from urload.url import URL
+from urload.urlstore import (
+    SegmentedList,
+    URLRange,
+    URLStore,
+    new_like,
+    new_url_list,
+    sorted_by_url,
+)
+
+
+def make_store() -> URLStore:
+    """Return a store holding a few URLs, one with headers."""
+    return URLStore(
+        [
+            URL("https://c.com/"),
+            URL("https://a.com/ü", headers={"Referer": "https://c.com/"}),
+            URL("https://b.com/"),
+        ]
+    )
+
+
+def test_sequence_protocol() -> None:
+    """Test indexing, length, iteration and equality with a list."""
+    store = make_store()
+    assert len(store) == 3  # noqa: PLR2004
+    assert store[1] == URL("https://a.com/ü", headers={"Referer": "https://c.com/"})
+    assert store[-1].url == "https://b.com/"
+    assert [u.url for u in store] == [
+        "https://c.com/",
+        "https://a.com/ü",
+        "https://b.com/",
+    ]
+    assert store == list(store)
+    with pytest.raises(IndexError):
+        store[3]
+
+
+def test_mutation() -> None:
+    """Test that URLs can be inserted, replaced and deleted."""
+    store = make_store()
+    store.insert(0, URL("https://z.com/"))
+    store[1] = URL("https://y.com/")
+    del store[-1]
+    store.append(URL("https://x.com/"))
+    assert [u.url for u in store] == [
+        "https://z.com/",
+        "https://y.com/",
+        "https://a.com/ü",
+        "https://x.com/",
+    ]
+    del store[1:3]
+    assert [u.url for u in store] == ["https://z.com/", "https://x.com/"]
+
+
+def test_slice_shares_storage() -> None:
+    """Test that slicing returns a store without copying URL strings."""
+    store = make_store()
+    size = store.memory_bytes()
+    part = store[1:]
+    assert isinstance(part, URLStore)
+    assert part == [store[1], store[2]]
+    part.append(URL("https://d.com/"))
+    assert len(store) == 3  # noqa: PLR2004
+    assert store.memory_bytes() > size
+
+
+def test_header_sets_are_shared() -> None:
+    """Test that URLs with equal headers share one stored header set."""
+    headers = {"Referer": "https://example.com/"}
+    store = URLStore(URL(f"https://example.com/{i}", headers=headers) for i in range(5))
+    assert store[0].headers is store[4].headers
+    assert store[0].headers == headers
+
+
+def test_mmap_store(tmp_path: Path) -> None:
+    """Test that a memory-mapped store grows beyond its initial size."""
+    store = URLStore(directory=str(tmp_path))
+    long_path = "x" * 1000
+    store.extend(URL(f"https://example.com/{i}/{long_path}") for i in range(2000))
+    assert len(store) == 2000  # noqa: PLR2004
+    assert store[1999].url == f"https://example.com/1999/{long_path}"
+
+
+def test_mmap_store_grows_many_times(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a memory-mapped store keeps its contents over several grow cycles."""
+    monkeypatch.setattr("urload.urlstore._INITIAL_MMAP_SIZE", 64)
+    store = URLStore(directory=str(tmp_path))
+    urls = [URL(f"https://example.com/{i}") for i in range(200)]
+    for url in urls:
+        store.append(url)
+        assert store[0] == urls[0]
+    assert list(store) == urls
+
+
+def test_sorted_by_url() -> None:
+    """Test that sorting a store orders it by URL string and keeps its type."""
+    store = make_store()
+    result = sorted_by_url(store)
+    assert isinstance(result, URLStore)
+    assert [u.url for u in result] == [
+        "https://a.com/ü",
+        "https://b.com/",
+        "https://c.com/",
+    ]
+    assert sorted_by_url([URL("b"), URL("a")]) == [URL("a"), URL("b")]
+
+
+def test_new_like_and_new_url_list() -> None:
+    """Test that new lists are of the requested kind."""
+    assert isinstance(new_like(make_store()), URLStore)
+    assert new_like([URL("a")], [URL("b")]) == [URL("b")]
+    assert new_url_list(None) == []
+    settings = AppSettings(url_store="compact")
+    assert isinstance(new_url_list(settings), URLStore)
+
+
+def test_url_store_setting_is_validated() -> None:
+    """Test that an unknown url_store is rejected."""
+    with pytest.raises(ValueError):
+        AppSettings(url_store="array")
+
+
+def test_commands_keep_store_type(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that list-processing commands accept and return a URLStore."""
+    store = make_store()
+    store.append(URL("https://c.com/"))
+    kept = KeepCommand().run(["[ab]\\.com"], store)
+    assert isinstance(kept, URLStore)
+    assert len(kept) == 2  # noqa: PLR2004
+    discarded = DiscardCommand().run(["a\\.com"], store)
+    assert isinstance(discarded, URLStore)
+    assert len(discarded) == 3  # noqa: PLR2004
+    unique = UniqCommand().run([], store)
+    assert isinstance(unique, URLStore)
+    assert len(unique) == 3  # noqa: PLR2004
+    assert isinstance(SortCommand().run([], store), URLStore)
+    assert HeadCommand().run(["2"], store) == store[:2]
+    assert isinstance(TailCommand().run(["0"], store), URLStore)
+    assert TailCommand().run(["1"], store) == [URL("https://c.com/")]
+    ListCommand().run([], store)
+    assert "https://a.com/ü" in capsys.readouterr().out
+    path = tmp_path / "urls.txt"
+    assert SaveCommand().run([str(path)], store) is store
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 4  # noqa: PLR2004
+
+
+def make_range() -> URLRange:
+    """Return a lazy range of 20 URLs, f00/a0 to f09/a1."""
+    return URLRange(["f", "/a", ""], [(range(10), 2), (range(2), 1)])
+
+
+def test_url_range() -> None:
+    """Test that a URLRange generates combinations in nested order."""
+    urls = make_range()
+    assert len(urls) == 20  # noqa: PLR2004
+    assert [u.url for u in urls[:3]] == ["f00/a0", "f00/a1", "f01/a0"]
+    assert urls[-1].url == "f09/a1"
+    assert isinstance(urls[::5], URLRange)
+    assert [u.url for u in urls[::5]] == ["f00/a0", "f02/a1", "f05/a0", "f07/a1"]
+    with pytest.raises(IndexError):
+        urls[20]
+
+
+def test_segmented_list_edits_split_ranges() -> None:
+    """Test that editing a segmented list keeps untouched URLs lazy."""
+    urls = SegmentedList([URL("first")])
+    urls.extend(make_range())
+    expected = [URL("first"), *make_range()]
+    del urls[3]
+    del expected[3]
+    urls.insert(5, URL("inserted"))
+    expected.insert(5, URL("inserted"))
+    urls[-1] = URL("last")
+    expected[-1] = URL("last")
+    del urls[10:12]
+    del expected[10:12]
+    urls.append(URL("appended"))
+    expected.append(URL("appended"))
+    assert urls == expected
+    assert urls[4:8] == expected[4:8]
+    assert urls[::3] == expected[::3]
+
+
+def test_segmented_list_materializes_into_base_kind() -> None:
+    """Test that filtering and sorting a segmented list give the base's kind of list."""
+    urls = SegmentedList(URLStore([URL("z")]))
+    urls.extend(make_range())
+    kept = KeepCommand().run(["a1"], urls)
+    assert isinstance(kept, URLStore)
+    assert len(kept) == 10  # noqa: PLR2004
+    ordered = sorted_by_url(urls)
+    assert isinstance(ordered, URLStore)
+    assert ordered[0].url == "f00/a0"
+    assert ordered[-1].url == "z"
+    assert isinstance(HeadCommand().run(["2"], urls), SegmentedList)